@@ -0,0 +1,52 @@
+r"""
+The closing braces of the \newlabel of a large .aux file : searched
+character by character, and read in the BraceIndex.
+"""
+
+import random
+
+import benchlib
+from pytex.src.BraceIndex import BraceIndex
+from pytex.src.LatexCode import LatexCode
+from pytex.src.MacroUse import SearchFitBrace
+from pytex.src.MacroUse import paires
+
+
+def aux_text(number_of_labels, seed=0):
+    rng = random.Random(seed)
+    lines = []
+    for number in range(number_of_labels):
+        section = ".".join(str(rng.randint(1, 30)) for _ in range(3))
+        lines.append(r"\newlabel{lab%d}{{%s}{%d}{Some title with {nested} braces\relax }"
+                     r"{section.%s}{}}" % (number, section, rng.randint(1, 3000), section))
+    return "\n".join(lines)+"\n"
+
+
+def main():
+    text = aux_text(60000)
+    print(f".aux file, {len(text)/1e6:.1f} MB")
+    positions = []
+    start = text.find(r"\newlabel")
+    while start != -1:
+        positions.append(text.find("}", start)+1)
+        start = text.find(r"\newlabel", start+1)
+    index = BraceIndex(text, paires)
+
+    def walking():
+        return [SearchFitBrace(text, position, "{")[2] for position in positions]
+
+    def indexed():
+        return [SearchFitBrace(text, position, "{", index)[2] for position in positions]
+
+    assert walking() == indexed()
+    benchlib.report("BraceIndex (one pass)", benchlib.best_time(lambda: BraceIndex(text, paires)))
+    benchlib.report("second arguments, walking", benchlib.best_time(walking, 3))
+    benchlib.report("second arguments, indexed", benchlib.best_time(indexed))
+    benchlib.report(r"search_use_of_macro(\newlabel, 2)",
+                    benchlib.best_time(lambda: LatexCode(text).search_use_of_macro(r"\newlabel", 2), 3))
+    benchlib.report(r"the same, fast=True",
+                    benchlib.best_time(lambda: LatexCode(text).search_use_of_macro(r"\newlabel", 2, fast=True), 3))
+
+
+if __name__ == "__main__":
+    main()
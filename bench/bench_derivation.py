@@ -0,0 +1,28 @@
+"""
+The cost of deriving a LatexCode from an other one (copy, replace, +) at
+document scale, and of the full constructor it avoids.
+"""
+
+import benchlib
+from pytex.src.LatexCode import LatexCode
+from pytex.src.EditList import EditList
+
+
+def main():
+    paragraph = (r"Let $x$ be a point (see \ref{eq:1}) % a comment" "\n"
+                 r"\begin{theorem}\label{thm:1} The \textbf{theorem}.\end{theorem}" "\n")
+    text = paragraph*40000
+    code = LatexCode(text)
+    print(f"document, {len(text)/1e6:.1f} MB")
+    edits = EditList()
+    edits.replace(10, 20, "x")
+    benchlib.report("LatexCode(text) (full constructor)", benchlib.best_time(lambda: LatexCode(code.text_brut)))
+    benchlib.report("LatexCode.derived(text, code)", benchlib.best_time(lambda: LatexCode.derived(code.text_brut, code)))
+    benchlib.report("copy", benchlib.best_time(code.copy))
+    benchlib.report("replace", benchlib.best_time(lambda: code.replace(r"\ref{", r"\ref{")))
+    benchlib.report("apply_edits (one edit)", benchlib.best_time(lambda: code.apply_edits(edits)))
+    benchlib.report("code + code", benchlib.best_time(lambda: code+code))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+r"""
+The expansion of the \input of a corpus of 500 files with 1 to N
+processes (--jobs N, see ParseCache.parse_all).
+
+    python bench/bench_jobs.py [N]        (default : the number of cores)
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import benchlib
+
+
+def main():
+    max_jobs = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    with tempfile.TemporaryDirectory() as directory:
+        main_file = benchlib.write_corpus(Path(directory), 500, lines_per_file=400)
+        os.chdir(directory)
+        print(f"{os.cpu_count()} cores")
+        jobs = 1
+        while jobs <= max_jobs:
+            # A new process each time, with an empty ParseCache.
+            code = ("import io, contextlib, time\n"
+                    "from pathlib import Path\n"
+                    "from pytex.src.all import FileToLatexCode\n"
+                    "start = time.perf_counter()\n"
+                    "with contextlib.redirect_stdout(io.StringIO()):\n"
+                    f"    FileToLatexCode(Path({str(main_file)!r})).substitute_all_inputs(jobs={jobs})\n"
+                    "print(time.perf_counter()-start)\n")
+            seconds = benchlib.run_fresh(code, directory)
+            benchlib.report(f"--jobs {jobs}", seconds)
+            jobs *= 2
+
+
+if __name__ == "__main__":
+    main()
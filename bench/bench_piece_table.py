@@ -0,0 +1,50 @@
+r"""
+The substitution of the \input of a corpus of several hundred files :
+splices in a PieceTable, and in a string (what was done before).
+"""
+
+import io
+import os
+import tempfile
+import contextlib
+from pathlib import Path
+
+import benchlib
+from pytex.src.PieceTable import PieceTable
+from pytex.src.all import FileToLatexCode
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        main_file = benchlib.write_corpus(Path(directory), 500)
+        os.chdir(directory)
+        contents = [path.read_text() for path in sorted(Path(directory, "part").iterdir())]
+
+        def string_splices():
+            text = "x"
+            for content in contents:
+                position = len(text)//2
+                text = text[:position]+content+text[position:]
+            return text
+
+        def piece_table_splices():
+            pieces = PieceTable.of("x")
+            for content in contents:
+                position = len(pieces)//2
+                pieces = pieces.replace(position, position, content)
+            return str(pieces)
+
+        assert string_splices() == piece_table_splices()
+        size = len(string_splices())
+        print(f"{len(contents)} files, {size/1e6:.1f} MB")
+        benchlib.report("splices in a string", benchlib.best_time(string_splices))
+        benchlib.report("splices in a PieceTable", benchlib.best_time(piece_table_splices))
+
+        def expand():
+            with contextlib.redirect_stdout(io.StringIO()):
+                return FileToLatexCode(main_file).substitute_all_inputs().text_brut
+        benchlib.report("substitute_all_inputs", benchlib.best_time(expand, 3))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Throughput of RemoveComments, and of the line by line implementation it replaced."""
+
+import random
+
+import benchlib
+from pytex.src.utilities import RemoveComments
+from tests.test_remove_comments import line_by_line_remove_comments
+
+
+def latex_text(size, comment_ratio, seed=0):
+    rng = random.Random(seed)
+    words = ["theorem", r"\label{thm:x}", r"\ref{eq}", "$x^2+y^2$", r"\%",
+             "and", "the", r"\textbf{bold}", "{", "}"]
+    lines = []
+    length = 0
+    while length < size:
+        line = " ".join(rng.choice(words) for _ in range(rng.randint(3, 14)))
+        if rng.random() < comment_ratio:
+            line += " % " + " ".join(rng.choice(words) for _ in range(5))
+        lines.append(line)
+        length += len(line)+1
+    return "\n".join(lines)+"\n\\end{document}\nafter"
+
+
+def main():
+    for label, comment_ratio in [("ordinary text", 0.1), ("comment heavy", 1.0)]:
+        text = latex_text(10_000_000, comment_ratio)
+        size = len(text.encode("utf8"))
+        print(f"{label}, {size/1e6:.1f} MB")
+        benchlib.report("  RemoveComments", benchlib.best_time(lambda: RemoveComments(text)), size)
+        benchlib.report("  line by line", benchlib.best_time(lambda: line_by_line_remove_comments(text), 3), size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+What the benchmarks share : the import of pytex.src.* from the
+checkout (see tests/conftest.py) and the timing.
+
+    python bench/bench_<name>.py
+"""
+
+import os
+import sys
+import time
+import types
+import random
+import tempfile
+import subprocess
+from pathlib import Path
+
+
+root = Path(__file__).resolve().parent.parent
+if root.name == "pytex":
+    sys.path.insert(0, str(root.parent))
+elif "pytex" not in sys.modules:
+    package = types.ModuleType("pytex")
+    package.__path__ = [str(root)]
+    sys.modules["pytex"] = package
+# for 'tests', which holds the reference implementations
+sys.path.insert(0, str(root))
+
+
+def best_time(fun, repeat=5)->float:
+    """Return the best of 'repeat' times of fun() (seconds)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fun()
+        best = min(best, time.perf_counter()-start)
+    return best
+
+
+def run_fresh(code, directory)->float:
+    """
+    Run 'code' in a new Python process, in 'directory' and with an empty
+    ParseCache, and return the number it prints last.
+    """
+    prelude = (f"import sys; sys.path.insert(0, {str(Path(__file__).resolve().parent)!r})\n"
+               "import benchlib\n")
+    env = dict(os.environ, PYTEX_CACHE_DIR=tempfile.mkdtemp())
+    output = subprocess.run([sys.executable, "-c", prelude+code], cwd=directory,
+                            env=env, capture_output=True, text=True, check=True).stdout
+    return float(output.split()[-1])
+
+
+def report(label, seconds, size=None):
+    line = f"{label:<40} {seconds*1000:10.3f} ms"
+    if size is not None:
+        line += f"  {size/seconds/1e6:8.1f} MB/s"
+    print(line)
+
+
+def write_corpus(directory:Path, number_of_files=500, lines_per_file=200, seed=0)->Path:
+    r"""
+    Write main.tex and 'number_of_files' chapters, included by \input
+    (a tree of depth 2), in 'directory'. Return the main file.
+    """
+    rng = random.Random(seed)
+    words = ["theorem", "proof", r"\ref{eq:1}", "$x^2$", r"\textbf{a}",
+             "and", "the", r"\%", "% a comment"]
+    chapters = []
+    for number in range(number_of_files):
+        lines = [r"\label{chap:%d}" % number]
+        for _ in range(lines_per_file):
+            lines.append(" ".join(rng.choice(words) for _ in range(10)))
+        if number % 10 == 0 and number+1 < number_of_files:
+            lines.append(r"\input{part/chap%d}" % (number+1))
+        if number % 10 != 1:
+            chapters.append(number)
+        (directory / "part").mkdir(exist_ok=True)
+        (directory / "part" / f"chap{number}.tex").write_text("\n".join(lines)+"\n")
+    main = ["\\documentclass{book}", "\\begin{document}"]
+    main.extend(r"\input{part/chap%d}" % number for number in chapters)
+    main.append("\\end{document}")
+    main_file = directory / "main.tex"
+    main_file.write_text("\n".join(main)+"\n")
+    return main_file
@@ -0,0 +1,74 @@
+###########################################################################
+#   This is the package latexparser
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###########################################################################
+
+# copyright (c) Laurent Claessens, 2026
+# email: laurent@claessens-donadello.eu
+
+"""Precomputed matching of the braces of a whole text."""
+
+import re
+from array import array
+
+from pytex.src.MacroUse import is_escaped
+
+
+class BraceIndex:
+    r"""
+    For each opening character of 'pairs' in the text, the position
+    of the character which closes it.
+
+    - `text` : the text to be indexed
+    - `pairs` : a dictionary {opening: closing},
+                typically MacroUse.paires.
+
+    The pairs are counted the same way as SearchFitBrace does :
+    each kind of pair is independent of the others and an escaped
+    character (like \{, but not the brace of \\{) does not count, as in
+    MacroUse.FirstOpeningBrace.
+
+    The table is computed with one array-backed stack by kind of pair.
+    Then 'match' is a lookup.
+    """
+
+    def __init__(self, text, pairs):
+        self.text = text
+        typecode = "i" if len(text) < 2**31 else "q"
+        # self._match[i] is the closing position of the character at
+        # position i, or -1 (not an opening character or never closed).
+        self._match = array(typecode, [-1]) * len(text)
+
+        match = self._match
+        for opening, close in pairs.items():
+            stack = array(typecode)
+            push = stack.append
+            pop = stack.pop
+            search = re.compile("[" + re.escape(opening + close) + "]")
+            for result in search.finditer(text):
+                position = result.start()
+                if position > 0 and text[position-1] == "\\" and is_escaped(text, position):
+                    continue
+                if text[position] == opening:
+                    push(position)
+                elif stack:
+                    match[pop()] = position
+
+    def match(self, position):
+        """
+        Return the position of the character that closes the one
+        at 'position'. Return -1 if it is never closed.
+        """
+        return self._match[position]
@@ -0,0 +1,80 @@
+###########################################################################
+#   This is the package latexparser
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###########################################################################
+
+# copyright (c) Laurent Claessens, 2026
+# email: laurent@claessens-donadello.eu
+
+"""Know in which line and if in a comment is a position of a text."""
+
+import re
+from array import array
+from bisect import bisect_right
+
+
+# A '%' begins a comment when it is not preceded by a backslash.
+# This is the convention of RemoveComments.
+comment_regex = re.compile(r"(?<!\\)%")
+
+
+class CommentIndex:
+    r"""
+    The starting position of each line of a text and the position of the
+    first comment (the first '%' not preceded by '\') on each line.
+
+    Knowing if a position is inside a comment is then a binary search
+    (the line of the position) and one comparison.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.line_starts = array("q", [0])
+        self.line_starts.extend(
+            result.end() for result in re.finditer("\n", text))
+        no_comment = len(text)
+        # self.first_comment[i] is the position of the first '%' on the
+        # line i, or len(text) if there are none.
+        self.first_comment = array("q", [no_comment]) * len(self.line_starts)
+
+        line = 0
+        for result in comment_regex.finditer(text):
+            position = result.start()
+            if position < self.line_starts[line]:
+                continue
+            line = self.line_index(position)
+            self.first_comment[line] = position
+            line = line+1
+            if line == len(self.line_starts):
+                break
+
+    def line_index(self, position):
+        """Return the number (starting at 0) of the line containing 'position'."""
+        return bisect_right(self.line_starts, position) - 1
+
+    def line_bounds(self, position):
+        """
+        Return a tuple (start, end) such that text[start:end] is the
+        line containing 'position', without the final newline.
+        """
+        line = self.line_index(position)
+        start = self.line_starts[line]
+        if line+1 < len(self.line_starts):
+            return start, self.line_starts[line+1]-1
+        return start, len(self.text)
+
+    def in_comment(self, position):
+        """Say if 'position' is inside a comment."""
+        return self.first_comment[self.line_index(position)] < position
@@ -0,0 +1,99 @@
+###########################################################################
+#   This is the package latexparser
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###########################################################################
+
+# copyright (c) Laurent Claessens, 2026
+# email: laurent@claessens-donadello.eu
+
+"""A list of replacements to be applied to a text in one pass."""
+
+
+class EditList:
+    """
+    A list of edits (start, end, replacement) on a text : the text
+    text[start:end] has to be replaced by 'replacement'.
+
+    The offsets are the ones of the original text. The edits are
+    collected first and then applied in one pass (see 'apply').
+
+    An edit which is inside an other one is dropped : its text is
+    already replaced. This happens when a macro is removed together
+    with the macros in its arguments. Keeping an argument (see
+    'keep_argument') is done by removing what is around it, so that
+    the edits in the argument are still applied.
+    """
+
+    def __init__(self):
+        self.edits: list[tuple[int, int, str]] = []
+
+    def __len__(self):
+        return len(self.edits)
+
+    def replace(self, start, end, replacement):
+        """Replace text[start:end] by 'replacement'."""
+        self.edits.append((start, end, replacement))
+
+    def delete(self, start, end):
+        """Remove text[start:end]."""
+        self.edits.append((start, end, ""))
+
+    def replace_occurrence(self, occurrence, replacement):
+        """Replace the occurrence (its 'as_written') by 'replacement'."""
+        start, end = occurrence.span()
+        self.replace(start, end, replacement)
+
+    def keep_argument(self, occurrence, number):
+        """
+        Replace the occurrence by its argument 'number' (from 0).
+
+        The macro name and the other arguments are removed; the argument
+        itself is not touched.
+        """
+        start, end = occurrence.span()
+        argument_start, argument_end = occurrence.argument_span(number)
+        self.delete(start, argument_start)
+        self.delete(argument_end, end)
+
+    def applied_edits(self):
+        """
+        Return the list of the edits which are made by 'apply', in
+        increasing order : the ones inside an other one are dropped.
+        """
+        applied = []
+        turtle = 0
+        # For the same start, the largest edit first : the others are
+        # inside it.
+        for start, end, replacement in sorted(self.edits,
+                                              key=lambda edit: (edit[0], -edit[1])):
+            if start < turtle:
+                if end <= turtle:
+                    continue
+                raise ValueError("The edit ({}, {}) overlaps an other one"
+                                 .format(start, end))
+            applied.append((start, end, replacement))
+            turtle = end
+        return applied
+
+    def apply(self, text):
+        """Return the text in which all the edits are made."""
+        pieces = []
+        turtle = 0
+        for start, end, replacement in self.applied_edits():
+            pieces.append(text[turtle:start])
+            pieces.append(replacement)
+            turtle = end
+        pieces.append(text[turtle:])
+        return "".join(pieces)
@@ -0,0 +1,180 @@
+###########################################################################
+#   This is the package latexparser
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###########################################################################
+
+# copyright (c) Laurent Claessens, 2026
+# email: laurent@claessens-donadello.eu
+
+"""The names of the files in the directories, read once (like the ls-R of kpathsea)."""
+
+import os
+import json
+import atexit
+from pathlib import Path
+from typing import Optional
+
+from pytex.src.utilities import default_cache_directory
+
+
+FILENAME_INDEX_VERSION = 1
+
+
+class DirectoryListing:
+    """
+    The names of the files in a directory, and the mtime of the
+    directory when they were read. A directory which does not exist
+    has no files and the mtime None.
+    """
+
+    def __init__(self, mtime:Optional[int], filenames:set[str]):
+        self.mtime = mtime
+        self.filenames = filenames
+
+
+def _directory_mtime(directory:str)->Optional[int]:
+    try:
+        return os.stat(directory).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _scan(directory:str, mtime:Optional[int])->DirectoryListing:
+    """Read the directory with one os.scandir."""
+    filenames = set()
+    if mtime is not None:
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        filenames.add(entry.name)
+        except OSError:
+            pass
+    return DirectoryListing(mtime, filenames)
+
+
+class FilenameIndex:
+    r"""
+    For each directory, the set of the names of its files. A directory
+    is read by one os.scandir the first time it is asked, and then
+    the questions "is this a file ?" are dictionary lookups.
+
+    A listing is checked against the mtime of its directory (one stat)
+    the first time it is used after the creation of the index or
+    after 'refresh'. A file created or removed later is seen after
+    'refresh', or when the check is asked (see is_file).
+
+    If 'filepath' is given, the listings are read from that file
+    and written back by 'save'. Since the directories are checked by
+    their mtime, a listing in the file which is not up to date is
+    only read again.
+    """
+
+    def __init__(self, filepath:Optional[Path]=None):
+        self.filepath = filepath
+        self._listings:dict[str, DirectoryListing] = {}
+        # The directories whose mtime was checked since the last refresh.
+        self._checked:set[str] = set()
+        self.modified = False
+        if filepath is not None:
+            self._load()
+
+    def refresh(self):
+        """Check again the mtime of the directories at their next use."""
+        self._checked.clear()
+
+    def _listing(self, directory:str, check=False)->DirectoryListing:
+        listing = self._listings.get(directory)
+        if listing is not None and directory in self._checked and not check:
+            return listing
+        mtime = _directory_mtime(directory)
+        if listing is None or listing.mtime != mtime:
+            listing = _scan(directory, mtime)
+            self._listings[directory] = listing
+            self.modified = True
+        self._checked.add(directory)
+        return listing
+
+    def filenames(self, directory:Path)->set[str]:
+        """Return the names of the files in the directory."""
+        return self._listing(os.fspath(directory)).filenames
+
+    def is_file(self, filepath:Path, check=False)->bool:
+        """
+        Same as filepath.is_file(), answered from the listings.
+
+        If 'check' is True, the mtime of the directory is checked
+        even if it was since the last refresh.
+        """
+        directory, name = os.path.split(os.fspath(filepath))
+        return name in self._listing(directory or ".", check).filenames
+
+    def find(self, directories, filename:str, check=False)->Optional[Path]:
+        """
+        Return directory/filename for the first of the 'directories'
+        in which it is a file, or None. Same as is_file, without
+        making the paths which are not files.
+        """
+        subdirectory, name = os.path.split(filename)
+        for directory in directories:
+            key = os.path.join(directory, subdirectory) if subdirectory else os.fspath(directory)
+            listing = self._listings.get(key)
+            if listing is None or check or key not in self._checked:
+                listing = self._listing(key, check)
+            if name in listing.filenames:
+                return directory / filename
+        return None
+
+    def _load(self):
+        try:
+            data = json.loads(self.filepath.read_text())
+        except (OSError, ValueError):
+            return
+        if data.get("version") != FILENAME_INDEX_VERSION:
+            return
+        for directory, (mtime, filenames) in data["directories"].items():
+            self._listings[directory] = DirectoryListing(mtime, set(filenames))
+
+    def save(self):
+        """Write the listings in self.filepath, if they were modified."""
+        if self.filepath is None or not self.modified:
+            return
+        data = {"version": FILENAME_INDEX_VERSION,
+                "directories": {directory: [listing.mtime, sorted(listing.filenames)]
+                                for directory, listing in self._listings.items()}}
+        try:
+            self.filepath.parent.mkdir(parents=True, exist_ok=True)
+            tmp_filepath = self.filepath.with_suffix(f".{os.getpid()}.tmp")
+            tmp_filepath.write_text(json.dumps(data))
+            os.replace(tmp_filepath, self.filepath)
+        except OSError:
+            return
+        self.modified = False
+
+
+_filename_index: Optional[FilenameIndex] = None
+
+
+def get_filename_index()->FilenameIndex:
+    """
+    Return the FilenameIndex of the process. It is kept in the file
+    ls-R.json of default_cache_directory(), written at the end of
+    the process.
+    """
+    global _filename_index
+    if _filename_index is None:
+        _filename_index = FilenameIndex(default_cache_directory() / "ls-R.json")
+        atexit.register(_filename_index.save)
+    return _filename_index
@@ -0,0 +1,278 @@
+###########################################################################
+#   This is the package latexparser
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###########################################################################
+
+# copyright (c) Laurent Claessens, 2026
+# email: laurent@claessens-donadello.eu
+
+r"""The graph of the \input between the files of a document."""
+
+import json
+from pathlib import Path
+from typing import Optional
+
+from pytex.src.LatexCode import LatexCode
+from pytex.src.InputPaths import InputPaths
+from pytex.src.FilenameIndex import get_filename_index
+
+
+class IncludeEdge:
+    r"""
+    An \input{<filename>} in the file 'source'.
+
+    - `target` : the file found in the InputPaths, None when the
+                 filename is not a file (see Occurrence_input.excluded)
+                 or when it is not found.
+    - `position` : the offset of the \input in the text of 'source'
+                   without comments (LatexCode.text_brut).
+    - `name` : the name searched in the InputPaths (with the '.tex'),
+               None when the filename is not a file.
+    - `directories` : the directories of the InputPaths in which it was
+                      searched, in their order.
+    """
+
+    def __init__(self, source:Path, filename:str,
+                 target:Optional[Path], position:int,
+                 name:Optional[str]=None, directories:tuple[Path, ...]=()):
+        self.source = source
+        self.filename = filename
+        self.target = target
+        self.position = position
+        self.name = name
+        self.directories = directories
+
+    def is_up_to_date(self)->bool:
+        """Say if the file found now is still the target."""
+        if self.name is None:
+            return True
+        filepath = get_filename_index().find(self.directories, self.name)
+        if filepath is None or self.target is None:
+            return filepath == self.target
+        # The directories are usually absolute : no need to resolve.
+        return filepath == self.target or filepath.resolve() == self.target
+
+    def to_json(self):
+        return {"source": str(self.source),
+                "filename": self.filename,
+                "target": None if self.target is None else str(self.target),
+                "position": self.position,
+                "name": self.name}
+
+    @classmethod
+    def from_json(cls, data, directories:tuple[Path, ...]=()):
+        target = data["target"]
+        return cls(Path(data["source"]), data["filename"],
+                   None if target is None else Path(target), data["position"],
+                   data["name"], directories)
+
+
+class IncludeGraph:
+    r"""
+    Which file includes which file, read from the \input and the
+    \addInputPath of the files, without expanding the document.
+
+    The \input of the files whose name ends with '_thm' are not edges,
+    since they are not substituted (see InputExpander).
+
+    - `roots` : the files from which the graph was built, like the
+                original file of a request.
+
+    The transitive queries are computed once and then kept; they are
+    forgotten when an edge is added.
+
+    The graph is up to date (see is_up_to_date) when the files did not
+    change, and each \input still gives the same file : an \input
+    which was not found can be found now, and a new file in a directory
+    of the InputPaths can hide the one which was found.
+    """
+
+    version = 2
+
+    def __init__(self):
+        self.roots: list[Path] = []
+        self.edges: dict[Path, list[IncludeEdge]] = {}
+        # The modification time of the files when they were read.
+        self.mtimes: dict[Path, int] = {}
+        self._parents: dict[Path, set[Path]] = {}
+        self._descendants: dict[Path, frozenset[Path]] = {}
+        self._ancestors: dict[Path, frozenset[Path]] = {}
+
+    @classmethod
+    def from_file(cls, filepath:Path, input_paths:Optional[InputPaths]=None,
+                  fast=False)->'IncludeGraph':
+        """Return the graph of the files included by 'filepath'."""
+        graph = cls()
+        graph.add_file(filepath, input_paths, fast=fast)
+        return graph
+
+    def add_file(self, filepath:Path, input_paths:Optional[InputPaths]=None,
+                 fast=False):
+        r"""
+        Add 'filepath' as a root, and the \input of the files it
+        includes, recursively. Each file is read once.
+        """
+        if input_paths is None:
+            input_paths = InputPaths()
+        filepath = filepath.resolve()
+        if filepath not in self.roots:
+            self.roots.append(filepath)
+        if filepath in self.edges:
+            return
+        code = LatexCode.parsed(filepath.read_text(), filepath=filepath)
+        self._add_code(filepath, code, input_paths, fast)
+
+    def _add_code(self, source:Path, code:LatexCode, input_paths:InputPaths, fast):
+        self.edges[source] = []
+        self.mtimes[source] = source.stat().st_mtime_ns
+        occurrences = code.search_use_of_macros({r"\addInputPath": 1, r"\input": 1},
+                                                fast=fast)
+        list_input = []
+        for occurrence in occurrences:
+            if occurrence.name == r"\addInputPath":
+                str_dir = occurrence.analyse().directory
+                input_paths.append(code.options.pwd / str_dir)
+            else:
+                list_input.append(occurrence.analyse())
+        for occurrence in list_input:
+            if occurrence.filename.endswith("_thm"):
+                continue
+            try:
+                target = occurrence.filepath(input_paths)
+            except NameError:
+                target = None
+            if target is not None:
+                target = target.resolve()
+            name = None if occurrence.excluded() else occurrence.strict_filename()
+            self.add_edge(IncludeEdge(source, occurrence.filename,
+                                      target, occurrence.position,
+                                      name, tuple(input_paths)))
+            if target is not None and target not in self.edges:
+                self._add_code(target, occurrence.latex_code(input_paths),
+                               input_paths, fast)
+
+    def add_edge(self, edge:IncludeEdge):
+        self.edges.setdefault(edge.source, []).append(edge)
+        if edge.target is not None:
+            self._parents.setdefault(edge.target, set()).add(edge.source)
+        self._descendants = {}
+        self._ancestors = {}
+
+    def includes(self, filepath:Path)->list[Path]:
+        r"""Return the files directly included by 'filepath', in the order of the \input."""
+        return [edge.target for edge in self.edges.get(filepath, [])
+                if edge.target is not None]
+
+    def included_by(self, filepath:Path)->set[Path]:
+        """Return the files which directly include 'filepath'."""
+        return self._parents.get(filepath, set())
+
+    def transitive_includes(self, filepath:Path)->frozenset[Path]:
+        """Return all the files included by 'filepath', directly or not."""
+        if filepath not in self._descendants:
+            self._descendants[filepath] = self._reached(filepath, self.includes)
+        return self._descendants[filepath]
+
+    def transitive_included_by(self, filepath:Path)->frozenset[Path]:
+        """Return all the files which include 'filepath', directly or not."""
+        if filepath not in self._ancestors:
+            self._ancestors[filepath] = self._reached(filepath, self.included_by)
+        return self._ancestors[filepath]
+
+    def affected_roots(self, filepath:Path)->list[Path]:
+        """Return the roots whose document changes when 'filepath' changes."""
+        ancestors = self.transitive_included_by(filepath)
+        return [root for root in self.roots
+                if root == filepath or root in ancestors]
+
+    @staticmethod
+    def _reached(filepath, neighbours):
+        reached = set()
+        stack = [filepath]
+        while stack:
+            for other in neighbours(stack.pop()):
+                if other not in reached:
+                    reached.add(other)
+                    stack.append(other)
+        return frozenset(reached)
+
+    def files(self)->set[Path]:
+        """Return all the files of the graph."""
+        answer = set(self.edges)
+        answer.update(self._parents)
+        return answer
+
+    def is_up_to_date(self)->bool:
+        r"""
+        Say if none of the files of the graph was modified since it was
+        read, and if each \input gives the same file as then.
+        """
+        for filepath, mtime in self.mtimes.items():
+            try:
+                if filepath.stat().st_mtime_ns != mtime:
+                    return False
+            except FileNotFoundError:
+                return False
+        # The directories are read again if their mtime changed.
+        get_filename_index().refresh()
+        for edges in self.edges.values():
+            for edge in edges:
+                if not edge.is_up_to_date():
+                    return False
+        return True
+
+    def save(self, filepath:Path):
+        """Write the graph in the JSON file 'filepath'."""
+        # The edges of a file share their directories : they are
+        # written once.
+        searches: dict[tuple[Path, ...], int] = {}
+        edges_json = []
+        for edges in self.edges.values():
+            for edge in edges:
+                edge_json = edge.to_json()
+                edge_json["directories"] = searches.setdefault(edge.directories,
+                                                               len(searches))
+                edges_json.append(edge_json)
+        data = {"version": self.version,
+                "roots": [str(root) for root in self.roots],
+                "directories": [[str(directory) for directory in directories]
+                                for directories in searches],
+                "edges": edges_json,
+                "files": {str(source): self.mtimes.get(source)
+                          for source in self.edges}}
+        filepath.write_text(json.dumps(data, indent=1))
+
+    @classmethod
+    def load(cls, filepath:Path)->Optional['IncludeGraph']:
+        """
+        Return the graph saved in 'filepath', or None if the file does
+        not exist or was written by an other version.
+        """
+        if not filepath.is_file():
+            return None
+        data = json.loads(filepath.read_text())
+        if data.get("version") != cls.version:
+            return None
+        graph = cls()
+        graph.roots = [Path(root) for root in data["roots"]]
+        for source, mtime in data["files"].items():
+            graph.edges[Path(source)] = []
+            if mtime is not None:
+                graph.mtimes[Path(source)] = mtime
+        searches = [tuple(Path(directory) for directory in directories)
+                    for directories in data["directories"]]
+        for edge in data["edges"]:
+            graph.add_edge(IncludeEdge.from_json(edge, searches[edge["directories"]]))
+        return graph
@@ -0,0 +1,128 @@
+###########################################################################
+#   This is the package latexparser
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###########################################################################
+
+# copyright (c) Laurent Claessens, 2026
+# email: laurent@claessens-donadello.eu
+
+r"""Expand the \input of a LaTeX code, depth first."""
+
+from pathlib import Path
+from typing import Optional
+
+from pytex.src.LatexCode import LatexCode
+from pytex.src.InputPaths import InputPaths
+from pytex.src.ParseCache import get_parse_cache
+
+
+class InputExpander:
+    r"""
+    Recursively substitute the \input{...} of a LatexCode by the content
+    of the files.
+
+    Each file is searched once for its \addInputPath and \input. The
+    expanded form of a file is kept, keyed by its path and the
+    directories in which the \input are searched : a file which is
+    included several times is read and expanded only once.
+
+    The \input of the files whose name ends with '_thm' are not
+    substituted, and the directories given by \addInputPath are added
+    to the InputPaths, as in LatexCode.substitute_all_inputs.
+
+    With jobs > 1, the files are first parsed by 'jobs' processes
+    (see 'prefetch'); the expansion itself is the same.
+    """
+
+    def __init__(self, fast=False, jobs=1):
+        self.fast = fast
+        self.jobs = jobs
+        self._expanded: dict[tuple[Optional[Path], tuple[Path, ...]], LatexCode] = {}
+
+    def expand(self, code:LatexCode, input_paths:InputPaths)->LatexCode:
+        r"""Return a new LatexCode in which the \input of 'code' are substituted."""
+        A = LatexCode.derived(code.text_brut, code, code.comments_removed)
+        list_input = self.inputs(A, input_paths)
+        if list_input == []:
+            return code
+        # The copies of an \input have the content of the first one
+        # (see LatexCode.substitute_inputs).
+        contents = {}
+        for occurrence in list_input:
+            occurrence.input_paths = input_paths
+            if occurrence.filename.endswith("_thm"):
+                continue
+            if occurrence.as_written not in contents:
+                contents[occurrence.as_written] = self.expanded_file(occurrence,
+                                                                     input_paths)
+        new_code = A.substitute_inputs(list_input, contents)
+        new_code.input_paths = input_paths
+        return new_code
+
+    def inputs(self, code:LatexCode, input_paths:InputPaths):
+        r"""
+        Return the list of the (analysed) occurrences of \input in 'code',
+        and add the directories of its \addInputPath to 'input_paths'.
+        """
+        occurrences = code.search_use_of_macros({r"\addInputPath": 1, r"\input": 1},
+                                                fast=self.fast)
+        list_input = []
+        for occurrence in occurrences:
+            if occurrence.name == r"\addInputPath":
+                str_dir = occurrence.analyse().directory
+                input_paths.append(code.options.pwd / str_dir)
+            else:
+                list_input.append(occurrence)
+        return [occurrence.analyse() for occurrence in list_input]
+
+    def prefetch(self, code:LatexCode, input_paths:InputPaths):
+        r"""
+        Parse the files included by 'code', level by level, with 'jobs'
+        processes (see ParseCache.parse_all). The expansion then finds
+        them in the ParseCache.
+
+        A file which is not found here is simply parsed during the
+        expansion; 'input_paths' is not modified.
+        """
+        input_paths = input_paths.copy()
+        seen = set()
+        codes = [code]
+        while codes:
+            contents = []
+            for one_code in codes:
+                for occurrence in self.inputs(one_code, input_paths):
+                    if occurrence.filename.endswith("_thm"):
+                        continue
+                    try:
+                        filepath = occurrence.filepath(input_paths)
+                    except NameError:
+                        continue
+                    if filepath is None or filepath in seen:
+                        continue
+                    seen.add(filepath)
+                    contents.append(occurrence.file_content(input_paths))
+            get_parse_cache().parse_all(contents, jobs=self.jobs)
+            codes = [LatexCode.parsed(content) for content in contents]
+
+    def expanded_file(self, occurrence, input_paths:InputPaths)->LatexCode:
+        r"""
+        Return the LatexCode of the file of the given occurrence of
+        \input, in which the \input are substituted.
+        """
+        key = (occurrence.filepath(input_paths), tuple(input_paths))
+        if key not in self._expanded:
+            code = occurrence.latex_code(input_paths)
+            self._expanded[key] = self.expand(code, input_paths)
+        return self._expanded[key]
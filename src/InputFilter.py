@@ -0,0 +1,99 @@
+###########################################################################
+#   This is the package latexparser
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###########################################################################
+
+# copyright (c) Laurent Claessens, 2026
+# email: laurent@claessens-donadello.eu
+
+r"""Say which \input are kept in the intermediate code."""
+
+import re
+import fnmatch
+from typing import Optional
+
+
+# The prefix of the glob patterns in the ok/refute lists.
+GLOB_PREFIX = "glob:"
+
+
+def is_pattern(entry)->bool:
+    """Say if the entry of an ok/refute list is a pattern and not a filename."""
+    if isinstance(entry, re.Pattern):
+        return True
+    return entry.startswith(GLOB_PREFIX)
+
+
+def _scoped(regex:re.Pattern)->str:
+    """Return the pattern of 'regex' with its flags, to be put in an other one."""
+    flags = "".join(letter for letter, flag in [("i", re.IGNORECASE),
+                                                ("m", re.MULTILINE),
+                                                ("s", re.DOTALL),
+                                                ("x", re.VERBOSE)]
+                    if regex.flags & flag)
+    if flags:
+        return f"(?{flags}:{regex.pattern})"
+    return regex.pattern
+
+
+class FilenameMatcher:
+    """
+    The filenames of a list, and the patterns of the list compiled
+    into one regular expression.
+
+    An entry of the list is
+    - a filename like "chapter7/section2" : the filename has to be the
+      same, even if it contains '*', '?' or '['.
+    - a glob pattern with the prefix "glob:" like "glob:chapter7/*" (see
+      fnmatch) : the whole filename has to match. Notice that '*' also
+      matches the '/'.
+    - a compiled regular expression like re.compile(r"chapter7/.*") :
+      the whole filename has to match.
+    """
+
+    def __init__(self, entries):
+        self.filenames:set[str] = set()
+        patterns = []
+        for entry in entries:
+            if isinstance(entry, re.Pattern):
+                patterns.append(_scoped(entry))
+            elif is_pattern(entry):
+                patterns.append(fnmatch.translate(entry[len(GLOB_PREFIX):]))
+            else:
+                self.filenames.add(entry)
+        self.regex:Optional[re.Pattern] = None
+        if patterns:
+            self.regex = re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+
+    def __contains__(self, filename):
+        if filename in self.filenames:
+            return True
+        return self.regex is not None and self.regex.fullmatch(filename) is not None
+
+
+class InputFilter:
+    r"""
+    The filenames of the \input which are accepted : the ones of the
+    ok list which are not in the refute list (see FilenameMatcher).
+
+    The lists are read once, when the filter is created.
+    """
+
+    def __init__(self, ok_filenames_list, refute_filenames_list):
+        self.ok = FilenameMatcher(ok_filenames_list)
+        self.refute = FilenameMatcher(refute_filenames_list)
+
+    def accepts(self, filename)->bool:
+        return filename in self.ok and filename not in self.refute
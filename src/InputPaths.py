@@ -20,6 +20,8 @@
 
 from pathlib import Path
 
+from pytex.src.FilenameIndex import get_filename_index
+
 
 
 class InputPaths(object):
@@ -34,16 +36,27 @@ class InputPaths(object):
         assert isinstance(dirname, Path)
         self.directory_list.append(dirname)
 
+    def copy(self)->'InputPaths':
+        input_paths = InputPaths()
+        input_paths.directory_list = self.directory_list[:]
+        return input_paths
+
     def get_file(self, filename:str):
         """
         - `filename` : a file name like "foo.tex"
 
         Search in the subdirectories for a `foo.tex`
         and return the first found.
+
+        The files are looked for in the FilenameIndex of the process :
+        there is no stat for each directory. Before to raise, the
+        directories are checked again, in case the file was created
+        since they were read.
         """
-        for directory in self.directory_list:
-            filepath = directory / filename
-            if filepath.is_file():
+        index = get_filename_index()
+        for check in [False, True]:
+            filepath = index.find(self.directory_list, filename, check)
+            if filepath is not None:
                 return filepath
         raise NameError("No file found with name ", filename)
 
@@ -28,13 +28,25 @@ from pytex.src.utilities import RemoveComments
 from pytex.src.InputPaths import InputPaths
 from pytex.src.RoughSources import LatexCodeToRoughSource
 from pytex.src.MacroUse import SearchUseOfMacro
+from pytex.src.MacroUse import SearchUseOfMacros
+from pytex.src.MacroUse import paires
+from pytex.src.LatexTokens import LatexTokens
+from pytex.src.MacroCensus import MacroCensus
+from pytex.src.BraceIndex import BraceIndex
+from pytex.src.CommentIndex import CommentIndex
+from pytex.src.EditList import EditList
+from pytex.src.PieceTable import PieceTable
+from pytex.src.ParseCache import CACHED_SIGNATURES
+from pytex.src.ParseCache import get_parse_cache
+from pytex.src.SourceMap import SourceMap
+from pytex.src.SourceMap import SourceLine
 from pytex.src.utilities import dprint
 from pytex.src.utilities import ciao
 from pytex.src.getters import get_options
 _:Any = dprint, ciao
 
 if TYPE_CHECKING:
-    from pytex.src.Occurrence import Occurrence
+    from pytex.src.OccurrenceStore import OccurrenceStore
 
 
 def inherit_properties(f):
@@ -80,24 +92,153 @@ class LatexCode(object):
                 contains the tex code as given, with or without the comments, 
                 depending on 'keep_comments'
 
+        The texts can be kept as PieceTable (see 'splice'); the string
+        is made at the first use of self.text_brut.
+
         If one creates a codeLaTeX from an other, use derive_from by passing oldLaTeX to __init__
         """
-        # If you change something here, it has to be changed in append_file.
-        self.options = get_options()
+        # If you change something here, it has to be changed in append_file,
+        # in 'derived' and in 'parsed'.
+        self._options = None
         self.given_text = given_text
         if keep_comments:
-            self.text_brut = self.given_text
+            self.text_brut = given_text
         else:
             self.text_brut = RemoveComments(self.given_text)
-        self._dict_of_definition_macros = {}
-        self._list_of_input_files = []
+        # True when RemoveComments does nothing on self.text_brut.
+        self.comments_removed = not keep_comments
+        self._init_caches()
         self.filepath = filepath
+        # Where the positions come from (see SourceMap), when the code
+        # comes from a file.
+        self.source_map:Optional[SourceMap] = None
+        if filepath is not None:
+            self.source_map = SourceMap.of_text(self._text_brut, filepath)
         # When the code is created from files, the filename are recorded here.
         self.included_file_list = []
         if oldLaTeX:
             self.derive_from(oldLaTeX)
         self.input_paths = InputPaths()
 
+    def _init_caches(self):
+        self._dict_of_definition_macros = {}
+        self._list_of_input_files = []
+        self._tokens:Optional[LatexTokens] = None
+        self._brace_index:Optional[BraceIndex] = None
+        self._comment_index:Optional[CommentIndex] = None
+        # The occurrences of the macros of CACHED_SIGNATURES (see ParseCache).
+        self._cached_occurrences:Optional['OccurrenceStore'] = None
+
+    @classmethod
+    def derived(cls, text, parent:'LatexCode', comments_removed=True,
+                source_map:Optional[SourceMap]=None):
+        """
+        Return a new LatexCode with the text 'text', created from 'parent'
+        without the work of __init__.
+
+        - if 'comments_removed' is True, 'text' is known to be unchanged
+          by RemoveComments, which is not run. Else RemoveComments is
+          run once on the whole text.
+        - 'text' can be a PieceTable.
+        - the InputPaths and the included_file_list of 'parent' are shared.
+        - the options are only looked for when they are used.
+        - the occurrences given by the ParseCache to 'parent' are kept;
+          they are only used if the text is the same.
+        - 'source_map' is the SourceMap of 'text'; by default the one of
+          'parent' if 'text' is its text.
+        """
+        code = cls.__new__(cls)
+        code._options = parent._options
+        code.given_text = text
+        if source_map is None and text is parent._text_brut:
+            source_map = parent.source_map
+        code.source_map = source_map
+        if comments_removed:
+            code.text_brut = text
+        else:
+            text = str(text)
+            code.text_brut = RemoveComments(text)
+            if source_map is not None and code._text_brut != text:
+                code.source_map = source_map.without_comments(text, code.text_brut)
+        code.comments_removed = True
+        code._init_caches()
+        code._cached_occurrences = parent._cached_occurrences
+        code.filepath = None
+        code.included_file_list = parent.included_file_list
+        code.input_paths = parent.input_paths
+        return code
+
+    @classmethod
+    def parsed(cls, given_text:str, filepath:Optional[Path]=None):
+        """
+        Return the same as LatexCode(given_text, filepath), but the text
+        without comments and the occurrences of the macros of
+        CACHED_SIGNATURES are read in the ParseCache.
+        """
+        code = cls.__new__(cls)
+        code._options = None
+        code.given_text = given_text
+        code.text_brut, occurrences = get_parse_cache().parsed(given_text)
+        code.comments_removed = True
+        code._init_caches()
+        code._cached_occurrences = occurrences
+        code.filepath = filepath
+        code.source_map = None
+        if filepath is not None:
+            code.source_map = SourceMap.of_text(code._text_brut, filepath)
+        code.included_file_list = []
+        code.input_paths = InputPaths()
+        return code
+
+    def _occurrences_from_cache(self, signatures:dict[str, Optional[int]]):
+        """
+        Return the occurrences of the macros of 'signatures' given by the
+        ParseCache, or None if they are not known.
+        """
+        cached = self._cached_occurrences
+        if cached is None or cached.text is not self.text_brut:
+            return None
+        for name, number_of_arguments in signatures.items():
+            if CACHED_SIGNATURES.get(name) != number_of_arguments:
+                return None
+        return cached.restricted(signatures)
+
+    @property
+    def text_brut(self)->str:
+        if not isinstance(self._text_brut, str):
+            self._text_brut = str(self._text_brut)
+        return self._text_brut
+
+    @text_brut.setter
+    def text_brut(self, text):
+        self._text_brut = text
+
+    @property
+    def given_text(self)->str:
+        if not isinstance(self._given_text, str):
+            if self._given_text is self._text_brut:
+                self._given_text = self.text_brut
+            else:
+                self._given_text = str(self._given_text)
+        return self._given_text
+
+    @given_text.setter
+    def given_text(self, text):
+        self._given_text = text
+
+    def pieces(self)->PieceTable:
+        """Return the text of self as a PieceTable, without making the string."""
+        return PieceTable.of(self._text_brut)
+
+    def to_json(self):
+        return self.text_brut
+
+    @property
+    def options(self):
+        if self._options is None:
+            self._options = get_options()
+        return self._options
+
     def derive_from(self, oldLaTeX):
         self.included_file_list = oldLaTeX.included_file_list
 
@@ -113,8 +254,8 @@ class LatexCode(object):
         Although 'new_code' is at the beginning a 'copy', we still have to update
         by hand the input_list.
         """
-        A = LatexCode(self.text_brut)
-        A.input_paths = self.input_paths
+        A = LatexCode.derived(self.text_brut, self, self.comments_removed)
+        A.included_file_list = []
         return A
 
     def save(self, filepath:Optional[Path]=None, preamble=True):
@@ -139,6 +280,9 @@ class LatexCode(object):
         if filepath:
             self.filepath = filepath
         assert self.filepath
+        # A file which is not modified keeps its mtime.
+        if self.filepath.is_file() and self.filepath.read_text() == written_text:
+            return
         self.filepath.write_text(written_text)
 
     def get_newlabel_value(self, label_name):
@@ -149,18 +293,50 @@ class LatexCode(object):
 
         If not found, raise an newlabelNotFound exception
         """
-        list_newlabel = self.analyse_use_of_macro("\\newlabel", 2)
-        list_interesting = [x for x in list_newlabel if x.name == label_name]
+        occurrences = self.search_use_of_macro("\\newlabel", 2, fast=True)
+        # Only the interesting occurrences are created and analysed.
+        list_interesting = [occurrences[index].analyse()
+                            for index in range(len(occurrences))
+                            if occurrences.argument(index, 0) == label_name]
         if len(list_interesting) > 1:
             print("Warning : label %s has %s different values" %
                   (label_name, str(len(list_interesting))))
         return list_interesting[-1].value
 
+    def tokens(self)->LatexTokens:
+        """
+        Return the tokens of self.text_brut (see LatexTokens).
+
+        They are computed at the first call and then reused
+        by all the searches.
+        """
+        if self._tokens is None or self._tokens.text is not self.text_brut:
+            self._tokens = LatexTokens(self.text_brut)
+        return self._tokens
+
+    def brace_index(self)->BraceIndex:
+        """
+        Return the matching of the braces of self.text_brut
+        (see BraceIndex), computed at the first call.
+        """
+        if self._brace_index is None or self._brace_index.text is not self.text_brut:
+            self._brace_index = BraceIndex(self.text_brut, paires)
+        return self._brace_index
+
+    def comment_index(self)->CommentIndex:
+        """
+        Return the lines and the comments of self.text_brut
+        (see CommentIndex), computed at the first call.
+        """
+        if self._comment_index is None or self._comment_index.text is not self.text_brut:
+            self._comment_index = CommentIndex(self.text_brut)
+        return self._comment_index
+
     def search_use_of_macro(self, 
                             name:str, 
                             number_of_arguments=None, 
                             give_configuration=False, 
-                            fast=False)->list['Occurrence']:
+                            fast=False)->'OccurrenceStore':
         r"""
         Return a list of Occurrence of a given macro. You have to include the "\" in the name, for example
         codeLaTeX.search_use_of_macro("\MyMacro",2)
@@ -169,6 +345,9 @@ class LatexCode(object):
         Optional argument: number_of_arguments=None
         If no occurrence are found, return an empty list.
 
+        The list is an OccurrenceStore : the Occurrence objects are
+        created when you index or iterate it.
+
         If give_configuration is True, return a tuple of two lists.
         - The first list is the same as with give_configuration=False
         - The second gives the text between the occurrences.
@@ -181,15 +360,41 @@ class LatexCode(object):
         """
         # Why should I explicitly write the "\" in the macro name ?
         # I don't remember, but it was an issue.
+        if not give_configuration:
+            occurrences = self._occurrences_from_cache({name: number_of_arguments})
+            if occurrences is not None:
+                return occurrences
         return SearchUseOfMacro(self, name, number_of_arguments, give_configuration, fast=fast)
 
-    def analyse_use_of_macro(self, name, number_of_arguments=None):
+    def search_use_of_macros(self,
+                             signatures:dict[str, int],
+                             fast=False)->'OccurrenceStore':
+        r"""
+        Return the list (an OccurrenceStore) of Occurrence of several
+        macros, in the order of the document. The text is read only once.
+
+        - `signatures` : a dictionary {name: number_of_arguments}
+
+        Example
+        codeLaTeX.search_use_of_macros({r"\label": 1, r"\ref": 1})
+        gives the \label and the \ref; use 'occurrence.name' to know
+        which is which.
+
+        The occurrences of the macros of CACHED_SIGNATURES are read in
+        the ParseCache when the code comes from it (see 'parsed').
+        """
+        occurrences = self._occurrences_from_cache(signatures)
+        if occurrences is not None:
+            return occurrences
+        return SearchUseOfMacros(self, signatures, fast=fast)
+
+    def analyse_use_of_macro(self, name, number_of_arguments=None, fast=False):
         """
         Provide a list of analyse of the occurrences of a macro.
 
-        Optional argument: number_of_arguments=None, to be passed to search_use_of_macro
+        Optional arguments: number_of_arguments=None and fast=False, to be passed to search_use_of_macro
         """
-        return [occurrence.analyse() for occurrence in self.search_use_of_macro(name, number_of_arguments)]
+        return [occurrence.analyse() for occurrence in self.search_use_of_macro(name, number_of_arguments, fast=fast)]
 
     def macro_definition(self, name):
         return MacroDefinition(self, name)
@@ -197,6 +402,21 @@ class LatexCode(object):
     def statistics_of_the_macro(self, name):
         return StatisticsOfTheMacro(self, name)
 
+    def macro_census(self, definition_commands=None)->MacroCensus:
+        r"""
+        Return, for every control sequence of self.text_brut, its number
+        of uses, its first and last positions and its definitions
+        (see MacroCensus).
+
+        The tokens are read once : this replaces one
+        statistics_of_the_macro (a search over the whole text) for each
+        defined macro.
+
+        - `definition_commands` : the commands which define a macro.
+                                  Default : DEFINITION_COMMANDS.
+        """
+        return MacroCensus(self.tokens(), definition_commands)
+
     def dict_of_definition_macros(self):
         r"""
         Returns a dictionary which gives, for each name of macros found to be defined in self.text, the occurrence
@@ -236,7 +456,8 @@ class LatexCode(object):
         """
         - `occurrence` is the occurrence of an \input{<filename>}.
         - `substitution_text` is the text with whom we have to
-           substitute the occurrence of \input
+           substitute the occurrence of \input. It can also be a
+           LatexCode; then its SourceMap is kept.
 
         Replace the occurrence by the given substitution text
 
@@ -246,58 +467,112 @@ class LatexCode(object):
         if occurrence.filename.endswith("_thm"):
             # This is hard-coded for Giulietta
             print("Do not add", occurrence.filename)
-            return LatexCode(self.text_brut)
+            return LatexCode.derived(self._text_brut, self, self.comments_removed)
         print("Adding file", occurrence.filename)
-        A = LatexCode(self.text_brut)
-        A.included_file_list = self.included_file_list
-        A.included_file_list.append(occurrence.filename)
-        A = A.replace(occurrence.as_written, substitution_text)
-        return A
-
-    def substitute_all_inputs(self, fast=False, input_paths=None):
+        self.included_file_list.append(occurrence.filename)
+        text = substitution_text
+        text_map = None
+        if isinstance(substitution_text, LatexCode):
+            text = substitution_text.text_brut
+            text_map = substitution_text.source_map
+        A = LatexCode.derived(self.text_brut, self, self.comments_removed)
+        return A.replace(occurrence.as_written, text, text_map)
+
+    def substitute_all_inputs(self, fast=False, input_paths=None, jobs=1):
         r"""
         Recursively change all the \input{...} by the content of the corresponding file.
         Return a new object LatexCode
+
+        See InputExpander : each file is read and expanded once.
+        With jobs > 1, the files are parsed by 'jobs' processes before.
         """
-        A = LatexCode(self.text_brut)
+        from pytex.src.InputExpander import InputExpander  # avoid cyclic import
         if input_paths is None:
             input_paths = InputPaths()
+        expander = InputExpander(fast=fast, jobs=jobs)
+        if jobs > 1:
+            expander.prefetch(self, input_paths)
+        return expander.expand(self, input_paths)
 
-        # The \input macro search for the files in the directories
-        # listed in \input@path. In mazhe I define the macro
-        # \addInputPath in order to add a path in that list. We are here
-        # searching for the occurrence of \addInputPath in the file to be
-        # expanded, so that we know in which directory we have
-        # to search for the files that are inputed.
-
-        list_addInputPath = []
-        for x in A.search_use_of_macro(r"\addInputPath", 1, fast=fast):
-            dprint(f"un x est : {x} -- {type(x)}")
-            analyse = x.analyse()
-            dprint(f"son analyse est : {analyse}")
-            dprint(f"son analyse est : {type(analyse)}")
-            list_addInputPath.append(analyse)
-        for occ in list_addInputPath:
-            str_dir = occ.directory
-            abs_dir = self.options.pwd / str_dir
-            input_paths.append(abs_dir)
-        list_input = []
-        for x in A.search_use_of_macro("\input", 1, fast=fast):
-            y = x.analyse()
-            y.input_paths = input_paths
-            list_input.append(y)
-        if list_input == []:
-            return self
-        new_code = LatexCode(self.text_brut)
+    def substitute_inputs(self, list_input, contents):
+        r"""
+        Return a new LatexCode in which the occurrences of \input are
+        substituted.
+
+        - `list_input` : the Occurrence_input found in self, in the
+                         order of the document.
+        - `contents` : the dictionary {as_written: LatexCode} of the
+                       contents of the files, already expanded.
+
+        The result is the one of the successive substitute_occurrence_input
+        (each one also substitutes the copies of its occurrence, as
+        'replace' does). It is made in one pass when the joined text has
+        no comment (see _joined_inputs).
+        """
+        new_code = self._joined_inputs(list_input, contents)
+        if new_code is not None:
+            return new_code
+        new_code = self
         for occurrence in list_input:
-            file_content = occurrence.file_content(input_paths)
-            A = LatexCode(file_content)
-            B = A.substitute_all_inputs(input_paths=input_paths)
             new_code = new_code.substitute_occurrence_input(
-                occurrence, B.text_brut)
-        new_code.input_paths = input_paths
+                occurrence, contents.get(occurrence.as_written))
         return new_code
 
+    def _joined_inputs(self, list_input, contents):
+        r"""
+        Return the LatexCode of 'substitute_inputs' made in one pass over
+        the occurrences, or None if it can not be done that way : a
+        text has comments, two occurrences overlap, a content ends with
+        a '%' followed by the rest of its line, or RemoveComments changes
+        the joined text.
+
+        When RemoveComments does nothing on the joined text, the
+        successive substitutions give the same text.
+        """
+        if not self.comments_removed:
+            return None
+        text = self.text_brut
+        parts = []
+        # The (source_map, start, end) of the parts (see SourceMap.concatenated).
+        slices = []
+        turtle = 0
+        for occurrence in list_input:
+            start, end = occurrence.span()
+            if start < turtle:
+                # Inside the 'as_written' of the previous one.
+                return None
+            parts.append(text[turtle:start])
+            slices.append((self.source_map, turtle, start))
+            turtle = start
+            if occurrence.filename.endswith("_thm"):
+                continue
+            content = contents[occurrence.as_written]
+            if not content.comments_removed:
+                return None
+            pieces = content.pieces()
+            if (pieces.slice(len(pieces)-1, len(pieces)) == "%"
+                    and text[end:end+1] not in ["", "\n"]):
+                # The successive substitutions remove the rest of the line.
+                return None
+            parts.append(pieces)
+            slices.append((content.source_map, 0, len(pieces)))
+            turtle = end
+        parts.append(text[turtle:])
+        slices.append((self.source_map, turtle, len(text)))
+        joined = str(PieceTable.joined(parts))
+        if RemoveComments(joined) != joined:
+            return None
+        for occurrence in list_input:
+            if occurrence.filename.endswith("_thm"):
+                print("Do not add", occurrence.filename)
+            else:
+                print("Adding file", occurrence.filename)
+                self.included_file_list.append(occurrence.filename)
+        source_map = None
+        if any(source_map is not None for source_map, _, _ in slices):
+            source_map = SourceMap.concatenated(slices)
+        return LatexCode.derived(joined, self, True, source_map)
+
     def change_macro_argument(self, macro_name, n, func, n_args):
         r"""
         Apply the function <func> to the <n>th argument
@@ -318,10 +593,22 @@ class LatexCode(object):
         r"""
         Change \ref{MyLabel}, \eqref{MyLabel} and \label{MyLabel} applying func to the argument.
         """
-        x = self.change_macro_argument(r"\ref", 1, func, 1)
-        y = x.change_macro_argument(r"\eqref", 1, func, 1)
-        z = y.change_macro_argument(r"\label", 1, func, 1)
-        self.__init__(z.text_brut)
+        occurrences = self.search_use_of_macros(
+            {r"\ref": 1, r"\eqref": 1, r"\label": 1})
+        a = []
+        turtle = 0
+        for occurrence in occurrences:
+            if occurrence.position < turtle:
+                continue
+            as_written = occurrence.as_written
+            # What 'as_written' contains after the last argument
+            # (see SearchArguments) is kept as it is.
+            tail = as_written[as_written.rindex("}")+1:]
+            a.append(self.text_brut[turtle:occurrence.position])
+            a.append(occurrence.change_argument(1, func).as_written+tail)
+            turtle = occurrence.position+len(as_written)
+        a.append(self.text_brut[turtle:])
+        self.__init__("".join(a))
 
     def remove_macro_content(self, macro_name, number_of_arguments):
         r"""
@@ -335,12 +622,10 @@ class LatexCode(object):
 
         Return a new LatexCode object.
         """
-        A = self.copy()
-        liste_occurrences = A.search_use_of_macro(
-            macro_name, number_of_arguments)
-        for occurrence in liste_occurrences:
-            A = A.replace(occurrence.as_written, "")
-        return A
+        edits = EditList()
+        for occurrence in self.search_use_of_macro(macro_name, number_of_arguments):
+            edits.replace_occurrence(occurrence, "")
+        return self.apply_edits(edits)
 
     def remove_macro_name(self, macro_name, number_of_arguments):
         r"""
@@ -354,32 +639,90 @@ class LatexCode(object):
 
         This function only works with a macro which has only one argument.
         """
-        A = self.copy()
-        liste_occurrences = A.search_use_of_macro(
-            macro_name, number_of_arguments)
-        for occurrence in liste_occurrences:
-            A = A.replace(occurrence.as_written, occurrence.arguments[0])
-        return A
+        edits = EditList()
+        for occurrence in self.search_use_of_macro(macro_name, number_of_arguments):
+            edits.keep_argument(occurrence, 0)
+        return self.apply_edits(edits)
 
     def position_to_line(self, position):
         """
         return the line (as string) which contains the given position.
         """
-        a = self.text_brut[0:position].rindex("\n")
-        b = self.text_brut.index("\n", position)
-        return self.text_brut[a+1:b]
+        a, b = self.comment_index().line_bounds(position)
+        return self.text_brut[a:b]
+
+    def source_line(self, position)->Optional[SourceLine]:
+        """
+        Return the line of the file from which the given position comes
+        (see SourceMap), or None if it is not known.
+        """
+        if self.source_map is None:
+            return None
+        return self.source_map.source_line(position)
 
     def find(self, arg):
         return self.text_brut.find(arg)
 
     @inherit_properties
-    def replace(self, textA, textB):
+    def replace(self, textA, textB, textB_map:Optional[SourceMap]=None):
         """
         Replace textA by textB including in the comments
+
+        - `textB_map` : the SourceMap of textB, if it is known.
         """
         new_text = self.text_brut.replace(textA, textB)
-        A = LatexCode(new_text, oldLaTeX=self)
-        return A
+        source_map = None
+        if self.source_map is not None and textA != "":
+            # The positions of the textA replaced by str.replace.
+            text = self.text_brut
+            edits = []
+            position = text.find(textA)
+            while position != -1:
+                edits.append((position, position+len(textA), len(textB), textB_map))
+                position = text.find(textA, position+len(textA))
+            source_map = self.source_map.replaced(edits)
+        return LatexCode.derived(new_text, self, False, source_map)
+
+    @inherit_properties
+    def apply_edits(self, edits:EditList):
+        """
+        Make all the edits of the EditList 'edits' (offsets in self.text_brut)
+        in one pass. Return a new LatexCode.
+        """
+        new_text = edits.apply(self.text_brut)
+        source_map = None
+        if self.source_map is not None:
+            source_map = self.source_map.replaced(
+                [(start, end, len(replacement), None)
+                 for start, end, replacement in edits.applied_edits()])
+        return LatexCode.derived(new_text, self, False, source_map)
+
+    def _spliced_map(self, spans, length, text_map:Optional[SourceMap]):
+        """
+        Return the SourceMap of the text in which each [start:end]
+        of 'spans' is replaced by a text of length 'length' whose map is
+        'text_map'. Return None if there are no maps.
+        """
+        if self.source_map is None and text_map is None:
+            return None
+        source_map = self.source_map
+        if source_map is None:
+            source_map = SourceMap.concatenated([(None, 0, len(self.pieces()))])
+        return source_map.replaced([(start, end, length, text_map)
+                                    for start, end in spans])
+
+    @inherit_properties
+    def splice(self, start, end, text):
+        """
+        Return a new LatexCode in which text_brut[start:end] is replaced
+        by 'text' (a string or a PieceTable).
+
+        The texts are not copied (see PieceTable); RemoveComments is run
+        once on the new text.
+        """
+        pieces = self.pieces().replace(start, end, text)
+        return LatexCode.derived(pieces, self, False,
+                                 self._spliced_map([(start, end)], len(text), None))
 
     def splitlines(self):
         textA = self.text_brut
@@ -398,27 +741,31 @@ class LatexCode(object):
             if ".tex" not in filename:
                 filename = filename+".tex"
             new = self+FileToLatexCode(filename)
-            self.__init__(new.text_brut)
+            # The text of 'new' is already without comments.
+            self.__init__(new.pieces(), keep_comments=True)
+            self.comments_removed = True
         if filenames:
             for i in range(len(filenames)):
                 if ".tex" not in filenames[i]:
                     filenames[i] = filenames[i]+".tex"
-            a = ""
-            for f in filenames:
-                a = a+ f.read_text()
-            add_given_text = a
+            add_given_text = "".join(f.read_text() for f in filenames)
             self.__init__(self.given_text+add_given_text)
 
-    def rough_source(self, filepath:Path, bibliography_bbl_filename=None, index_ind_filename=None, fast=False):
+    def rough_source(self, filepath:Path, bibliography_bbl_filename=None, index_ind_filename=None, fast=False, jobs=1):
         """
         Return the name of a file where there is a rough latex
         code ready to be published to Arxiv
         """
         assert isinstance(filepath, Path)
         a = LatexCodeToRoughSource(
-            self, filepath, bibliography_bbl_filename, index_ind_filename, fast=fast)
+            self, filepath, bibliography_bbl_filename, index_ind_filename, fast=fast, jobs=jobs)
         return a
 
     def __add__(self, other):
-        new_given_text = self.given_text+other.given_text
-        return LatexCode(new_given_text)
+        # As LatexCode(self.given_text+other.given_text) : the texts are
+        # joined without copy, and RemoveComments is run once.
+        given_text = PieceTable.of(self._given_text)+other._given_text
+        A = LatexCode.derived(given_text, self, comments_removed=False)
+        A.given_text = given_text
+        A.included_file_list = []
+        return A
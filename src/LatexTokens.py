@@ -0,0 +1,137 @@
+###########################################################################
+#   This is the package latexparser
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###########################################################################
+
+# copyright (c) Laurent Claessens, 2026
+# email: laurent@claessens-donadello.eu
+
+"""Split a LaTeX code into a compact stream of tokens."""
+
+import re
+from array import array
+
+
+CONTROL_SEQUENCE = 0
+OPEN_BRACE = 1
+CLOSE_BRACE = 2
+OPEN_BRACKET = 3
+CLOSE_BRACKET = 4
+COMMENT = 5
+TEXT = 6
+
+# The order of the groups is the order of the kinds above :
+# the kind of a match is its 'lastindex' minus one.
+#
+# A '%' is the beginning of a comment when it is not preceded by a
+# backslash. This is the convention of 'RemoveComments' : '\%' is
+# already eaten as a control symbol, and '\\%' is not a comment.
+token_regex = re.compile(r"""
+      (\\(?:[A-Za-z@]+|.))
+    | (\{)
+    | (\})
+    | (\[)
+    | (\])
+    | ((?<!\\)%[^\n]*)
+    | ([^\\{}\[\]%]+|[\\%])
+    """, re.VERBOSE | re.DOTALL)
+
+control_word_regex = re.compile(r"\\[A-Za-z@]+")
+
+
+def is_control_word(name):
+    r"""
+    Say if 'name' is a control word like '\MyMacro', that is
+    a backslash followed by letters.
+    """
+    return control_word_regex.fullmatch(name) is not None
+
+
+class LatexTokens:
+    r"""
+    The tokens of a LaTeX code, computed in one pass over the text.
+
+    A token is a control sequence (\MyMacro, \{, \\, ...), a brace,
+    a bracket, a comment (from the '%' to the end of the line) or
+    a run of text. The tokens are not objects : they are stored
+    in parallel arrays and referenced by their index.
+
+    - self.kinds[i] is the kind of the ith token (CONTROL_SEQUENCE, ...)
+    - self.starts[i] is the offset at which the ith token begins
+      in the text. It ends where the next one begins.
+
+    Example, with the text
+    Hello \MyMacro{A}
+    the tokens are
+    "Hello " (TEXT), "\MyMacro" (CONTROL_SEQUENCE), "{" (OPEN_BRACE),
+    "A" (TEXT) and "}" (CLOSE_BRACE).
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.kinds = array("b")
+        self.starts = array("q")
+        self._control_sequences: dict[str, array] = {}
+
+        kinds = self.kinds
+        starts = self.starts
+        control_sequences = self._control_sequences
+        for match in token_regex.finditer(text):
+            kind = match.lastindex - 1
+            if kind == CONTROL_SEQUENCE:
+                name = match.group()
+                if name not in control_sequences:
+                    control_sequences[name] = array("q")
+                control_sequences[name].append(len(kinds))
+            kinds.append(kind)
+            starts.append(match.start())
+        # Sentinel : the end of the last token.
+        starts.append(len(text))
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def start(self, index):
+        """Return the offset at which the given token begins."""
+        return self.starts[index]
+
+    def end(self, index):
+        """Return the offset just after the given token."""
+        return self.starts[index+1]
+
+    def value(self, index):
+        """Return the text of the given token."""
+        return self.text[self.starts[index]:self.starts[index+1]]
+
+    def control_sequences(self, name):
+        r"""
+        Return the indices of the tokens which are the control
+        sequence 'name' (including the backslash, like '\input').
+        """
+        return self._control_sequences.get(name, array("q"))
+
+    def control_sequence_names(self):
+        """Return the names of all the control sequences in the text."""
+        return self._control_sequences.keys()
+
+    def next_of_kind(self, kind, index):
+        """
+        Return the index of the first token of the given kind
+        at or after 'index'. Return -1 if there is none.
+        """
+        try:
+            return self.kinds.index(kind, index)
+        except ValueError:
+            return -1
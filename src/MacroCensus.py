@@ -0,0 +1,162 @@
+###########################################################################
+#   This is the package latexparser
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###########################################################################
+
+# copyright (c) Laurent Claessens, 2026
+# email: laurent@claessens-donadello.eu
+
+"""Count the use of all the macros of a code in one pass."""
+
+from typing import Optional
+
+from pytex.src.LatexTokens import LatexTokens
+from pytex.src.LatexTokens import CONTROL_SEQUENCE
+from pytex.src.LatexTokens import OPEN_BRACE
+from pytex.src.LatexTokens import TEXT
+from pytex.src.LatexTokens import is_control_word
+
+
+# The commands whose first argument is the name of a defined macro.
+DEFINITION_COMMANDS = [r"\newcommand", r"\renewcommand", r"\providecommand", r"\def"]
+
+
+class MacroCount:
+    r"""
+    The use of one control sequence in a text.
+
+    - number_of_use : the number of times it is used (not counting
+                      the \newcommand{\name} which define it).
+    - first_position, last_position : the offsets of the first
+                      and the last use, or None if it is not used.
+    - definitions : the offsets of the definition commands which
+                    define it (empty if it is not defined in the text).
+    """
+
+    def __init__(self, name:str):
+        self.name = name
+        self.number_of_use = 0
+        self.first_position:Optional[int] = None
+        self.last_position:Optional[int] = None
+        self.definitions:list[int] = []
+
+    def is_defined(self):
+        return bool(self.definitions)
+
+    def __repr__(self):
+        return (f"MacroCount({self.name}, uses={self.number_of_use}, "
+                f"first={self.first_position}, last={self.last_position}, "
+                f"definitions={self.definitions})")
+
+
+def _defined_token(tokens:LatexTokens, index):
+    r"""
+    Return the index of the token which is the defined name, when the
+    token 'index' is a definition command (\newcommand{\foo},
+    \newcommand*{\foo}, \def\foo), or -1.
+    """
+    index = index+1
+    opened = False
+    while index < len(tokens):
+        kind = tokens.kinds[index]
+        if kind == CONTROL_SEQUENCE:
+            return index
+        if kind == OPEN_BRACE and not opened:
+            opened = True
+        elif kind != TEXT or tokens.value(index).strip() not in ("", "*"):
+            return -1
+        index = index+1
+    return -1
+
+
+class MacroCensus:
+    r"""
+    For each control sequence of a text, its number of uses, its first
+    and last positions and its definitions (see MacroCount).
+
+    The census is made from the tokens of the text (see LatexTokens) :
+    the text is read once, whatever the number of macros. The counts
+    are in a dictionary keyed by the name of the control sequence
+    (with its backslash, like '\MyMacro').
+
+    Example
+    census = code.macro_census()
+    census[r"\MyMacro"].number_of_use
+    census.unused_definitions()
+    """
+
+    def __init__(self, tokens:LatexTokens, definition_commands=None):
+        if definition_commands is None:
+            definition_commands = DEFINITION_COMMANDS
+        self.counts:dict[str, MacroCount] = {}
+
+        # The tokens which are the name in a definition are not uses.
+        definition_tokens = set()
+        for definer in definition_commands:
+            for index in tokens.control_sequences(definer):
+                defined = _defined_token(tokens, index)
+                if defined == -1:
+                    continue
+                definition_tokens.add(defined)
+                self._count(tokens.value(defined)).definitions.append(tokens.start(index))
+
+        for name in tokens.control_sequence_names():
+            indices = tokens.control_sequences(name)
+            if name in self.counts:
+                indices = [index for index in indices if index not in definition_tokens]
+            if not indices:
+                continue
+            count = self._count(name)
+            count.number_of_use = len(indices)
+            count.first_position = tokens.start(indices[0])
+            count.last_position = tokens.start(indices[-1])
+
+        for count in self.counts.values():
+            count.definitions.sort()
+
+    def _count(self, name)->MacroCount:
+        if name not in self.counts:
+            self.counts[name] = MacroCount(name)
+        return self.counts[name]
+
+    def __getitem__(self, name)->MacroCount:
+        """Return the count of 'name', which is zero if it does not appear."""
+        return self.counts.get(name, MacroCount(name))
+
+    def __contains__(self, name):
+        return name in self.counts
+
+    def __iter__(self):
+        return iter(self.counts.values())
+
+    def __len__(self):
+        return len(self.counts)
+
+    def defined(self)->list[MacroCount]:
+        """Return the counts of the macros defined in the text."""
+        return [count for count in self.counts.values() if count.is_defined()]
+
+    def unused_definitions(self)->list[MacroCount]:
+        """Return the counts of the macros defined in the text and never used."""
+        return [count for count in self.defined() if count.number_of_use == 0]
+
+    def undefined_uses(self)->list[MacroCount]:
+        r"""
+        Return the counts of the control words which are used but not
+        defined in the text. This contains the LaTeX macros like \section
+        and the ones of the packages.
+        """
+        return [count for count in self.counts.values()
+                if not count.is_defined() and is_control_word(count.name)]
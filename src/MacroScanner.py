@@ -0,0 +1,195 @@
+###########################################################################
+#   This is the package latexparser
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###########################################################################
+
+# copyright (c) Laurent Claessens, 2026
+# email: laurent@claessens-donadello.eu
+
+"""Search the uses of macros with one compiled regular expression."""
+
+import re
+from functools import lru_cache
+
+from pytex.src.OccurrenceStore import OccurrenceStore
+from pytex.src.MacroUse import is_escaped
+from pytex.src.MacroUse import FitArguments
+from pytex.src.MacroUse import continue_search_regex
+from pytex.src.MacroUse import definition_regex
+
+
+# What can separate the macro name and the arguments :
+# spaces, newlines and comments (see ContinueSearch).
+separator_regex = r"(?:[ \n]|%[^\n]*\n)*"
+# An optional argument without braces, backslash or comment inside.
+optional_regex = r"\[[^\[\]{}\\%]*\]"
+
+
+# A text without braces; an escaped character (like \}) is part of it.
+unbraced_regex = r"[^{}\\]*(?:\\[\s\S][^{}\\]*)*"
+
+
+def balanced_regex(depth):
+    """
+    Return a regular expression matching a text whose braces are
+    balanced and nested at most 'depth' times.
+    """
+    if depth == 0:
+        return unbraced_regex
+    inside = balanced_regex(depth-1)
+    return unbraced_regex + r"(?:\{" + inside + r"\}" + unbraced_regex + r")*"
+
+
+# The content of an argument read by the regular expression. Like
+# '{{1}{2}{Section}{x}{}}' in the '\newlabel' lines of the aux file.
+argument_regex = balanced_regex(2)
+
+
+class MacroSignature:
+    r"""
+    The shape of the uses of a macro.
+
+    - `name` : the name of the macro, like '\newlabel'.
+    - `number_of_arguments` : the number of mandatory arguments.
+    - `optional_arguments` : how many [...] can be between the name and
+                             the first argument.
+    - `spaces` : if spaces, newlines and comments can be between the
+                 name and the arguments.
+
+    The signature only says which uses are read by the regular
+    expression of MacroScanner. The other uses are fitted as in the
+    slow search, so that the result does not depend on the signature.
+    """
+
+    def __init__(self, name, number_of_arguments,
+                 optional_arguments=0, spaces=True):
+        self.name = name
+        self.number_of_arguments = number_of_arguments
+        self.optional_arguments = optional_arguments
+        self.spaces = spaces
+
+    def key(self):
+        """Return a tuple identifying the signature."""
+        return (self.name, self.number_of_arguments,
+                self.optional_arguments, self.spaces)
+
+    def regex(self, label):
+        r"""
+        Return the regular expression matching the name of the macro.
+
+        The arguments are read in a lookahead, in the groups
+        'a<label>_<i>'. The group 'args<label>' does not match when
+        the arguments have not the expected shape (braces nested too
+        deeply, text before the first argument, ...).
+        """
+        separator = separator_regex if self.spaces else ""
+        before = "(?:{}{}){{0,{}}}".format(separator, optional_regex,
+                                         self.optional_arguments)
+        arguments = separator.join(
+            r"\{{(?P<a{}_{}>{})\}}".format(label, i, argument_regex)
+            for i in range(self.number_of_arguments))
+        if self.number_of_arguments < 1:
+            # Always fitted by FitArguments.
+            arguments = "(?!)"
+        return r"(?P<m{label}>{name})(?![A-Za-z@])(?=(?P<args{label}>{before}{separator}{arguments}))?".format(
+            label=label, name=re.escape(self.name), before=before,
+            separator=separator, arguments=arguments)
+
+
+class MacroScanner:
+    r"""
+    Search the uses of several macros in one pass over a LaTeX code.
+
+    The result is the same as SearchUseOfMacros without 'fast' : the
+    macros in comments and the escaped ones (\\label) are skipped,
+    the first argument is the first opening brace after the name, and
+    'as_written' is computed the same way.
+
+    Most of the uses have arguments with few nested braces. These are
+    read by the regular expression. The others are fitted by
+    MacroUse.FitArguments.
+    """
+
+    def __init__(self, signatures):
+        self.signatures = list(signatures)
+        self.regex = re.compile("|".join(
+            signature.regex(label)
+            for label, signature in enumerate(self.signatures)))
+        # The last group of a match tells which signature matched :
+        # 'args<label>' when the arguments are read by the regular
+        # expression, 'm<label>' when they are not.
+        # self._groups[group] is the tuple (signature, numbers of
+        # the groups of the arguments).
+        self._groups = {}
+        groupindex = self.regex.groupindex
+        for label, signature in enumerate(self.signatures):
+            arguments = [groupindex["a{}_{}".format(label, i)]
+                         for i in range(signature.number_of_arguments)]
+            self._groups["m{}".format(label)] = (signature, None)
+            self._groups["args{}".format(label)] = (signature, arguments)
+
+    def search(self, code):
+        """Return the OccurrenceStore of the uses, in the order of the document."""
+        s = code.text_brut
+        use = OccurrenceStore(s)
+        comment_index = None
+        has_comments = "%" in s
+        length = len(s)
+        groups = self._groups
+        continue_search = continue_search_regex.match
+        definition = definition_regex.match
+        for result in self.regex.finditer(s):
+            signature, arguments = groups[result.lastgroup]
+            position = result.start()
+            name_end = position+len(signature.name)
+            if name_end >= length:
+                continue
+            if position > 0 and s[position-1] == "\\" and is_escaped(s, position):
+                continue
+            if has_comments:
+                if comment_index is None:
+                    comment_index = code.comment_index()
+                if comment_index.in_comment(position):
+                    continue
+            if arguments is None:
+                spans, end = FitArguments(code, signature.name, name_end,
+                                          signature.number_of_arguments)
+            else:
+                end = result.end(arguments[-1])+1
+                spans = [result.span(group) for group in arguments]
+                # Where the occurrence ends; see FitArguments.
+                if end < length and s[end] != "{":
+                    next_argument = continue_search(s, end)
+                    if next_argument:
+                        end = next_argument.end()-2
+            # The following test excludes the cases when we fit the \newcommand{\MyMacro}
+            if definition(s, name_end, end):
+                continue
+            use.append(signature.name, position, end, spans)
+        return use
+
+
+@lru_cache(maxsize=64)
+def _compiled_scanner(keys):
+    return MacroScanner(MacroSignature(*key) for key in keys)
+
+
+def get_scanner(signatures):
+    """
+    Return the MacroScanner of a list of MacroSignature.
+
+    The scanners are compiled once and reused.
+    """
+    return _compiled_scanner(tuple(signature.key() for signature in signatures))
@@ -19,7 +19,9 @@
 # email: laurent@claessens-donadello.eu
 
 import re
-from pytex.src.Occurrence import Occurrence
+import heapq
+from pytex.src.OccurrenceStore import OccurrenceStore
+from pytex.src.LatexTokens import is_control_word
 from pytex.src.utilities import dprint
 
 paires = { "{":"}","[":"]","`":"'"}
@@ -31,8 +33,8 @@ def compactization(text,accepted_between_arguments):
     return text
 
 
-def SearchFitBrace(text,position,opening):
-    """
+def SearchFitBrace(text,position,opening,brace_index=None,offset=0):
+    r"""
     return a tuple containing the text withing the next pair of open/close brace and the position where the pair closes in text
 
     As an example, consider the string
@@ -40,20 +42,41 @@ def SearchFitBrace(text,position,opening):
     SearchFitBrace(s,4,["(",")"])
     returns ('Louis', 6, 12)
     because the next brace begins at position 6, finishes at position 12 and the text within in "Louis"
+
+    If brace_index (a BraceIndex) is given, the closing brace is read in it instead of
+    being searched. In that case, 'text' is the end of the indexed text,
+    from the position 'offset'.
+
+    An escaped brace (\{, see is_escaped) neither opens nor closes.
+    Return None if there is no fitting brace.
     """
     close = paires[opening]
     level = 0
-    giventext = text[position:]
-    startPosition = position+giventext.find(opening)
+    startPosition = text.find(opening,position)
+    while startPosition != -1 and is_escaped(text,startPosition):
+        startPosition = text.find(opening,startPosition+1)
+    if startPosition == -1:
+        return None
+    if brace_index is not None:
+        i = brace_index.match(offset+startPosition)
+        if i == -1:
+            return None
+        i = i-offset
+        return text[startPosition+1:i],startPosition,i
     for i in range(startPosition,len(text)):
-        if text[i] == opening :
+        character = text[i]
+        if character != opening and character != close :
+            continue
+        if text[i-1] == "\\" and is_escaped(text,i):
+            continue
+        if character == opening :
             level = level+1
-        if text[i] == close :
+        else :
             level = level-1
         if level == 0:
             return text[startPosition+1:i],startPosition,i
 
-def ContinueSearch(s,opening):
+def ContinueSearch(s,opening,position=0):
     r"""
     Given the string s and the position s, return True if there is still a good candidate.
     A «good» candidate is an opening bracket which is separated from the previous closing one by only elements of accepted_between_arguments. It does not takes into accounts stuff between a % and a \n
@@ -65,29 +88,45 @@ def ContinueSearch(s,opening):
     s=" \n % blahblah \n { other  "
     ContinueSearch(s,"{")
     return True and the offset of the last opening bracket
+
+    If 'position' is given, the search begins there (s is not sliced) and
+    the offset is counted from 'position'.
     """
     close = paires[opening]
-    turtle = 0
+    turtle = position
     while turtle < len(s):
         if s[turtle]=="%":
-            a=s[turtle:]
-            pos = a.find("\n")
-            if pos == -1:
+            turtle = s.find("\n",turtle)
+            if turtle == -1:
                 return False,-1
-            turtle = turtle+pos
         if s[turtle] == opening :
-            return True,turtle
+            return True,turtle-position
         if s[turtle] not in accepted_between_arguments :
             return False,-1
         else :
             turtle=turtle+1
     return False,-1
 
-def SearchArguments(s,number_of_arguments):
+def SearchArguments(s,number_of_arguments,brace_index=None,offset=0):
     r"""
     From a string of the form {A}...{B}...{C}, returns the list ["A","B","C"] where the dots are elements of the list accepted_between_arguments.
     Inside A,B and C you can have anything including the elements of the list accepted_between_arguments.
     It is important that the string s begins on an opening bracket «{»
+
+    brace_index and offset are passed to SearchFitBrace.
+    """
+    spans,end = SearchArgumentSpans(s,number_of_arguments,brace_index,offset)
+    return [s[start:stop] for start,stop in spans],s[0:end]
+
+def SearchArgumentSpans(s,number_of_arguments,brace_index=None,offset=0,position=0):
+    r"""
+    Same as SearchArguments, but return the positions instead of the strings :
+    a tuple (spans,end) where spans is the list of the (start,end) of the
+    arguments in s and s[0:end] is as_written.
+
+    If 'position' is given, the arguments are read in s[position:] without
+    slicing s : the positions are counted from 'position', and brace_index
+    is an index of s itself (the offset is then 0).
     """
     # The way it works
     # Let be the string s=«{A}...{B}...{C}»                     (1)
@@ -100,30 +139,29 @@ def SearchArguments(s,number_of_arguments):
     # at the end, as_written is then set as the string s[0:end] where end is the last closing bracket.
     # The string s itself is never changed and all the positions of characters are computed as offset inside s.
     turtle = 0
-    arguments = []
-    while len(arguments) < number_of_arguments :
-        try :
-            arg,start,end=SearchFitBrace(s,turtle,"{")
-        except :
+    spans = []
+    while len(spans) < number_of_arguments :
+        fit = SearchFitBrace(s,position+turtle,"{",brace_index,offset)
+        if fit is None :
             print("latexparser Error : fitting brace not found")
             print("We were at position %s in the string"%str(turtle))
             print(s)
             print("------------------------------")
-            raise
-        arguments.append(arg)
+            raise ValueError("Fitting brace not found")
+        arg,start,end = fit
+        start,end = start-position,end-position
+        spans.append((start+1,end))
         turtle=end+1
-        if turtle >= len(s):
-            as_written = s
-            return arguments,as_written
-        if s[turtle] != "{":
-            boo,offset = ContinueSearch(s[turtle:],"{")
+        if position+turtle >= len(s):
+            return spans,len(s)-position
+        if s[position+turtle] != "{":
+            boo,continue_offset = ContinueSearch(s,"{",position+turtle)
             if boo:
-                turtle=turtle+offset-1
-            if (not boo) or (len(arguments)==number_of_arguments):
-                as_written = s[0:turtle]
-                return arguments,as_written
+                turtle=turtle+continue_offset-1
+            if (not boo) or (len(spans)==number_of_arguments):
+                return spans,turtle
 
-def NextMacroCandidate(s,macro_name,search_macro_name=None):
+def NextMacroCandidate(s,macro_name,search_macro_name=None,comment_index=None,position=0):
     """
     return the a tuple (boolean,integer,boolena) saying
     1. if macro_name is present in string s
@@ -131,9 +169,20 @@ def NextMacroCandidate(s,macro_name,search_macro_name=None):
     3. if this is in a comment  (False if there are no matching macro)
 
     This macro does not return results that are inside comments.
+
+    If comment_index (a CommentIndex of s) is given, the search begins
+    at 'position' in s (s is not sliced), the returned position is
+    the position in s and the comment is read in the index.
     """
     if search_macro_name==None:
         search_macro_name=re.compile(re.escape(macro_name)+"[^A-Za-z]").search
+    if comment_index is not None:
+        result=search_macro_name(s,position)
+        if not result :
+            return False,-1,False
+        k=result.start()
+        return True,k,comment_index.in_comment(k)
+
     result=search_macro_name(s)
     if not result :
         return False,-1,False
@@ -152,6 +201,160 @@ def NextMacroCandidate(s,macro_name,search_macro_name=None):
         return True,k,True
     return True,k,False
 
+# What can separate two arguments : spaces, newlines and comments
+# (see ContinueSearch)
+continue_search_regex = re.compile(r"(?:[ \n]|%[^\n]*\n)*\{")
+# The test that excludes the \newcommand{\MyMacro} (see SearchUseOfMacro)
+definition_regex = re.compile(r"[ \n%]*\}")
+
+
+def is_escaped(s,position):
+    r"""
+    Say if the character at 'position' in s is escaped, that is
+    preceded by an odd number of backslashes (like '\{' but not '\\{').
+    """
+    start = position
+    while start > 0 and s[start-1] == "\\":
+        start = start-1
+    return (position-start)%2 == 1
+
+def FirstOpeningBrace(code,position):
+    r"""
+    Return the offset (in code.text_brut) of the first opening brace
+    at or after 'position' which is neither escaped nor in a comment.
+    Return -1 if there are none.
+
+    This is the first OPEN_BRACE token of code.tokens() after 'position',
+    without tokenizing the text.
+    """
+    s = code.text_brut
+    comment_index = None
+    position = s.find("{",position)
+    while position != -1 :
+        if not is_escaped(s,position):
+            if comment_index is None :
+                comment_index = code.comment_index()
+            if not comment_index.in_comment(position):
+                return position
+        position = s.find("{",position+1)
+    return -1
+
+def FitArguments(code,macro_name,name_end,number_of_arguments):
+    r"""
+    Same as SearchArguments, but working on the offsets of code.text_brut
+    instead of slicing the text. The closing braces are read in
+    code.brace_index().
+
+    'name_end' is the offset just after the macro name.
+
+    Return a tuple (spans,end) where spans is the list of the (start,end)
+    of the arguments and 'end' is the offset at which the occurrence ends
+    (all the offsets are in code.text_brut).
+    """
+    s = code.text_brut
+    brace_index = code.brace_index()
+    arguments = []
+    # As in SearchArguments, the first argument is the first opening
+    # bracket after the macro name, whatever is between.
+    position = FirstOpeningBrace(code,name_end)
+    while True:
+        close = -1
+        if position != -1 :
+            close = brace_index.match(position)
+        if close == -1 :
+            print("latexparser Error : fitting brace not found")
+            print("We were at position %s in the string"%str(name_end))
+            raise ValueError("Fitting brace not found for %s"%macro_name)
+        arguments.append((position+1,close))
+        turtle = close+1
+        if turtle >= len(s):
+            return arguments,len(s)
+        if s[turtle] == "{" and len(arguments) < number_of_arguments:
+            position = turtle
+            continue
+        if s[turtle] == "{":
+            return arguments,turtle
+        result = continue_search_regex.match(s,turtle)
+        if not result:
+            return arguments,turtle
+        position = result.end()-1
+        if len(arguments) == number_of_arguments:
+            # SearchArguments stops one character before the next
+            # opening bracket. We keep the same 'as_written'.
+            return arguments,position-1
+
+def _tagged(indices,macro_name):
+    for index in indices:
+        yield index,macro_name
+
+def SearchUseOfMacrosFromTokens(code,signatures):
+    r"""
+    Return the OccurrenceStore of the macros of 'signatures' in code,
+    answered from the tokens of code (see LatexTokens).
+
+    signatures : a dictionary {macro_name:number_of_arguments} where
+            the names are control words.
+
+    The tokens are computed once for the whole text; then each macro
+    costs only its own occurrences.
+
+    The result is the same as the one of the loop in SearchUseOfMacro,
+    up to the following : '\\label' is the control symbol '\\' followed
+    by the text 'label', not the macro '\label'.
+    """
+    s = code.text_brut
+    tokens = code.tokens()
+    use = OccurrenceStore(s)
+    indices = heapq.merge(*[_tagged(tokens.control_sequences(macro_name),macro_name)
+        for macro_name in signatures])
+    for index,macro_name in indices:
+        position = tokens.start(index)
+        name_end = tokens.end(index)
+        # The name has to be followed by something.
+        if name_end >= len(s):
+            continue
+        spans,end = FitArguments(code,macro_name,name_end,signatures[macro_name])
+        # The following test excludes the cases when we fit the \newcommand{\MyMacro}
+        if definition_regex.match(s,name_end,end):
+            continue
+        use.append(macro_name,position,end,spans)
+    return use
+
+def SearchUseOfMacros(code,signatures,fast=False):
+    r"""
+    Return the OccurrenceStore of several macros, in the order
+    in which they appear in the document.
+
+    signatures : a dictionary {macro_name:number_of_arguments}, like
+            {r"\label":1,r"\ref":1,r"\eqref":1}
+
+    The text is tokenized once (see LatexCode.tokens); each macro then
+    only costs its own occurrences. You distinguish the macros
+    with Occurrence.name.
+
+    If fast is true, all the macros are searched with one regular
+    expression (see MacroScanner). The result is the same. This is only
+    done when all the macro names are control words.
+    """
+    # As in SearchUseOfMacro, the macros which are not in the text
+    # cost nothing.
+    signatures = {macro_name:number_of_arguments
+            for macro_name,number_of_arguments in signatures.items()
+            if macro_name in code.text_brut}
+    if not signatures:
+        return OccurrenceStore(code.text_brut)
+    control_words = all(is_control_word(macro_name) for macro_name in signatures)
+    if fast and control_words:
+        from pytex.src.MacroScanner import MacroSignature   # avoid cyclic import
+        from pytex.src.MacroScanner import get_scanner
+        return get_scanner([MacroSignature(macro_name,number_of_arguments)
+                for macro_name,number_of_arguments in signatures.items()]).search(code)
+    if control_words:
+        return SearchUseOfMacrosFromTokens(code,signatures)
+    stores = [SearchUseOfMacro(code,macro_name,number_of_arguments)
+            for macro_name,number_of_arguments in signatures.items()]
+    return OccurrenceStore.merged(code.text_brut,stores)
+
 def SearchUseOfMacro(code,macro_name,number_of_arguments=None,give_configuration=False,fast=False):
     r"""
     <macro_name> has to contain the initial \ of the macro. I you want to search 
@@ -180,58 +383,49 @@ def SearchUseOfMacro(code,macro_name,number_of_arguments=None,give_configuration
             \MyMacro {argument} (with a space between \MyMacro and the first opening bracket)
         will be buggy.
 
-    If fast is true, make more assumptions on the LaTeX code. Like no space, no \ and no {} inside or between the arguments.
-             Only works with exactly one argument up to now :
+    If fast is true, the arguments are read by a compiled regular expression
+    (see MacroScanner). The result is the same. In that case,
+    number_of_arguments defaults to 1.
     """
     assert give_configuration==False
     use=[]
     s = code.text_brut
     if fast :
+        return SearchUseOfMacros(code,{macro_name:number_of_arguments or 1},fast=True)
 
-        e_macro_name=re.escape(macro_name)
-        results=re.finditer(e_macro_name+"{",s)
-
-        for res in results :
-            start = res.start()
-            # Only works with exactly one argument up to now :
-            end=s.find("}",start)
-            as_written = s[start:end]           # This as_written contains the macro name; in the non-fast version, it does not contain.
-            arguments=[s[start+len(macro_name):end]]
-            occurrence=Occurrence(macro_name,arguments,as_written,position=start)
-            use.append(occurrence)
-        return use
+    if not macro_name in s :
+        return OccurrenceStore(s)
+    if is_control_word(macro_name):
+        return SearchUseOfMacrosFromTokens(code,{macro_name:number_of_arguments})
 
     search_macro_name=re.compile(re.escape(macro_name)+"[^A-Za-z@]").search
-    if not macro_name in s :
-        return []
     turtle = 0
     config_turtle=0
-    remaining = s
-    use = []
+    use = OccurrenceStore(s)
     configuration=[]
     boo=True
+    comment_index = code.comment_index()
     while boo:
-        remaining=s[turtle:]
-        boo,offset,in_comment = NextMacroCandidate(remaining,macro_name,search_macro_name=search_macro_name)
+        boo,k,in_comment = NextMacroCandidate(s,macro_name,search_macro_name,comment_index,turtle)
         if boo :
-            turtle = turtle+offset+len(macro_name)
-            remaining = s[turtle:]
+            turtle = k+len(macro_name)
             if not in_comment :
                 try :
-                    arguments,as_written = SearchArguments(remaining,number_of_arguments)
+                    spans,end = SearchArgumentSpans(s,number_of_arguments,code.brace_index(),0,turtle)
                 except TypeError:
                     print(number_of_arguments)
-                    print(remaining[0:30])
+                    print(s[turtle:turtle+30])
                     raise
                 position=turtle-len(macro_name)
-                occurrence=Occurrence(macro_name,arguments,macro_name+as_written,position=turtle-len(macro_name))
+                as_written=macro_name+s[turtle:turtle+end]
 
                 # The following test excludes the cases when we fit the \newcommand{\MyMacro}
-                test=compactization(occurrence.as_written,accepted_between_arguments)
+                test=compactization(as_written,accepted_between_arguments)
                 if test[len(macro_name)] != "}":
-                    configuration.append(code.text_brut[config_turtle:occurrence.position])
-                    use.append(occurrence)
-                config_turtle=position+len(occurrence.as_written)
+                    configuration.append(code.text_brut[config_turtle:position])
+                    use.append(macro_name,position,turtle+end,
+                            [(turtle+start,turtle+stop) for start,stop in spans])
+                config_turtle=position+len(as_written)
         else :      # if not boo
             if give_configuration:
                 configuration.append(code.text_brut[config_turtle:])
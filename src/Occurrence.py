@@ -33,16 +33,84 @@ class Occurrence(object):
         and then \MyMacro{second}
 
         the first occurrence of \MyMacro has position=12
+
+    An Occurrence can also be a view on an OccurrenceStore (see
+    Occurrence.from_store). Then the arguments and 'as_written' are only
+    read in the text when they are asked for.
     """
+    __slots__ = ("name", "position", "_arguments",
+                 "_as_written", "_store", "_index")
 
     def __init__(self, name, arguments, as_written="", position=0):
+        self._store = None
         self.arguments = arguments
-        self.number_of_arguments = len(arguments)
         self.name = name
         self.as_written = as_written
-        self.arguments_list = arguments
         self.position = position
 
+    @classmethod
+    def from_store(cls, store, index):
+        """Return the occurrence number 'index' of the OccurrenceStore 'store'."""
+        occurrence = cls.__new__(cls)
+        occurrence.name = store.names[store.name_ids[index]]
+        occurrence.position = store.starts[index]
+        occurrence._arguments = None
+        occurrence._as_written = None
+        occurrence._store = store
+        occurrence._index = index
+        return occurrence
+
+    @property
+    def arguments(self):
+        if self._arguments is None:
+            self._arguments = self._store.arguments(self._index)
+        return self._arguments
+
+    @arguments.setter
+    def arguments(self, arguments):
+        self._arguments = arguments
+
+    arguments_list = arguments
+
+    @property
+    def number_of_arguments(self):
+        return len(self.arguments)
+
+    @property
+    def as_written(self):
+        if self._as_written is None:
+            self._as_written = self._store.as_written(self._index)
+        return self._as_written
+
+    @as_written.setter
+    def as_written(self, as_written):
+        self._as_written = as_written
+
+    def span(self):
+        """
+        Return the tuple (start, end) of the offsets of the occurrence
+        in the text : text[start:end] is 'as_written'.
+        """
+        if self._store is not None:
+            return self.position, self._store.ends[self._index]
+        return self.position, self.position+len(self.as_written)
+
+    def argument_span(self, number):
+        """
+        Return the tuple (start, end) of the offsets of the argument
+        'number' (from 0) in the text.
+        """
+        if self._store is not None:
+            return self._store.argument_span(self._index, number)
+        # Without store, the argument is searched in 'as_written'.
+        length = len(self.arguments[number])
+        turtle = len(self.name)
+        for argument in self.arguments[:number+1]:
+            turtle = self.as_written.index("{"+argument+"}", turtle)+1
+            start = self.position+turtle
+            turtle = turtle+len(argument)+1
+        return start, start+length
+
     def configuration(self):
         r"""
         Return the way the arguments are separated in as_written.
@@ -113,9 +181,9 @@ class Occurrence_newlabel(object):
             self.value, self.page, self.section_name, self.fourth, self.fifth = (
                 None, None, None, None, None)
         else:
-            self.name = self.arguments[0][0]
-            self.listoche = [a[0]
-                             for a in SearchArguments(self.arguments[1][0], 5)[0]]
+            from pytex.src.MacroUse import SearchArguments  # avoid cyclic import
+            self.name = self.arguments[0]
+            self.listoche = SearchArguments(self.arguments[1], 5)[0]
             self.value = self.listoche[0]
             self.page = self.listoche[1]
             self.section_name = self.listoche[2].replace(r"\relax", "")
@@ -190,11 +258,9 @@ class Occurrence_input(Occurrence):
         See the macro `\addInputPath` in the file
         https://github.com/LaurentClaessens/mazhe/blob/master/configuration.tex
         """
-        excluded = ["\\", "#"]
-        for c in excluded:
-            if c in self.filename:
-                print("I do not include the filename ", self.filename)
-                return ""
+        if self.excluded():
+            print("I do not include the filename ", self.filename)
+            return ""
 
         # Memoize
         if self._file_content is not None:
@@ -204,14 +270,9 @@ class Occurrence_input(Occurrence):
         if input_paths is None:
             raise  # Just to know who should do something like that
 
-        # Creating the filename
-        filename = self.filename
-        strict_filename = filename
-        if "." not in filename:
-            strict_filename = filename+".tex"
-
+        strict_filename = self.strict_filename()
         # Searching for the correct file in the subdirectories
-        fn = input_paths.get_file(strict_filename)
+        fn = self.filepath(input_paths)
         try:
             # Without [:-1] I got an artificial empty line at the end.
             text = "".join(codecs.open(fn, "r", encoding="utf8"))[:-1]
@@ -220,3 +281,31 @@ class Occurrence_input(Occurrence):
             raise
         self._file_content = text
         return self._file_content
+
+    def latex_code(self, input_paths):
+        """
+        Return the LatexCode of file_content(input_paths), whose
+        parsing is read in the ParseCache (see LatexCode.parsed).
+        """
+        from pytex.src.LatexCode import LatexCode     # avoid cyclic import
+        return LatexCode.parsed(self.file_content(input_paths),
+                                filepath=self.filepath(input_paths))
+
+    def excluded(self):
+        """Say if the filename has characters that say it is not a file (see file_content)."""
+        return any(c in self.filename for c in ["\\", "#"])
+
+    def strict_filename(self):
+        """Return the filename, with the '.tex' extension when it has none."""
+        if "." not in self.filename:
+            return self.filename+".tex"
+        return self.filename
+
+    def filepath(self, input_paths):
+        """
+        Return the path of the file, searched in the directories
+        of 'input_paths'. Return None if the filename is excluded.
+        """
+        if self.excluded():
+            return None
+        return input_paths.get_file(self.strict_filename())
@@ -0,0 +1,188 @@
+###########################################################################
+#   This is the package latexparser
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###########################################################################
+
+# copyright (c) Laurent Claessens, 2026
+# email: laurent@claessens-donadello.eu
+
+"""The occurrences of macros, stored as offsets in the text."""
+
+import heapq
+from array import array
+
+from pytex.src.Occurrence import Occurrence
+
+
+class OccurrenceStore:
+    """
+    A list of occurrences of macros in a text, stored in columns of offsets.
+
+    - self.starts[i], self.ends[i] : text[starts[i]:ends[i]] is the
+      'as_written' of the ith occurrence.
+    - self.name_ids[i] : the name of the ith occurrence is
+      self.names[name_ids[i]].
+    - the arguments of the ith occurrence are the
+      text[argument_starts[j]:argument_ends[j]] for j from
+      first_argument[i] to first_argument[i+1].
+
+    No string is copied when an occurrence is added. Indexing or iterating
+    creates the Occurrence objects on demand; they read their
+    arguments and 'as_written' in the store.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.names: list[str] = []
+        self._name_ids: dict[str, int] = {}
+        self.name_ids = array("i")
+        self.starts = array("q")
+        self.ends = array("q")
+        self.argument_starts = array("q")
+        self.argument_ends = array("q")
+        self.first_argument = array("q", [0])
+
+    def append(self, name, start, end, argument_spans):
+        """
+        Add the occurrence text[start:end] of the macro 'name'.
+
+        - `argument_spans` : a list of tuples (start, end), one by argument.
+        """
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = len(self.names)
+            self._name_ids[name] = name_id
+            self.names.append(name)
+        self.name_ids.append(name_id)
+        self.starts.append(start)
+        self.ends.append(end)
+        for argument_start, argument_end in argument_spans:
+            self.argument_starts.append(argument_start)
+            self.argument_ends.append(argument_end)
+        self.first_argument.append(len(self.argument_starts))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index = index+len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("occurrence index out of range")
+        return Occurrence.from_store(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield Occurrence.from_store(self, index)
+
+    def name(self, index):
+        """Return the name of the macro of the given occurrence."""
+        return self.names[self.name_ids[index]]
+
+    def position(self, index):
+        """Return the offset of the given occurrence in the text."""
+        return self.starts[index]
+
+    def as_written(self, index):
+        """Return the given occurrence as it is written in the text."""
+        return self.text[self.starts[index]:self.ends[index]]
+
+    def argument(self, index, number):
+        """Return the argument 'number' (from 0) of the given occurrence."""
+        start, end = self.argument_span(index, number)
+        return self.text[start:end]
+
+    def argument_span(self, index, number):
+        """
+        Return the tuple (start, end) such that text[start:end] is the
+        argument 'number' (from 0) of the given occurrence.
+        """
+        j = self.first_argument[index]+number
+        if not self.first_argument[index] <= j < self.first_argument[index+1]:
+            raise IndexError("argument index out of range")
+        return self.argument_starts[j], self.argument_ends[j]
+
+    def arguments(self, index):
+        """Return the list of the arguments of the given occurrence."""
+        text = self.text
+        return [text[self.argument_starts[j]:self.argument_ends[j]]
+                for j in range(self.first_argument[index],
+                               self.first_argument[index+1])]
+
+    def indices(self, name):
+        """Return the indices of the occurrences of the macro 'name'."""
+        name_id = self._name_ids.get(name)
+        return [index for index in range(len(self))
+                if self.name_ids[index] == name_id]
+
+    def append_from(self, other, index):
+        """Add the occurrence 'index' of the store 'other' (on the same text)."""
+        first = other.first_argument[index]
+        last = other.first_argument[index+1]
+        self.append(other.name(index), other.starts[index], other.ends[index],
+                    zip(other.argument_starts[first:last],
+                        other.argument_ends[first:last]))
+
+    def restricted(self, names):
+        """Return the store of the occurrences of the macros 'names' only."""
+        name_ids = {self._name_ids[name] for name in names if name in self._name_ids}
+        store = OccurrenceStore(self.text)
+        for index in range(len(self)):
+            if self.name_ids[index] in name_ids:
+                store.append_from(self, index)
+        return store
+
+    def columns(self):
+        """
+        Return the tuple (names, columns) where 'columns' are the
+        arrays of the store as bytes (see 'from_columns').
+        """
+        return self.names[:], tuple(column.tobytes() for column in
+                                    (self.name_ids, self.starts, self.ends,
+                                     self.argument_starts, self.argument_ends,
+                                     self.first_argument))
+
+    @classmethod
+    def from_columns(cls, text, names, columns):
+        """Return the store on 'text' given by the output of 'columns'."""
+        store = cls(text)
+        store.names = list(names)
+        store._name_ids = {name: name_id for name_id, name in enumerate(names)}
+        arrays = (store.name_ids, store.starts, store.ends, store.argument_starts,
+                  store.argument_ends, store.first_argument)
+        del store.first_argument[:]
+        for column, data in zip(arrays, columns):
+            column.frombytes(data)
+        return store
+
+    @classmethod
+    def merged(cls, text, stores):
+        """
+        Return the store containing the occurrences of all the given
+        stores (on the same text), in the order of their positions.
+        """
+        store = cls(text)
+        keyed = [_keyed_positions(number, other)
+                 for number, other in enumerate(stores)]
+        for _, number, index in heapq.merge(*keyed):
+            store.append_from(stores[number], index)
+        return store
+
+
+def _keyed_positions(number, store):
+    for index in range(len(store)):
+        yield store.starts[index], number, index
@@ -0,0 +1,299 @@
+###########################################################################
+#   This is the package latexparser
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###########################################################################
+
+# copyright (c) Laurent Claessens, 2026
+# email: laurent@claessens-donadello.eu
+
+"""The texts without comments and their occurrences, kept on disk."""
+
+import os
+import sys
+import hashlib
+import marshal
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from pytex.src.OccurrenceStore import OccurrenceStore
+from pytex.src.utilities import default_cache_directory
+from pytex.src.utilities import quiet_output
+
+
+# Change this number when RemoveComments, the search of the macros
+# or the format of the files change : the old files are then ignored.
+PARSE_CACHE_VERSION = 2
+
+# The size (number of characters of the texts) of the entries kept in
+# memory, and the size (bytes) of the files kept on disk. Beyond, the
+# entries used the least recently are dropped.
+MAX_MEMORY_SIZE = 64*2**20
+MAX_DISK_SIZE = 256*2**20
+
+# The macros whose occurrences are kept, with their number of arguments.
+CACHED_SIGNATURES = {r"\input": 1,
+                     r"\addInputPath": 1,
+                     r"\label": 1,
+                     r"\ref": 1,
+                     r"\eqref": 1,
+                     r"\cite": 1,
+                     r"\newcommand": 3,
+                     r"\renewcommand": 3}
+
+
+class ParseCache:
+    r"""
+    For each text, keyed by the sha1 of the text, the text without
+    comments (see RemoveComments) and the occurrences of the macros of
+    CACHED_SIGNATURES (an OccurrenceStore).
+
+    The entries are kept in memory, and in the files
+    <directory>/v<version>/<sha1> (marshal format). A file written by
+    an other version of the cache or of Python is ignored and rewritten.
+    If the directory is None or can not be written, only the memory
+    is used. If 'enabled' is False, nothing is kept : each text is
+    parsed again (see PYTEX_NO_PARSE_CACHE in get_parse_cache).
+
+    A text which was not modified is never parsed again, whatever the
+    file it comes from. The texts are the ones of the files, not the
+    expanded documents. Both are bounded :
+    - in memory, the entries used the least recently are dropped when
+      their texts have more than 'max_memory_size' characters.
+    - on disk, the files read the least recently are removed when they
+      have more than 'max_disk_size' bytes (see 'prune'). This is checked
+      at the first write of the process, then each time a quarter of
+      'max_disk_size' is written.
+    """
+
+    def __init__(self, directory:Optional[Path]=None,
+                 max_memory_size=MAX_MEMORY_SIZE, max_disk_size=MAX_DISK_SIZE,
+                 enabled=True):
+        self.enabled = enabled
+        self.version = (PARSE_CACHE_VERSION, marshal.version, sys.version_info[:2])
+        self.directory = directory
+        if directory is not None:
+            self.directory = directory / f"v{PARSE_CACHE_VERSION}"
+        self.max_memory_size = max_memory_size
+        self.max_disk_size = max_disk_size
+        # key -> (text_brut, occurrences), the least recently used first
+        self._entries: OrderedDict[str, tuple[str, Optional[OccurrenceStore]]] = OrderedDict()
+        self._memory_size = 0
+        # The builds of RunBatch and of the server share the cache.
+        self._lock = threading.Lock()
+        # The bytes written since the last 'prune'; None before the first one.
+        self._written_size: Optional[int] = None
+
+    def parsed(self, text:str)->tuple[str, Optional[OccurrenceStore]]:
+        """
+        Return the tuple (text_brut, occurrences) where text_brut is
+        RemoveComments(text) and 'occurrences' the OccurrenceStore of the
+        macros of CACHED_SIGNATURES in text_brut (None if they can not
+        be searched).
+        """
+        if not self.enabled:
+            return _entry(text, parsed_data(text))
+        key = _key(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        entry = self._read(key, text)
+        if entry is None:
+            data = parsed_data(text)
+            self._write(key, data)
+            entry = _entry(text, data)
+        self._add(key, entry)
+        return entry
+
+    def parse_all(self, texts, jobs=1):
+        """
+        Make the entries of all the 'texts'. The ones which are
+        neither in memory nor on disk are parsed by 'jobs' processes.
+
+        The processes cost their start and the transfer of the texts :
+        jobs > 1 only pays off for large trees, on several cores.
+        """
+        if not self.enabled:
+            return
+        missing: dict[str, str] = {}
+        for text in texts:
+            key = _key(text)
+            if key in self._entries or key in missing:
+                continue
+            entry = self._read(key, text)
+            if entry is None:
+                missing[key] = text
+            else:
+                self._add(key, entry)
+        if jobs <= 1 or len(missing) <= 1:
+            all_data = map(parsed_data, missing.values())
+            self._add_all(missing, all_data)
+            return
+        # The workers only send back the offsets (see parsed_data).
+        chunksize = max(1, len(missing)//(4*jobs))
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            all_data = executor.map(parsed_data, missing.values(), chunksize=chunksize)
+            self._add_all(missing, all_data)
+
+    def _add_all(self, texts:dict[str, str], all_data):
+        for (key, text), data in zip(texts.items(), all_data):
+            self._write(key, data)
+            self._add(key, _entry(text, data))
+
+    def _add(self, key, entry):
+        """Keep the entry in memory, and drop the oldest ones beyond max_memory_size."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            self._entries[key] = entry
+            self._memory_size += len(entry[0])
+            # The last entry is kept, even if it is too large alone.
+            while self._memory_size > self.max_memory_size and len(self._entries) > 1:
+                _, (text_brut, _) = self._entries.popitem(last=False)
+                self._memory_size -= len(text_brut)
+
+    def _filepath(self, key)->Optional[Path]:
+        if self.directory is None:
+            return None
+        return self.directory / key[:2] / key
+
+    def _read(self, key, text):
+        filepath = self._filepath(key)
+        if filepath is None or not filepath.is_file():
+            return None
+        try:
+            version, *data = marshal.loads(filepath.read_bytes())
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if version != self.version:
+            return None
+        # The modification time says when the file was used (see 'prune').
+        try:
+            os.utime(filepath)
+        except OSError:
+            pass
+        return _entry(text, data)
+
+    def _write(self, key, data):
+        filepath = self._filepath(key)
+        if filepath is None:
+            return
+        try:
+            filepath.parent.mkdir(parents=True, exist_ok=True)
+            tmp_filepath = filepath.with_suffix(f".{os.getpid()}.tmp")
+            content = marshal.dumps((self.version, *data))
+            tmp_filepath.write_bytes(content)
+            os.replace(tmp_filepath, filepath)
+        except OSError:
+            self.directory = None
+            return
+        if self._written_size is not None:
+            self._written_size += len(content)
+        if self._written_size is None or self._written_size > self.max_disk_size//4:
+            self.prune()
+
+    def prune(self):
+        """
+        Remove the files of the cache read or written the least recently,
+        until they have at most max_disk_size bytes.
+        """
+        self._written_size = 0
+        if self.directory is None:
+            return
+        files = []
+        total_size = 0
+        for filepath in self.directory.glob("*/*"):
+            if filepath.suffix == ".tmp":
+                # Being written by a process.
+                continue
+            try:
+                stat = filepath.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime_ns, stat.st_size, filepath))
+            total_size += stat.st_size
+        files.sort()
+        for _, size, filepath in files:
+            if total_size <= self.max_disk_size:
+                break
+            try:
+                filepath.unlink()
+            except OSError:
+                continue
+            total_size -= size
+
+
+def _key(text):
+    return hashlib.sha1(text.encode("utf8")).hexdigest()
+
+
+def parsed_data(text:str):
+    """
+    Parse 'text' and return the tuple (text_brut, names, columns) :
+    - text_brut : RemoveComments(text), or None if it is 'text'.
+    - names, columns : the OccurrenceStore of the macros of
+      CACHED_SIGNATURES (see OccurrenceStore.columns), or None, None if
+      they can not be searched.
+
+    This is what is written on disk, and what the worker processes
+    of ParseCache.parse_all send back.
+    """
+    # avoid cyclic import
+    from pytex.src.LatexCode import LatexCode
+    code = LatexCode(text)
+    # A macro of CACHED_SIGNATURES whose arguments are not closed is
+    # not an error here : the occurrences are not kept, and the
+    # error is raised by the search which asks for this macro.
+    try:
+        with quiet_output():
+            occurrences = code.search_use_of_macros(CACHED_SIGNATURES, fast=True)
+    except ValueError:
+        occurrences = None
+    text_brut = code.text_brut
+    names, columns = None, None
+    if occurrences is not None:
+        names, columns = occurrences.columns()
+    return None if text_brut == text else text_brut, names, columns
+
+
+def _entry(text, data):
+    """Return the tuple (text_brut, occurrences) given by parsed_data(text)."""
+    text_brut, names, columns = data
+    if text_brut is None:
+        text_brut = text
+    if names is None:
+        return text_brut, None
+    return text_brut, OccurrenceStore.from_columns(text_brut, names, columns)
+
+
+_parse_cache: Optional[ParseCache] = None
+
+
+def get_parse_cache()->ParseCache:
+    """
+    Return the ParseCache of the process, in default_cache_directory().
+    It is disabled when the environment variable PYTEX_NO_PARSE_CACHE is
+    set (and not "0").
+    """
+    global _parse_cache
+    if _parse_cache is None:
+        enabled = os.environ.get("PYTEX_NO_PARSE_CACHE", "") in ["", "0"]
+        _parse_cache = ParseCache(default_cache_directory(), enabled=enabled)
+    return _parse_cache
@@ -0,0 +1,162 @@
+###########################################################################
+#   This is the package latexparser
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###########################################################################
+
+# copyright (c) Laurent Claessens, 2026
+# email: laurent@claessens-donadello.eu
+
+"""A text made of pieces of other texts, joined only when it is read."""
+
+from bisect import bisect_right
+from itertools import accumulate
+
+
+class PieceTable:
+    """
+    A text as a list of pieces (string, start, end) : the text is the
+    concatenation of the string[start:end].
+
+    A PieceTable is not modified : 'replace' returns a new one, which
+    shares the strings with the old one. Replacing a part of the text
+    by an other text (typically the content of an \\input file) does
+    not copy the text; the flat string is only made by 'str'.
+    """
+
+    def __init__(self, text=""):
+        self.pieces: list[tuple[str, int, int]] = []
+        if text:
+            self.pieces.append((text, 0, len(text)))
+        self._compute_offsets()
+
+    @classmethod
+    def of(cls, text):
+        """Return 'text' if it is a PieceTable, and its PieceTable else."""
+        if isinstance(text, PieceTable):
+            return text
+        return cls(text)
+
+    @classmethod
+    def joined(cls, texts):
+        """Return the PieceTable of the concatenation of 'texts' (strings or PieceTable)."""
+        pieces = []
+        for text in texts:
+            if isinstance(text, PieceTable):
+                pieces.extend(text.pieces)
+            elif text:
+                pieces.append((text, 0, len(text)))
+        return cls._from_pieces(pieces)
+
+    @classmethod
+    def _from_pieces(cls, pieces):
+        table = cls.__new__(cls)
+        table.pieces = pieces
+        table._compute_offsets()
+        return table
+
+    def _compute_offsets(self):
+        # self.offsets[i] is the position of the ith piece in the text.
+        self.offsets = list(accumulate((end-start for _, start, end in self.pieces),
+                                       initial=0))
+        self.length = self.offsets.pop()
+
+    def __len__(self):
+        return self.length
+
+    def __str__(self):
+        return "".join(text[start:end] for text, start, end in self.pieces)
+
+    def _cut(self, position):
+        """
+        Return the lists of the pieces before and after 'position'.
+        The piece containing 'position' is found by bisection.
+        """
+        index = bisect_right(self.offsets, position)-1
+        if index < 0:
+            return [], self.pieces[:]
+        text, start, end = self.pieces[index]
+        middle = start+position-self.offsets[index]
+        before = self.pieces[:index]
+        after = self.pieces[index+1:]
+        if middle > start:
+            before.append((text, start, middle))
+        if middle < end:
+            after.insert(0, (text, middle, end))
+        return before, after
+
+    def replace(self, start, end, text):
+        """
+        Return the PieceTable in which [start:end] is replaced by
+        'text' (a string or a PieceTable).
+        """
+        before, _ = self._cut(start)
+        _, after = self._cut(end)
+        return PieceTable._from_pieces(before+PieceTable.of(text).pieces+after)
+
+    def __add__(self, other):
+        return PieceTable._from_pieces(self.pieces+PieceTable.of(other).pieces)
+
+    def slice(self, start, end):
+        """Return the string text[start:end]."""
+        if start >= end:
+            return ""
+        _, after = self._cut(start)
+        pieces = []
+        length = end-start
+        for text, piece_start, piece_end in after:
+            piece_end = min(piece_end, piece_start+length)
+            pieces.append(text[piece_start:piece_end])
+            length = length-(piece_end-piece_start)
+            if length == 0:
+                break
+        return "".join(pieces)
+
+    def line_bounds(self, position):
+        """
+        Return the tuple (start, end) of the offsets of the line
+        containing 'position', without its '\\n'.
+        """
+        index = bisect_right(self.offsets, position)-1
+        line_start = 0
+        for i in range(index, -1, -1):
+            text, start, end = self.pieces[i]
+            stop = end if i < index else start+position-self.offsets[i]
+            found = text.rfind("\n", start, stop)
+            if found != -1:
+                line_start = self.offsets[i]+found-start+1
+                break
+        line_end = self.length
+        for i in range(max(index, 0), len(self.pieces)):
+            text, start, end = self.pieces[i]
+            begin = start if i > index else start+position-self.offsets[i]
+            found = text.find("\n", begin, end)
+            if found != -1:
+                line_end = self.offsets[i]+found-start
+                break
+        return line_start, line_end
+
+    def __contains__(self, sub):
+        # 'sub' can be cut between several pieces : the last len(sub)-1
+        # characters of the text already seen are kept in 'tail'.
+        width = len(sub)-1
+        tail = ""
+        for text, start, end in self.pieces:
+            if text.find(sub, start, end) != -1:
+                return True
+            if width > 0:
+                if sub in tail+text[start:min(end, start+width)]:
+                    return True
+                tail = (tail+text[max(start, end-width):end])[-width:]
+        return False
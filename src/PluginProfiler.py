@@ -0,0 +1,141 @@
+###########################################################################
+#   This is the package latexparser
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###########################################################################
+
+# copyright (c) Laurent Claessens, 2026
+# email: laurent@claessens-donadello.eu
+
+"""The time and the memory taken by each plugin."""
+
+import gc
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+from pytex.src.utilities import human_timestamp
+from pytex.src.utilities import write_json_file
+
+
+def plugin_name(fun)->str:
+    """Return a readable name of the function (or callable object) of a plugin."""
+    defining = fun if hasattr(fun, "__qualname__") else type(fun)
+    return f"{getattr(defining, '__module__', '')}.{defining.__qualname__}"
+
+
+def _size(argument)->Optional[int]:
+    """Return the length of the text given to or returned by a plugin, if it is a text."""
+    if isinstance(argument, str):
+        return len(argument)
+    text_brut = getattr(argument, "text_brut", None)
+    if isinstance(text_brut, str):
+        return len(text_brut)
+    return None
+
+
+def _collections()->int:
+    return sum(stats["collections"] for stats in gc.get_stats())
+
+
+class PluginRecord:
+    """
+    One call to a plugin :
+    - wall, cpu : the elapsed and the CPU time (seconds).
+    - size_in, size_out : the length of the text given to the plugin and
+                          of the one it returns (None if it is not a text,
+                          like for the 'options' hook).
+    - allocated_blocks : the number of memory blocks still allocated
+                         after the call minus before (sys.getallocatedblocks).
+    - collections : the number of garbage collections during the call.
+    """
+
+    def __init__(self, hook_name, name):
+        self.hook_name = hook_name
+        self.name = name
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.size_in:Optional[int] = None
+        self.size_out:Optional[int] = None
+        self.allocated_blocks = 0
+        self.collections = 0
+
+    def to_json(self):
+        return {"hook": self.hook_name,
+                "plugin": self.name,
+                "wall": self.wall,
+                "cpu": self.cpu,
+                "size_in": self.size_in,
+                "size_out": self.size_out,
+                "allocated_blocks": self.allocated_blocks,
+                "collections": self.collections}
+
+
+class PluginProfiler:
+    """
+    Measure each call to a plugin (see 'run') and write the report of
+    the run (see 'finish').
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.records:list[PluginRecord] = []
+
+    def run(self, hook_name, fun, argument):
+        """Return fun(argument), and record the call."""
+        record = PluginRecord(hook_name, plugin_name(fun))
+        record.size_in = _size(argument)
+        blocks = sys.getallocatedblocks()
+        collections = _collections()
+        cpu = time.process_time()
+        wall = time.perf_counter()
+        try:
+            answer = fun(argument)
+        finally:
+            record.wall = time.perf_counter()-wall
+            record.cpu = time.process_time()-cpu
+            record.allocated_blocks = sys.getallocatedblocks()-blocks
+            record.collections = _collections()-collections
+            self.records.append(record)
+        record.size_out = _size(answer)
+        return answer
+
+    def slowest(self, number=3)->list[PluginRecord]:
+        return sorted(self.records, key=lambda record: record.wall, reverse=True)[:number]
+
+    def summary(self)->str:
+        """Return one line with the total time and the slowest plugins."""
+        total = sum(record.wall for record in self.records)
+        slowest = ", ".join(f"{record.name} ({record.hook_name}) {record.wall:.3f}s"
+                            for record in self.slowest())
+        return f"Plugins : {len(self.records)} calls, {total:.3f}s. Slowest : {slowest}"
+
+    def to_json(self):
+        return {"started": human_timestamp(self.started),
+                "total_wall": sum(record.wall for record in self.records),
+                "total_cpu": sum(record.cpu for record in self.records),
+                "plugins": self.records}
+
+    def finish(self, filepath:Path):
+        """
+        Write the report in 'filepath' and print the summary, if a plugin
+        was called. The next report begins with the next call.
+        """
+        if not self.records:
+            return
+        write_json_file(self.to_json(), filepath, pretty=True)
+        print(self.summary())
+        self.started = time.time()
+        self.records = []
@@ -0,0 +1,191 @@
+###########################################################################
+#   This is the package latexparser
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###########################################################################
+
+# copyright (c) Laurent Claessens, 2026
+# email: laurent@claessens-donadello.eu
+
+"""What the last pytex file was made from."""
+
+import json
+import inspect
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Optional
+
+from pytex.src.utilities import get_file_hash
+from pytex.src.utilities import json_to_str
+
+
+def _object_parameters(obj):
+    """
+    Return the attributes of 'obj' and, for a Mapping (like a CodeBox),
+    its items : they are not in vars().
+    """
+    parameters = [vars(obj) if hasattr(obj, "__dict__") else repr(obj)]
+    if isinstance(obj, Mapping):
+        # The keys are not always strings.
+        parameters.append(sorted([repr(key), value] for key, value in obj.items()))
+    return parameters
+
+
+def plugin_identity(plugin)->str:
+    """
+    Return a string which changes when the plugin changes : its name,
+    the hash of the file in which it is written and its parameters
+    (the attributes and the items of an object, the default values and
+    the closure of a function).
+
+    When the parameters are objects without readable representation,
+    the string changes at each run : the pytex file is always made
+    again, which is the safe side.
+    """
+    fun = plugin.fun
+    if inspect.isfunction(fun) or inspect.ismethod(fun):
+        parameters = [fun.__defaults__,
+                      [cell.cell_contents for cell in fun.__closure__ or []]]
+        if inspect.ismethod(fun):
+            parameters.append(_object_parameters(fun.__self__))
+        defining = fun
+    else:
+        parameters = _object_parameters(fun)
+        defining = type(fun)
+    name = f"{getattr(defining, '__module__', '')}.{getattr(defining, '__qualname__', repr(defining))}"
+    try:
+        source_hash = get_file_hash(Path(inspect.getsourcefile(defining)))
+    except (TypeError, OSError):
+        source_hash = None
+    return json_to_str([plugin.hook_name, name, source_hash, parameters])
+
+
+class PytexManifest:
+    r"""
+    The inputs from which the pytex file (Inter_*_pytex.tex) was made :
+
+    - request : the prefix, the original file, the ok and refute
+                lists and the --all option.
+    - plugins : the identities of the plugins (see plugin_identity).
+    - files : for each file reachable from the original file by \input
+              (see Options.include_graph), its sha1. The mtime and the
+              size are kept in order not to read again the files which
+              are not modified.
+
+    and the state of the pytex file itself (mtime, size, sha1), and the
+    random base of its \UseCorrectionFile.
+
+    The files read by the plugins themselves are not followed.
+    """
+
+    version = 1
+
+    def __init__(self):
+        self.request: dict = {}
+        self.plugins: list[str] = []
+        # path -> [mtime_ns, size, sha1]
+        self.files: dict[str, list] = {}
+        self.output: Optional[list] = None
+        self.random_base: Optional[str] = None
+
+    @classmethod
+    def from_options(cls, options, previous:Optional['PytexManifest']=None)->'PytexManifest':
+        """
+        Return the manifest of the current inputs of 'options'.
+
+        The sha1 of the files whose mtime and size are the same as in
+        'previous' are taken from it.
+        """
+        manifest = cls()
+        manifest.request = {"prefix": options.prefix,
+                            "original_file": str(options.original_file),
+                            "ok_filenames_list": [str(entry) for entry in options.ok_filenames_list],
+                            "refute_filenames_list": [str(entry) for entry in options.refute_filenames_list],
+                            "all": options.Compil.tout}
+        manifest.plugins = [plugin_identity(plugin)
+                            for plugin in options.my_request.plugin_list]
+        filepaths = set(options.include_graph().files())
+        filepaths.add(Path(options.original_file))
+        for filepath in sorted(filepaths):
+            key = str(filepath)
+            known = None
+            if previous is not None:
+                known = previous.files.get(key)
+            manifest.files[key] = _file_state(filepath, known)
+        return manifest
+
+    def inputs(self):
+        """Return what has to be the same for the pytex file to be the same."""
+        return {"request": self.request,
+                "plugins": self.plugins,
+                "files": {key: state[2] for key, state in self.files.items()}}
+
+    def matches(self, other:Optional['PytexManifest'])->bool:
+        """Say if 'other' has the same inputs."""
+        if other is None:
+            return False
+        return json_to_str(self.inputs()) == json_to_str(other.inputs())
+
+    def is_output(self, filepath:Path)->bool:
+        """Say if 'filepath' is (still) the pytex file made from this manifest."""
+        if self.output is None or self.output[2] is None:
+            return False
+        return _file_state(filepath, self.output)[2] == self.output[2]
+
+    def set_output(self, filepath:Path, random_base:str):
+        """Record the pytex file, once written."""
+        self.output = _file_state(filepath, None)
+        self.random_base = random_base
+
+    def save(self, filepath:Path):
+        data = {"version": self.version,
+                "request": self.request,
+                "plugins": self.plugins,
+                "files": self.files,
+                "output": self.output,
+                "random_base": self.random_base}
+        filepath.write_text(json.dumps(data, indent=1))
+
+    @classmethod
+    def load(cls, filepath:Path)->Optional['PytexManifest']:
+        """
+        Return the manifest saved in 'filepath', or None if the file does
+        not exist or was written by an other version.
+        """
+        if not filepath.is_file():
+            return None
+        try:
+            data = json.loads(filepath.read_text())
+        except ValueError:
+            return None
+        if data.get("version") != cls.version:
+            return None
+        manifest = cls()
+        manifest.request = data["request"]
+        manifest.plugins = data["plugins"]
+        manifest.files = data["files"]
+        manifest.output = data["output"]
+        manifest.random_base = data["random_base"]
+        return manifest
+
+
+def _file_state(filepath:Path, known:Optional[list])->list:
+    """Return [mtime_ns, size, sha1] of the file; the sha1 is None if there is no file."""
+    try:
+        stat = filepath.stat()
+    except OSError:
+        return [None, None, None]
+    if known is not None and known[0] == stat.st_mtime_ns and known[1] == stat.st_size:
+        return known
+    return [stat.st_mtime_ns, stat.st_size, get_file_hash(filepath)]
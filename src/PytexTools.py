@@ -24,23 +24,38 @@ Contains tools intended to create good plugins for pytex.
 
 import os
 import sys
-import shutil
-import subprocess
-import contextlib
+import threading
 from pathlib import Path
 from xml.dom import minidom
 
 from typing import Callable
+from typing import Optional
 
 from pytex.src.utilities import get_file_hash
 from pytex.src.LatexCode import LatexCode
+from pytex.src.EditList import EditList
 from pytex.create_bbl import get_bbl_code
+from pytex.create_bbl import get_labels
 from pytex.src.utilities import read_json_file
+from pytex.src.getters import get_options
+from pytex.src.StepRunner import Step
+from pytex.src.StepRunner import StepRunner
+from pytex.src.StepRunner import file_hashes
+from pytex.src.StepRunner import copy_if_different
 
 
 dprint = print
 
 
+# The time (seconds) after which a step of the compilation is stopped.
+# The function steps (bbl, copies) have no timeout : a thread can not
+# be stopped.
+DEFAULT_TIMEOUTS = {"latex": 3600,
+                    "makeindex": 300,
+                    "sort_index": 300,
+                    "nomenclature": 300}
+
+
 class Compilation(object):
     """
     Launch the compilation of a document in various ways.
@@ -50,13 +65,17 @@ class Compilation(object):
     If set to True, the compilations are not actually done,
     but the command line is printed.
 
+    The programs are run by a StepRunner : the output of each one is
+    written in <file>.<step>.log, and it is stopped after
+    timeouts[<step>] seconds (see DEFAULT_TIMEOUTS).
+
     Usage examples
     X=Compilation("MyLaTeXFile.tex") # Creates the Compilation object
     X.bibtex()                       # Apply bibtex
     X.chain_dvi_ps_pdf()             # Produce the pdf file
     """
 
-    def __init__(self, filename, nocompilation=False):
+    def __init__(self, filename, nocompilation=False, timeouts=None):
         self.filename = filename
         self.nocompilation = nocompilation
         self.dirname = os.path.dirname(self.filename)
@@ -64,72 +83,161 @@ class Compilation(object):
         self.generic_basename = self.basename[:self.basename.rindex(".")]
         self.generic_filename = os.path.join(
             self.dirname, self.generic_basename)
+        # step name -> seconds (see DEFAULT_TIMEOUTS)
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.runner = StepRunner(Path(self.generic_filename), nocompilation)
 
-    def do_it(self, commande_e):
-        commande_e = commande_e.encode("utf8")
-        print("*** external :", commande_e)
-        if self.nocompilation:
-            print("not executed")
-        else:
-            os.system(commande_e)
+    def _step(self, name, command=None, **kwargs)->Step:
+        timeout = None if command is None else self.timeouts.get(name)
+        return Step(name, command, timeout=timeout, **kwargs)
+
+    def do_it(self, commande_e, name="external"):
+        """
+        Run the command line by the shell (redirections, pipes, ...
+        work as with os.system); its output is in <file>.<name>.log.
+        """
+        return self.runner.run([self._step(name, commande_e)])
+
+    def _file(self, extension)->Path:
+        return Path(f"{self.generic_basename}{extension}").resolve()
+
+    def _install_step(self, name, tmp_file:Path, out_file:Path)->Step:
+        """The step which copies 'tmp_file' to 'out_file', if they are different."""
+        return self._step(name,
+                          function=lambda: copy_if_different(tmp_file, out_file),
+                          when=tmp_file.is_file,
+                          description=f"copy {tmp_file.name} to {out_file.name}",
+                          inputs=lambda: file_hashes([tmp_file]),
+                          outputs=[out_file])
+
+    def bibtex_step(self, options)->Step:
+        def inputs():
+            bibliography = options.my_request.bibliography
+            return [get_labels(self._file(".aux")),
+                    file_hashes([Path(bibliography["json_bib"]),
+                                 Path(bibliography["template_bbl"])])]
+        return self._step("bbl", function=lambda: self.bibtex(options),
+                          description=f"bbl from {self.generic_basename}.aux",
+                          inputs=inputs,
+                          outputs=[self._file(".bbl")])
 
     def bibtex(self, options):
+        """Write the bbl file, unless it is already the right one."""
         bibliography = options.my_request.bibliography
         aux_file = Path(f"{self.generic_basename}.aux")
         json_bib = read_json_file(bibliography["json_bib"])
         bbl_template = Path(bibliography["template_bbl"])
         bbl_code = get_bbl_code(aux_file, json_bib, bbl_template)
         out_filepath = Path(f"{self.generic_basename}.bbl")
+        if out_filepath.is_file() and out_filepath.read_text() == bbl_code:
+            return
         out_filepath.write_text(bbl_code)
 
+    def makeindex_step(self, ind_file:Path)->Step:
+        """
+        makeindex writes 'ind_file' from the .idx file. Its transcript is
+        <file>.ilg, and the one of the nomenclature is <file>.nlg :
+        the two makeindex may run concurrently (see special_stuffs).
+        """
+        idx_file = self._file(".idx")
+        return self._step("makeindex",
+                          ["makeindex", "-t", str(self._file(".ilg")),
+                           "-o", str(ind_file), str(idx_file)],
+                          when=idx_file.is_file,
+                          inputs=lambda: file_hashes([idx_file]),
+                          outputs=[ind_file])
+
     def makeindex(self):
-        commande_e = "makeindex "+self.generic_basename
-        self.do_it(commande_e)
+        """Run makeindex alone : the .ind file is not sorted (see 'index')."""
+        return self.runner.run([self.makeindex_step(self._file(".ind"))])
 
-    def sort_index(self):
+    def index_steps(self)->list[Step]:
+        """
+        makeindex writes <file>_raw.ind, which is sorted in <file>_tmp.ind,
+        which is copied to the .ind file if it is a new one.
+        """
+        raw_ind_file = self._file("_raw.ind")
+        return [self.makeindex_step(raw_ind_file),
+                *self.sort_index_steps(raw_ind_file)]
+
+    def index(self):
+        """Make the sorted .ind file : makeindex, then sort_index."""
+        results = self.runner.run(self.index_steps())
+        self._check_sort_index(results)
+        return results
+
+    def sort_index_steps(self, raw_ind_file:Optional[Path]=None)->list[Step]:
         """
         Sort the index.
 
         Contribution:
         https://github.com/LaurentClaessens/mazhe/issues/162
         """
-        ind_file = Path(f"{self.generic_basename}.ind").resolve()
-        tmp_ind_file = Path(f"{self.generic_basename}_tmp.ind").resolve()
+        ind_file = self._file(".ind")
+        if raw_ind_file is None:
+            raw_ind_file = ind_file
+        tmp_ind_file = self._file("_tmp.ind")
         here = Path(__file__).resolve()
         lua_sort = here.parent / "sort_ind.lua"
-        myinput = open(ind_file, 'r')
-        myoutput = open(tmp_ind_file, 'w')
-        try:
-            subprocess.call(["luatex", lua_sort],
-                            stdin=myinput,
-                            stdout=myoutput)
-        except FileNotFoundError:
-            print("luatex not found. Please write me. I can fix it.")
-            sys.exit(1)
-        finally:
-            myinput.close()
-            myoutput.close()
-        shutil.copy(tmp_ind_file, ind_file)
+        # The first time, the file 'ind' does not exist
+        return [self._step("sort_index", ["luatex", str(lua_sort)],
+                           stdin=raw_ind_file, stdout=tmp_ind_file,
+                           when=raw_ind_file.is_file,
+                           inputs=lambda: file_hashes([raw_ind_file, lua_sort]),
+                           outputs=[tmp_ind_file]),
+                self._install_step("sort_index_copy", tmp_ind_file, ind_file)]
+
+    def sort_index(self):
+        self._check_sort_index(self.runner.run(self.sort_index_steps()))
+
+    @staticmethod
+    def _check_sort_index(results):
+        for result in results:
+            if result.name == "sort_index" and isinstance(result.error, FileNotFoundError):
+                print("luatex not found. Please write me. I can fix it.")
+                sys.exit(1)
+
+    def nomenclature_steps(self)->list[Step]:
+        nlo_file = self._file(".nlo")
+        tmp_nls_file = self._file("_tmp.nls")
+        return [self._step("nomenclature",
+                           ["makeindex", "-s", "nomencl.ist",
+                            "-t", str(self._file(".nlg")),
+                            "-o", str(tmp_nls_file), str(nlo_file)],
+                           when=nlo_file.is_file,
+                           inputs=lambda: file_hashes([nlo_file]),
+                           outputs=[tmp_nls_file]),
+                self._install_step("nomenclature_copy", tmp_nls_file,
+                                   self._file(".nls"))]
 
     def nomenclature(self):
-        commande_e = "makeindex -s nomencl.ist -o " + \
-            self.generic_basename+".nls "+self.generic_basename+".nlo"
-        self.do_it(commande_e)
+        return self.runner.run(self.nomenclature_steps())
 
     def special_stuffs(self, options):
-        self.bibtex(options)
-        self.makeindex()
-        self.nomenclature()
-        with contextlib.suppress(FileNotFoundError):
-            # The first time, the file 'ind' does not exist
-            self.sort_index()
+        """
+        Make the bibliography, the index (then sort it) and the
+        nomenclature. They do not depend on each other : they are
+        made concurrently.
+
+        A step whose inputs (the citations of the .aux, the .idx, the
+        .nlo, ...) did not change since the last time is not done again,
+        and a file which would be the same is not written again (see
+        StepRunner).
+        """
+        results = self.runner.run([self.bibtex_step(options)],
+                                  self.index_steps(),
+                                  self.nomenclature_steps())
+        self._check_sort_index(results)
+        return results
 
     def latex(self):
-        program = u"lualatex -synctex=1   -shell-escape"
-        # The following line does not work
-        # without the u"...". Even if {0} and {1} are type unicode
-        commande_e = u"""{0} {1} """.format(program, self.filename)
-        self.do_it(commande_e)
+        command = ["lualatex", "-synctex=1", "-shell-escape", str(self.filename)]
+        results = self.runner.run([self._step("latex", command)])
+        if not results[0].is_ok():
+            # The last lines of the output say what went wrong.
+            lines = results[0].log_filename.read_text(errors="replace").splitlines()
+            print("\n".join(lines[-20:]))
+        return results
 
     def latex_more(self, options):
         self.special_stuffs(options)
@@ -215,7 +323,8 @@ class CodeBox(dict):
         return a new object LatexCode
         """
         A = codeLaTeX.copy()
-        liste_occurrences = A.search_use_of_macro(self.put_macro, 2)
+        edits = EditList()
+        liste_occurrences = A.search_use_of_macro(self.put_macro, 2, fast=True)
         for occurrence in liste_occurrences:
             tags = occurrence.arguments[0].split(",")
             if tags == [""] or tag in tags:
@@ -225,15 +334,15 @@ class CodeBox(dict):
                     B = self[label]
                     # This function is recursive !
                     B = self.put(B, tag)
-                    A = A.replace(occurrence.as_written, B.text_brut)
+                    edits.replace_occurrence(occurrence, B.text_brut)
                 except IndexError:
                     print(r"PytexTools error : \Put... needs "
                           "two arguments. Don't forget the tag")
                     print(occurrence.as_written)
                     raise
             else:
-                A = A.replace(occurrence.as_written, "")
-        return A
+                edits.replace_occurrence(occurrence, "")
+        return A.apply_edits(edits)
 
 
 def FileToCodeBox(filename:Path, boxname):
@@ -258,15 +367,15 @@ def PytexNotIn(name, codeLaTeX):
     the symmetric of PytexOnlyIn
     """
     A = codeLaTeX.copy()
-    occurrences = A.search_use_of_macro(r"\PytexNotIn", 2)
+    edits = EditList()
+    occurrences = A.search_use_of_macro(r"\PytexNotIn", 2, fast=True)
     for occurrence in occurrences:
         tags = occurrence.arguments[0].split(",")
         if name not in tags:
-            code = occurrence.arguments[1]
-            A = A.replace(occurrence.as_written, code)
+            edits.keep_argument(occurrence, 1)
         else:
-            A = A.replace(occurrence.as_written, "")
-    return A
+            edits.replace_occurrence(occurrence, "")
+    return A.apply_edits(edits)
 
 
 def PytexOnlyIn(name, codeLaTeX):
@@ -280,15 +389,15 @@ def PytexOnlyIn(name, codeLaTeX):
     This acts like some inline CodeBox
     """
     A = codeLaTeX.copy()
-    occurrences = A.search_use_of_macro(r"\PytexOnlyIn", 2)
+    edits = EditList()
+    occurrences = A.search_use_of_macro(r"\PytexOnlyIn", 2, fast=True)
     for occurrence in occurrences:
         tags = occurrence.arguments[0].split(",")
         if name in tags:
-            code = occurrence.arguments[1]
-            A = A.replace(occurrence.as_written, code)
+            edits.keep_argument(occurrence, 1)
         else:
-            A = A.replace(occurrence.as_written, "")
-    return A
+            edits.replace_occurrence(occurrence, "")
+    return A.apply_edits(edits)
 
 
 class CodeFactory(object):
@@ -329,7 +438,7 @@ class CodeFactory(object):
         4. Adapt PytexNotIn and PytexOnlyIn
         5. Write the FileTracking xml file
         """
-        self.codeLaTeX = self.codeLaTeX.substitute_all_inputs()
+        self.codeLaTeX = self.codeLaTeX.substitute_all_inputs(jobs=get_options().jobs)
         self.apply_all_plugins()
         self.apply_all_code_box(tag)
         self.codeLaTeX = PytexNotIn(tag, self.codeLaTeX)
@@ -341,30 +450,55 @@ class CodeFactory(object):
 
 
 class FileTracking(object):
+    """
+    The sha1 of the followed files, kept in pytextools.xml.
+
+    The xml file is read at the first use, and the objects for the same
+    xml file share the same dictionaries. The file is written under a
+    lock and replaced at once, so that several requests built in the
+    same process (see RunBatch) do not write it together.
+    """
     ELEMENT_FOLLOWED_FILES = "Followed_files"
     TAG_FICHIER = "fichier"
     xml_filename = "pytextools.xml"
-    old_sha = {}
-    root = minidom.parse(xml_filename)
-    fileNodes = root.getElementsByTagName(ELEMENT_FOLLOWED_FILES)
-    for fileNode in fileNodes:
-        for fich in fileNode.getElementsByTagName(TAG_FICHIER):
-            old_sha[fich.getAttribute(
-                "name")] = fich.getAttribute("sha1sum")
-    sha = {}
-    for k in old_sha.keys():
-        sha[k] = old_sha[k]
+    _lock = threading.Lock()
+    # xml path -> (old_sha, sha)
+    _states: dict[Path, tuple[dict, dict]] = {}
+
+    def __init__(self, xml_filename=None):
+        if xml_filename is None:
+            xml_filename = FileTracking.xml_filename
+        self.xml_filepath = Path(xml_filename).resolve()
+        with FileTracking._lock:
+            if self.xml_filepath not in FileTracking._states:
+                old_sha = self._read_xml()
+                FileTracking._states[self.xml_filepath] = (old_sha, dict(old_sha))
+        self.old_sha, self.sha = FileTracking._states[self.xml_filepath]
+
+    def _read_xml(self):
+        old_sha = {}
+        if not self.xml_filepath.is_file():
+            return old_sha
+        root = minidom.parse(str(self.xml_filepath))
+        fileNodes = root.getElementsByTagName(FileTracking.ELEMENT_FOLLOWED_FILES)
+        for fileNode in fileNodes:
+            for fich in fileNode.getElementsByTagName(FileTracking.TAG_FICHIER):
+                old_sha[fich.getAttribute(
+                    "name")] = fich.getAttribute("sha1sum")
+        return old_sha
 
     def _is_file_changed(self, filename):
         sha_now = "XXX"
         try:
-            sha_now = get_file_hash(filename)
+            sha_now = get_file_hash(Path(filename))
         except IOError:
             pass
-        FileTracking.sha[filename] = sha_now
-        if filename not in FileTracking.old_sha.keys():
+        # The names are the ones of the xml file.
+        name = str(filename)
+        self.sha[name] = sha_now
+        if name not in self.old_sha.keys():
             return True
-        return not sha_now == FileTracking.old_sha[filename]
+        return not sha_now == self.old_sha[name]
 
     def is_file_changed(self, filename=None, filenames=None):
         if filename:
@@ -378,10 +512,10 @@ class FileTracking(object):
         followed_files_xml = minidom.Document()
         the_sha = followed_files_xml.createElement(
             FileTracking.ELEMENT_FOLLOWED_FILES)
-        for f in FileTracking.sha.keys():
+        for f in list(self.sha.keys()):
             xml = followed_files_xml.createElement(FileTracking.TAG_FICHIER)
-            xml.setAttribute('name', f)
-            xml.setAttribute('sha1sum', FileTracking.sha[f])
+            xml.setAttribute('name', str(f))
+            xml.setAttribute('sha1sum', self.sha[f])
             the_sha.appendChild(xml)
         followed_files_xml.appendChild(the_sha)
         return followed_files_xml.toprettyxml()
@@ -397,7 +531,13 @@ class FileTracking(object):
             if medicament.Sortie.nocompilation:
                 faire = False
         if faire:
-            open(FileTracking.xml_filename, "w").write(self.xml())
+            with FileTracking._lock:
+                tmp_filepath = self.xml_filepath.with_suffix(f".{os.getpid()}.tmp")
+                tmp_filepath.write_text(self.xml())
+                os.replace(tmp_filepath, self.xml_filepath)
+                # The next build of the process (the server) compares
+                # with what is now in the file.
+                self.old_sha.update(self.sha)
 
 
 class Plugin(object):
@@ -0,0 +1,108 @@
+###########################################################################
+#   This is the package latexparser
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###########################################################################
+
+# copyright (c) Laurent Claessens, 2026
+# email: laurent@claessens-donadello.eu
+
+"""Say when the LaTeX passes are enough, from the auxiliary files."""
+
+from pathlib import Path
+from typing import Optional
+
+from pytex.src.log_code import MAYBE_MORE
+from pytex.src.utilities import get_file_hash
+
+
+# The files written by a LaTeX pass or by the special stuffs (see
+# Compilation.special_stuffs), and read by the next pass.
+AUXILIARY_EXTENSIONS = [".aux", ".toc", ".lof", ".lot", ".out",
+                        ".idx", ".ind", ".nlo", ".nls", ".bbl"]
+
+# The files read by Compilation.special_stuffs.
+SPECIAL_STUFFS_INPUTS = [".aux", ".idx", ".nlo"]
+
+
+def aux_fingerprint(generic_filename:Path)->dict[str, Optional[str]]:
+    """Return {extension: sha1 of <generic_filename><extension>, or None if there is no file}."""
+    fingerprint = {}
+    for extension in AUXILIARY_EXTENSIONS:
+        filepath = generic_filename.parent / f"{generic_filename.name}{extension}"
+        fingerprint[extension] = get_file_hash(filepath) if filepath.is_file() else None
+    return fingerprint
+
+
+def changed_extensions(before:dict, after:dict)->list[str]:
+    return [extension for extension in AUXILIARY_EXTENSIONS
+            if before.get(extension) != after.get(extension)]
+
+
+class RerunLoop:
+    r"""
+    Decide after each LaTeX pass if an other one is needed.
+
+    Call 'start_pass' just before a pass and 'has_to_rerun' after it
+    (and after the special stuffs).
+
+    A pass is needed when the auxiliary files (AUXILIARY_EXTENSIONS)
+    are not the ones the last pass read, or when the log of the pass
+    says that the labels may have changed (MAYBE_MORE : the .aux of an
+    \include is not in the fingerprint). It is not needed when
+    - they are the same and the log does not ask for a pass (fixed point),
+    - they are the ones an older pass read : the passes would turn in
+      a cycle,
+    - 'max_passes' passes are done.
+    """
+
+    def __init__(self, generic_filename:Path, max_passes=5):
+        self.generic_filename = generic_filename
+        self.max_passes = max_passes
+        # The fingerprints read by each pass
+        self.read:list[dict] = []
+        self.reason = ""
+
+    def fingerprint(self)->dict[str, Optional[str]]:
+        return aux_fingerprint(self.generic_filename)
+
+    def start_pass(self):
+        self.read.append(self.fingerprint())
+
+    def latex_asks_rerun(self)->bool:
+        """Say if the log of the last pass contains MAYBE_MORE."""
+        filepath = self.generic_filename.parent / f"{self.generic_filename.name}.log"
+        if not filepath.is_file():
+            return False
+        return MAYBE_MORE in filepath.read_text(errors="replace")
+
+    def has_to_rerun(self)->bool:
+        """Say if an other pass is needed, and put the reason in self.reason."""
+        passes = len(self.read)
+        after = self.fingerprint()
+        changed = ", ".join(changed_extensions(self.read[-1], after))
+        if self.latex_asks_rerun():
+            changed = ", ".join(filter(None, [changed, "log : labels may have changed"]))
+        elif not changed:
+            self.reason = f"fixed point after {passes} pass(es)"
+            return False
+        if after != self.read[-1] and after in self.read[:-1]:
+            length = passes-self.read.index(after)
+            self.reason = f"cycle of {length} passes (changed : {changed})"
+            return False
+        if passes >= self.max_passes:
+            self.reason = f"maximum of {self.max_passes} passes (changed : {changed})"
+            return False
+        self.reason = f"changed : {changed}"
+        return True
@@ -26,8 +26,7 @@ if TYPE_CHECKING:
     from pytex.src.LatexCode import LatexCode
 
 
-# TODO : this function is buggy when fast=True
-def LatexCodeToRoughSource(codeLaTeX:'LatexCode',filepath:Path,bibliography_bbl_filename=None,index_ind_filename=None,fast=False):
+def LatexCodeToRoughSource(codeLaTeX:'LatexCode',filepath:Path,bibliography_bbl_filename=None,index_ind_filename=None,fast=False,jobs=1):
     """
     Return a file containing rough self-contained sources that are ready for upload to Arxiv.
     What it does
@@ -61,17 +60,17 @@ def LatexCodeToRoughSource(codeLaTeX:'LatexCode',filepath:Path,bibliography_bbl_
     code_index = FileToLatexCode(index_ind_filename)
 
     new_code = codeLaTeX.copy()
-    new_code=new_code.substitute_all_inputs(fast=fast)
+    new_code=new_code.substitute_all_inputs(fast=fast,jobs=jobs)
     resultBib = re.search("\\\\bibliography\{.*\}",new_code.text_brut)
     if resultBib != None :
         ligne_biblio = resultBib.group()
-        new_code = new_code.replace(ligne_biblio,code_biblio.text_brut)
+        new_code = new_code.replace(ligne_biblio,code_biblio.text_brut,code_biblio.source_map)
 
     printindex=re.escape("\printindex")
     resultIndex = re.search(printindex,new_code.text_brut)
 
     if resultIndex != None :
-        new_code = new_code.replace(printindex,code_index.text_brut)
+        new_code = new_code.replace(printindex,code_index.text_brut,code_index.source_map)
     new_code.filepath = filepath
     new_code.save()
     return new_code
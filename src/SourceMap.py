@@ -0,0 +1,227 @@
+###########################################################################
+#   This is the package latexparser
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###########################################################################
+
+# copyright (c) Laurent Claessens, 2026
+# email: laurent@claessens-donadello.eu
+
+r"""Find back the file and the line of a position in an expanded code."""
+
+import re
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from typing import Optional
+
+
+class Source:
+    """
+    The text of a file, without comments.
+
+    RemoveComments does not remove lines (except after \\end{document}),
+    so that the line numbers in the text are the ones in the file.
+    """
+
+    def __init__(self, filepath:Optional[Path], text):
+        self.filepath = filepath
+        self.text = text
+        self._line_starts: Optional[list[int]] = None
+        self._file_lines: Optional[list[str]] = None
+
+    def line_number(self, offset):
+        """Return the number (from 1) of the line containing 'offset'."""
+        if self._line_starts is None:
+            self.text = str(self.text)
+            self._line_starts = [0]
+            self._line_starts.extend(match.end()
+                                     for match in re.finditer("\n", self.text))
+        return bisect_right(self._line_starts, offset)
+
+    def line(self, number):
+        """
+        Return the line 'number' (from 1) as it is in the file, with its
+        comments. Without file, the line of the text.
+        """
+        if self._file_lines is None:
+            if self.filepath is not None and self.filepath.is_file():
+                self._file_lines = self.filepath.read_text().split("\n")
+            else:
+                self._file_lines = str(self.text).split("\n")
+        if number > len(self._file_lines):
+            return ""
+        return self._file_lines[number-1]
+
+
+class SourceLine:
+    """The line of a file from which a position comes (see SourceMap.source_line)."""
+
+    def __init__(self, filename:Optional[Path], linenumber:int, string:str):
+        self.filename = filename
+        self.linenumber = linenumber
+        self.string = string
+
+    def __str__(self):
+        return "{0} : {1}\n{2}".format(self.filename, self.linenumber, self.string)
+
+
+class SourceMap:
+    r"""
+    For each position of a text made of pieces of files (typically
+    the code in which the \input are substituted), the file and the
+    offset from which it comes.
+
+    The text is cut in segments : the segment i begins at starts[i]
+    and comes from the position offsets[i] of the source
+    sources[source_ids[i]]. The source_id -1 is for the parts which do
+    not come from a known file.
+
+    The maps are not modified : 'concatenated' and 'replaced' return new
+    ones. The origin of a position is found by bisection.
+    """
+
+    def __init__(self):
+        self.sources: list[Source] = []
+        self._source_ids: dict[int, int] = {}
+        self.starts = array("q")
+        self.source_ids = array("i")
+        self.offsets = array("q")
+        self.length = 0
+
+    @classmethod
+    def of_text(cls, text, filepath:Optional[Path]=None)->'SourceMap':
+        """Return the map of 'text' (the text of 'filepath', without comments)."""
+        source_map = cls()
+        source_map.length = len(text)
+        if source_map.length:
+            source_map._append(0, Source(filepath, text), 0)
+        return source_map
+
+    def __len__(self):
+        return self.length
+
+    def _append(self, position, source:Optional[Source], offset):
+        source_id = -1
+        if source is not None:
+            source_id = self._source_ids.get(id(source), -1)
+            if source_id == -1:
+                source_id = len(self.sources)
+                self._source_ids[id(source)] = source_id
+                self.sources.append(source)
+        if self.starts:
+            # The segment continues the previous one.
+            last = len(self.starts)-1
+            if self.source_ids[last] == source_id:
+                if source_id == -1 or self.offsets[last]+position-self.starts[last] == offset:
+                    return
+        self.starts.append(position)
+        self.source_ids.append(source_id)
+        self.offsets.append(offset)
+
+    def _segments(self, start, end):
+        """Yield the tuples (start, source, offset) of the segments in [start:end]."""
+        index = max(bisect_right(self.starts, start)-1, 0)
+        while index < len(self.starts) and self.starts[index] < end:
+            segment_start = max(self.starts[index], start)
+            source_id = self.source_ids[index]
+            if source_id == -1:
+                yield segment_start, None, 0
+            else:
+                yield (segment_start, self.sources[source_id],
+                       self.offsets[index]+segment_start-self.starts[index])
+            index = index+1
+
+    @classmethod
+    def concatenated(cls, slices)->'SourceMap':
+        """
+        Return the map of the concatenation of the text[start:end].
+
+        - `slices` : a list of tuples (source_map, start, end). The
+                     source_map can be None when the text does not come
+                     from a known file.
+        """
+        new_map = cls()
+        position = 0
+        for source_map, start, end in slices:
+            if end <= start:
+                continue
+            if source_map is None:
+                new_map._append(position, None, 0)
+            else:
+                for segment_start, source, offset in source_map._segments(start, end):
+                    new_map._append(position+segment_start-start, source, offset)
+            position = position+end-start
+        new_map.length = position
+        return new_map
+
+    def replaced(self, edits)->'SourceMap':
+        """
+        Return the map of the text in which the edits are made.
+
+        - `edits` : a list of tuples (start, end, length, source_map) in
+                    increasing order, which do not overlap : text[start:end]
+                    is replaced by a text of length 'length' whose map is
+                    'source_map' (or None).
+        """
+        slices = []
+        turtle = 0
+        for start, end, length, source_map in edits:
+            slices.append((self, turtle, start))
+            slices.append((source_map, 0, length))
+            turtle = end
+        slices.append((self, turtle, self.length))
+        return SourceMap.concatenated(slices)
+
+    def without_comments(self, text:str, new_text:str)->'SourceMap':
+        """
+        Return the map of new_text=RemoveComments(text), if self is the
+        map of 'text'.
+
+        RemoveComments only cuts the ends of the lines (and the lines
+        after \\end{document}) : the unchanged lines are kept in slices.
+        """
+        slices = []
+        # The slices are made of the lines from run_start on.
+        run_start = position = 0
+        new_lines = new_text.split("\n")
+        for line, new_line in zip(text.split("\n"), new_lines):
+            if len(line) != len(new_line):
+                slices.append((self, run_start, position+len(new_line)))
+                run_start = position+len(line)
+            position = position+len(line)+1
+        slices.append((self, run_start, position-1))
+        return SourceMap.concatenated(slices)
+
+    def origin(self, position)->Optional[tuple[Source, int]]:
+        """
+        Return the tuple (source, offset) from which the given position
+        comes, or None if it does not come from a known file.
+        """
+        index = bisect_right(self.starts, position)-1
+        if index < 0 or position >= self.length or self.source_ids[index] == -1:
+            return None
+        return (self.sources[self.source_ids[index]],
+                self.offsets[index]+position-self.starts[index])
+
+    def source_line(self, position)->Optional[SourceLine]:
+        """Return the line of the file from which the position comes, or None."""
+        origin = self.origin(position)
+        if origin is None:
+            return None
+        source, offset = origin
+        if source.filepath is None:
+            return None
+        number = source.line_number(offset)
+        return SourceLine(source.filepath, number, source.line(number))
@@ -0,0 +1,321 @@
+###########################################################################
+#   This is the package latexparser
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###########################################################################
+
+# copyright (c) Laurent Claessens, 2026
+# email: laurent@claessens-donadello.eu
+
+"""Run the external programs of a compilation, with logs and timeouts."""
+
+import sys
+import json
+import time
+import shlex
+import shutil
+import asyncio
+import traceback
+import subprocess
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Optional
+from typing import Union
+
+from pytex.src.utilities import get_file_hash
+from pytex.src.utilities import get_text_hash
+from pytex.src.utilities import json_to_str
+from pytex.src.utilities import ThreadOutput
+
+
+def file_hashes(filepaths:list[Path])->dict[str, Optional[str]]:
+    """Return {path: sha1 of the file, or None if there is no file}."""
+    return {str(filepath): get_file_hash(filepath) if filepath.is_file() else None
+            for filepath in filepaths}
+
+
+def copy_if_different(source:Path, target:Path)->bool:
+    """
+    Copy 'source' to 'target' unless they are already the same.
+    Return True if 'target' is written.
+    """
+    if target.is_file() and source.read_bytes() == target.read_bytes():
+        return False
+    shutil.copyfile(source, target)
+    return True
+
+
+class Step:
+    """
+    One step of the compilation :
+    - a command (list of strings) run as a subprocess, or a command
+      line (string) run by the shell, like os.system does, or
+    - a Python function, run in a thread.
+
+    - stdin, stdout : files given to the command. By default the output
+                      goes to the log of the step, and the command reads
+                      nothing (LaTeX does not wait for an answer).
+    - timeout : the time (seconds) after which the command is killed.
+                Only for a command : a thread can not be stopped, and
+                the run waits until the function returns.
+    - when : a function saying, at the time of the step, if the step has
+             to be done.
+    - description : what is printed (default : the command line, or the
+                    name of the function).
+    - inputs : a function returning (as JSON) what the step depends on,
+               for example file_hashes of its input files.
+    - outputs : the files the step writes.
+    When 'inputs' is given, the step is not done again if its inputs and
+    its outputs are the same as after the last time (see StepRunner).
+    """
+
+    def __init__(self, name, command:Optional[Union[list[str], str]]=None,
+                 function:Optional[Callable]=None,
+                 stdin:Optional[Path]=None, stdout:Optional[Path]=None,
+                 timeout:Optional[float]=None,
+                 when:Optional[Callable[[], bool]]=None,
+                 description:Optional[str]=None,
+                 inputs:Optional[Callable[[], Any]]=None,
+                 outputs:Optional[list[Path]]=None):
+        if (command is None) == (function is None):
+            raise ValueError("A step has a command or a function.")
+        if function is not None and timeout is not None:
+            raise ValueError("A function step has no timeout.")
+        self.name = name
+        self.command = command
+        self.function = function
+        self.stdin = stdin
+        self.stdout = stdout
+        self.timeout = timeout
+        self.when = when
+        self._description = description
+        self.inputs = inputs
+        self.outputs = outputs or []
+
+    def description(self)->str:
+        if self._description is not None:
+            return self._description
+        if isinstance(self.command, str):
+            return self.command
+        if self.command is not None:
+            return shlex.join(self.command)
+        return getattr(self.function, "__qualname__", repr(self.function))
+
+
+class StepResult:
+    """
+    What happened to a step.
+
+    - returncode : the return code of the command (0 for a function which
+                   did not raise); None if the step was not done, was
+                   killed, or could not be started.
+    - status : "done", "failed", "timeout" (only a command), "skipped",
+               "unchanged" (the inputs are the same as the last time) or
+               "not executed" (see Compilation.nocompilation).
+    - error : the exception raised by the function or by the start of
+              the command.
+    """
+
+    def __init__(self, step:Step, log_filename:Path):
+        self.name = step.name
+        self.description = step.description()
+        self.is_function = step.function is not None
+        self.log_filename = log_filename
+        self.returncode:Optional[int] = None
+        self.duration = 0.0
+        self.status = "skipped"
+        self.error:Optional[BaseException] = None
+
+    def is_ok(self)->bool:
+        return self.status in ["done", "skipped", "unchanged", "not executed"]
+
+    def summary(self)->str:
+        answer = f"*** {self.name} : {self.status}"
+        if self.returncode is not None:
+            answer += f", return code {self.returncode}"
+        answer += f" ({self.duration:.2f}s)"
+        if self.status not in ["skipped", "unchanged", "not executed"]:
+            answer += f", see {self.log_filename}"
+        return answer
+
+
+class StepRunner:
+    """
+    Run steps, and write the output of each one in the file
+    <log_prefix>.<step name>.log, with the command, the return code
+    and the duration.
+
+    'run' takes chains of steps : the chains are run concurrently, the
+    steps of a chain one after the other. A chain stops at its first
+    failed step.
+
+    For the steps with inputs, the hash of the inputs and the hashes of
+    the outputs after the last success are kept in
+    <log_prefix>.steps.json.
+    """
+
+    def __init__(self, log_prefix:Path, nocompilation=False):
+        self.log_prefix = log_prefix
+        self.nocompilation = nocompilation
+        self.state_filename = log_prefix.parent / f"{log_prefix.name}.steps.json"
+        # step name -> {"inputs": hash, "outputs": file_hashes}
+        self.state:dict[str, dict] = self._load_state()
+        self._state_changed = False
+
+    def log_filename(self, name)->Path:
+        return self.log_prefix.parent / f"{self.log_prefix.name}.{name}.log"
+
+    def _load_state(self)->dict:
+        try:
+            return json.loads(self.state_filename.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self):
+        if self._state_changed:
+            self.state_filename.write_text(json_to_str(self.state, pretty=True))
+            self._state_changed = False
+
+    @staticmethod
+    def _inputs_hash(step:Step)->Optional[str]:
+        if step.inputs is None:
+            return None
+        return get_text_hash(json_to_str([step.description(), step.inputs()]))
+
+    def is_unchanged(self, step:Step, inputs_hash:Optional[str])->bool:
+        """Say if the step was done with the same inputs, and its outputs are still there."""
+        known = self.state.get(step.name)
+        if inputs_hash is None or known is None:
+            return False
+        return (known["inputs"] == inputs_hash
+                and known["outputs"] == file_hashes(step.outputs))
+
+    async def _run_command(self, step:Step, result:StepResult, log):
+        stdin = open(step.stdin) if step.stdin else subprocess.DEVNULL
+        stdout = open(step.stdout, "w") if step.stdout else log
+        try:
+            if isinstance(step.command, str):
+                process = await asyncio.create_subprocess_shell(
+                    step.command, stdin=stdin, stdout=stdout, stderr=log)
+            else:
+                process = await asyncio.create_subprocess_exec(
+                    *step.command, stdin=stdin, stdout=stdout,
+                    stderr=log)
+            try:
+                result.returncode = await asyncio.wait_for(process.wait(),
+                                                           step.timeout)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                result.status = "timeout"
+                return
+        finally:
+            if step.stdin:
+                stdin.close()
+            if step.stdout:
+                stdout.close()
+        result.status = "done" if result.returncode == 0 else "failed"
+
+    async def _run_function(self, step:Step, result:StepResult, log):
+        function = step.function
+        stdout = sys.stdout
+        if isinstance(stdout, ThreadOutput):
+            # The thread of the function prints where the thread of the
+            # runner does (the log of a request of RunBatch or of the server).
+            stream = stdout.current()
+
+            def function():
+                with stdout.redirected(stream):
+                    step.function()
+        try:
+            await asyncio.to_thread(function)
+        except Exception as err:
+            result.error = err
+            result.status = "failed"
+            log.write(traceback.format_exc())
+            return
+        result.returncode = 0
+        result.status = "done"
+
+    async def run_step(self, step:Step)->StepResult:
+        result = StepResult(step, self.log_filename(step.name))
+        if step.when is not None and not step.when():
+            return result
+        inputs_hash = self._inputs_hash(step)
+        if self.is_unchanged(step, inputs_hash):
+            result.status = "unchanged"
+            print(result.summary())
+            return result
+        print("*** external :", result.description)
+        if self.nocompilation:
+            print("not executed")
+            result.status = "not executed"
+            return result
+        start = time.perf_counter()
+        with open(result.log_filename, "w") as log:
+            log.write(f"{result.description}\n\n")
+            log.flush()
+            try:
+                if step.command is not None:
+                    await self._run_command(step, result, log)
+                else:
+                    await self._run_function(step, result, log)
+            except OSError as err:
+                # The command does not exist, ...
+                result.error = err
+                result.status = "failed"
+                log.write(f"{err!r}\n")
+            result.duration = time.perf_counter()-start
+            log.write(f"\n{result.status}, return code {result.returncode}, "
+                      f"{result.duration:.2f}s\n")
+        if result.status == "done" and inputs_hash is not None:
+            self.state[step.name] = {"inputs": inputs_hash,
+                                     "outputs": file_hashes(step.outputs)}
+            self._state_changed = True
+        elif self.state.pop(step.name, None) is not None:
+            self._state_changed = True
+        print(result.summary())
+        return result
+
+    async def _run_chain(self, steps:list[Step])->list[StepResult]:
+        results = []
+        for step in steps:
+            result = await self.run_step(step)
+            results.append(result)
+            if not result.is_ok():
+                break
+        return results
+
+    async def _run_chains(self, chains):
+        return await asyncio.gather(*[self._run_chain(steps) for steps in chains])
+
+    def run(self, *chains:list[Step])->list[StepResult]:
+        """
+        Run the chains of steps (concurrently) and return the results, in
+        the order of the steps.
+
+        The exception raised by a function step is raised again, once all
+        the chains are over.
+        """
+        try:
+            all_results = asyncio.run(self._run_chains(chains))
+        finally:
+            self._save_state()
+        results = [result for chain_results in all_results
+                   for result in chain_results]
+        for result in results:
+            if result.error is not None and result.is_function:
+                raise result.error
+        return results
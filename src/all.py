@@ -32,10 +32,18 @@ if TYPE_CHECKING:
 
 
 def FileToLatexCode(filename:Path, fast=False,keep_comments=False):
-    """ return a codeLaTeX from a file """
+    """
+    return a codeLaTeX from a file
+
+    Without keep_comments, the parsing is read in the ParseCache
+    (see LatexCode.parsed).
+    """
     _ = fast
     content = filename.read_text()
-    A = LatexCode(content, filepath=filename,keep_comments=keep_comments)
+    if keep_comments:
+        A = LatexCode(content, filepath=filename,keep_comments=keep_comments)
+    else:
+        A = LatexCode.parsed(content, filepath=filename)
     A.included_file_list=[filename]
     return A
 
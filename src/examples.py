@@ -20,12 +20,13 @@ def use_of_macros(filename):
 	For each defined macro, says how many times it was used.
 	"""
 	codeLaTeX =  latexparser.FileToLatexCode(filename+".tex")
-	list_of_names = codeLaTeX.dict_of_definition_macros().keys()
+	census = codeLaTeX.macro_census()		# the text is read once
+	list_of_names = [count.name for count in census.defined()]
 	print "The following macros are defined :",list_of_names
 	print "The statistics are :"
-	for name in list_of_names:
-		num = codeLaTeX.statistics_of_the_macro(name).number_of_use
-		print "La macro %s est utilisée %s fois"%(name,str(num))
+	for count in census.defined():
+		print "La macro %s est utilisée %s fois"%(count.name,str(count.number_of_use))
+	print "Defined but not used :",[count.name for count in census.unused_definitions()]
 
 def text_of_macro(filename, macro):
 	"""
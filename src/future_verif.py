@@ -48,6 +48,14 @@ def get_future_warning(rough_code:'LatexCode', label_dict,
     if hexdigest in ok_hash:
         return None
 
+    # The lines are found back by the SourceMap of the rough code.
+    label_line = rough_code.source_line(label_pos)
+    ref_line = rough_code.source_line(reference.position)
+    if label_line is not None and ref_line is not None:
+        return FutureReference(tested_label, label_line, ref_line,
+                               myRequest, hexdigest=hexdigest)
+
+    # Without SourceMap, we grep the lines in the files.
     # 'star' is the list of files in which we are going to grep.
     star:list[Path] = []
 
@@ -12,58 +12,50 @@ def future_reference_verification(options, fast=True):
     r"""
     Print the list of references that are made to the future.
 
-    If fast is true, make more assumptions on the LaTeX code.
-    You will only catch references and label like
-    \ref{foo}
-    \label{bar}
-    while not matching
-    \ref
-    {foo}
-    or
-    \label{foo\Macro{bar}boor}
+    If fast is true, the macros are searched with one compiled
+    regular expression (see MacroScanner). The result is the same.
     """
 
-    # rough_code with fast=True is buggy.
-    rough_code: LatexCode = options.rough_code(options, fast=False)
+    rough_code: LatexCode = options.rough_code(options, fast=fast)
 
-    print("Analysing the document for label")
-    labels = rough_code.search_use_of_macro(r"\label", 1, fast=fast)
-
-    print("Analysing the document for ref")
-    ref = rough_code.search_use_of_macro(r"\ref", 1, fast=fast)
-
-    print("Analysing the document for eqref")
-    eqref = rough_code.search_use_of_macro(r"\eqref", 1, fast=fast)
+    print("Analysing the document for label, ref and eqref")
+    occurrences = rough_code.search_use_of_macros(
+        {r"\label": 1, r"\ref": 1, r"\eqref": 1}, fast=fast)
+    # We work with the indices of the occurrences in the store;
+    # the Occurrence objects are only created when needed.
+    labels = occurrences.indices(r"\label")
+    ref = occurrences.indices(r"\ref")
+    eqref = occurrences.indices(r"\eqref")
 
     ref_dict = {}
     label_dict = {}
 
     print("Working on future references ...")
 
-    for occ in labels:
-        label = occ.arguments[0]
+    for index in labels:
+        label = occurrences.argument(index, 0)
         ref_dict[label] = []
 
     references = ref[:]
     references.extend(eqref)
 
-    for occ in references:
-        label = occ.arguments[0]
+    for index in references:
+        label = occurrences.argument(index, 0)
         ref_dict[label] = []
 
-    for occ in references:
-        label = occ.arguments[0]
-        ref_dict[label].append(occ)
+    for index in references:
+        label = occurrences.argument(index, 0)
+        ref_dict[label].append(index)
 
-    for occ in labels:
-        label = occ.arguments[0]
+    for index in labels:
+        label = occurrences.argument(index, 0)
         if label in label_dict.keys():
             options.output(
                 "The label <{0}> is used multiple times".format(label))
             options.output("Here is the last time I see that")
-            options.output(occ.as_written)
+            options.output(occurrences.as_written(index))
             raise NameError
-        label_dict[label] = occ
+        label_dict[label] = occurrences[index]
 
     # The future references are detected in 'rough_code'
     # which is a large latex code recursively generated by applying
@@ -82,9 +74,9 @@ def future_reference_verification(options, fast=True):
     # of the files that are concerned by a future references.
     future_warnings = []
     for tested_label in label_dict.keys():
-        for ref in ref_dict[tested_label]:
+        for index in ref_dict[tested_label]:
             warning = get_future_warning(rough_code, label_dict,
-                                         tested_label, ref,
+                                         tested_label, occurrences[index],
                                          options.my_request)
             if warning:
                 future_warnings.append(warning)
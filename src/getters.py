@@ -1,3 +1,6 @@
+import contextlib
+from contextvars import ContextVar
+from typing import Optional
 from typing import TYPE_CHECKING
 
 
@@ -5,6 +8,31 @@ if TYPE_CHECKING:
     from pytex.src.options import Options
 
 
+# The options of the request being built, when they are not the
+# singleton (see options_context).
+_current_options: ContextVar[Optional['Options']] = ContextVar("pytex_options", default=None)
+
+
 def get_options()->'Options':
+    """
+    Return the options of the request being built : the ones given to
+    options_context, or the singleton Options.
+    """
+    options = _current_options.get()
+    if options is not None:
+        return options
     from pytex.src.options import Options
     return Options.get_instance()
+
+
+@contextlib.contextmanager
+def options_context(options:'Options'):
+    """
+    Make 'options' the ones returned by get_options, in the current
+    thread (or asyncio task) only.
+    """
+    token = _current_options.set(options)
+    try:
+        yield options
+    finally:
+        _current_options.reset(token)
@@ -79,6 +79,25 @@ class PytexGrep():
                 color_label = f"\033[35;37m{label}\033[35;33m"
                 yield key, line.replace(label, color_label)
 
+    def update_file(self, filepath:Path):
+        """
+        Read again the lines of 'filepath' after it was modified, if the
+        dictionaries are already created. The lines of a removed file
+        are forgotten.
+        """
+        if not self._done_dict:
+            return
+        filepath = filepath.resolve()
+        for line_dict in [self.ref_dict, self.eqref_dict, self.label_dict]:
+            for key in [key for key in line_dict
+                        if Path(key[0]).resolve() == filepath]:
+                del line_dict[key]
+        if filepath.is_file() and filepath.name.endswith('.tex'):
+            ref_dict, eqref_dict, label_dict = self.read_file(filepath)
+            self.ref_dict.update(ref_dict)
+            self.eqref_dict.update(eqref_dict)
+            self.label_dict.update(label_dict)
+
     def read_file(self, filename):
         """
         Read the given file and add its lines in `self`'s
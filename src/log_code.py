@@ -32,6 +32,10 @@ from pytex.src.utilities import is_empty_line
 
 dprint = print      # pylint: disable=invalid-name
 
+# The warning of LaTeX when the labels of the pass are not the ones it read.
+MAYBE_MORE = "LaTeX Warning: Label(s) may have "\
+             "changed. Rerun to get cross-references right."
+
 
 class LogCode:
     """
@@ -59,8 +63,7 @@ class LogCode:
         self.stop_on_first = stop_on_first
         self._rerun_to_get_cross_references = None
         self.warnings = None
-        self.maybe_more = "LaTeX Warning: Label(s) may have "\
-                          "changed. Rerun to get cross-references right."
+        self.maybe_more = MAYBE_MORE
 
         self.search_for_errors(stop_on_first=self.stop_on_first)
 
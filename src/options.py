@@ -2,6 +2,7 @@
 
 
 import os
+import re
 import sys
 from typing import Any
 from pathlib import Path
@@ -15,10 +16,14 @@ from pytex.src.utilities_b import CreateRoughCode
 from pytex.src.utilities_b import ProducePytexCode
 from pytex.src.utilities_b import randombase
 from pytex.src.utilities_d import ProduceIntermediateCode
+from pytex.src.InputFilter import InputFilter
+from pytex.src.PluginProfiler import PluginProfiler
 from pytex.src.grep_wrapper import PytexGrep
 from pytex.src.utilities import logging
 from pytex.src.utilities import ciao
+from pytex.src.utilities import quiet_output
 from pytex.src.PytexTools import Compilation
+from pytex.src.getters import options_context
 _:Any = ciao
 
 
@@ -39,6 +44,13 @@ class Options:
     self.source_file : the file with everything explicit including the
                 bibliography and the index.  The comments are removed.
                 This is for Arxiv.
+
+    Usually there is one Options object, the singleton. With
+    'singleton=False', the object is not global : this is for building
+    several requests in one process (see RunBatch). The functions which
+    use get_options have then to be called in options_context(options).
+
+    The command line options are read in 'argv' (default : sys.argv).
     """
     ___instance = None
 
@@ -48,19 +60,27 @@ class Options:
             return Options.___instance
         raise ValueError("Il faut d'abord avoir crée l'objet Options.")
 
-    def __init__(self, my_request):
+    def __init__(self, my_request, singleton=True, argv=None):
 
-        if Options.___instance is not None:
-            raise ValueError("Ceci est supposé être un singleton")
-        Options.___instance = self
+        if singleton:
+            if Options.___instance is not None:
+                raise ValueError("Ceci est supposé être un singleton")
+            Options.___instance = self
         self.my_request = my_request
+        if argv is None:
+            argv = sys.argv
+        self.argv = list(argv)
         self.pwd = Path('.').resolve()
         self._pytex_file = None
         self._intermediate_code = None
+        self._include_graph = None
+        self._expanded_code = None
         # Cette liste sont les fichiers .tex à accepter par input
         self.ok_filenames_list = []
         # Cette liste sont les fichiers .tex qui sont à refuser par input
         self.refute_filenames_list = []
+        # Les deux listes, lues une fois (voir accept_input)
+        self._input_filter = None
         self.Sortie = Sortie()
         self.Compil = Compil()
         self.Compil.verif = False
@@ -70,8 +90,20 @@ class Options:
         self.new_output_filename = None  # see copy_final_file
         self.new_output_filenames = None
         self.output = SummaryOutput(sys.stdout)
-        self.read_request()
-        for arg in sys.argv:
+        # The number of processes which parse the files (see InputExpander).
+        # More than 1 only pays off for large trees of files, on several
+        # cores (see bench/bench_jobs.py).
+        self.jobs = 1
+        # Make the pytex file even if nothing changed (see pytex_file)
+        self.force = False
+        # The maximal number of LaTeX passes (see RerunLoop)
+        self.max_passes = 5
+        # The time taken by each plugin, written at the end of the run
+        # (see plugin_report_filename).
+        self.plugin_profiler = PluginProfiler()
+        with options_context(self):
+            self.read_request()
+        for i, arg in enumerate(self.argv):
             if arg == "--all":
                 self.Compil.tout = 1
             if arg == "--verif":
@@ -84,6 +116,14 @@ class Options:
                 self.Sortie.nocompilation = True
             if "--output=" in arg:
                 self.output = arg_to_output(arg)
+            if arg.startswith("--jobs="):
+                self.jobs = int(arg.split("=")[1])
+            if arg == "--jobs":
+                self.jobs = int(self.argv[i+1])
+            if arg == "--force":
+                self.force = True
+            if arg.startswith("--max-passes="):
+                self.max_passes = int(arg.split("=")[1])
 
         self.listeFichPris = []
 
@@ -104,15 +144,63 @@ class Options:
 
         self.pytex_grep = PytexGrep(Path.cwd())
 
+    def expanded_code(self):
+        r"""
+        Return the code of the pytex file in which the \input are
+        substituted. Its SourceMap gives the file and the line of
+        each position.
+        """
+        from pytex.src.all import FileToLatexCode       # avoid cyclic import
+        if self._expanded_code is None:
+            code = FileToLatexCode(self.pytex_file())
+            with quiet_output():
+                code = code.substitute_all_inputs(jobs=self.jobs)
+            self._expanded_code = code
+        return self._expanded_code
+
     def grep(self, command, label):
-        return self.pytex_grep.grep(command, label)
+        r"""
+        Yield the tuples ((filename, line number), line) of the lines
+        in which there is \<command>{<label>}.
+
+        - `command` : "ref", "eqref" or "label"
+
+        The lines are given by the SourceMap of the expanded code. The
+        git-tracked files are grepped only when it is not known.
+        """
+        code = self.expanded_code()
+        if code.source_map is None:
+            yield from self.pytex_grep.grep(command, label)
+            return
+        occurrences = code.search_use_of_macros({"\\"+command: 1})
+        color_label = f"\033[35;37m{label}\033[35;33m"
+        for index in range(len(occurrences)):
+            if occurrences.argument(index, 0) != label:
+                continue
+            source_line = code.source_line(occurrences.position(index))
+            if source_line is not None:
+                yield ((source_line.filename, source_line.linenumber),
+                       source_line.string.replace(label, color_label))
+
+    def input_filter(self)->InputFilter:
+        """
+        Return the InputFilter of ok_filenames_list and
+        refute_filenames_list, made at the first call.
+        """
+        if self._input_filter is None:
+            self._input_filter = InputFilter(self.ok_filenames_list,
+                                             self.refute_filenames_list)
+        return self._input_filter
 
     def accept_input(self, filename):
-        if filename not in self.ok_filenames_list:
-            return False
-        if filename in self.refute_filenames_list:
-            return False
-        return True
+        r"""
+        Say if the \input{filename} is kept in the intermediate code.
+
+        The ok and refute lists can contain glob patterns like
+        "glob:chapter7/*" and compiled regular expressions
+        (see FilenameMatcher).
+        """
+        return self.input_filter().accepts(filename)
 
     def rough_code(self, options, fast=False):
         from pytex.src.all import FileToLatexCode       # avoid cyclic import
@@ -121,7 +209,7 @@ class Options:
         rough_code = codeLaTeX.rough_source(
             options.source_filename,
             options.bibliographie(),
-            options.index(), fast=fast)
+            options.index(), fast=fast, jobs=options.jobs)
         return rough_code
 
     def make_final_copy(self, pdf_output, new_filename):
@@ -211,7 +299,7 @@ class Options:
         self.prefix = self.my_request.prefix
 
         # See explanatons at position 2764113936
-        if "--no-external" in sys.argv:
+        if "--no-external" in self.argv:
             self.my_request.add_plugin(set_no_useexternal, "after_pytex")
 
         # This is the application of a plugin on Options itself,
@@ -219,13 +307,14 @@ class Options:
         # position ooMEVCoo
         for plugin in [x for x in self.my_request.plugin_list
                        if x.hook_name == "options"]:
-            plugin(self)
+            self.plugin_profiler.run(plugin.hook_name, plugin.fun, self)
 
         self.original_file = self.my_request.original_filename
         self.new_output_filename = self.my_request.new_output_filename
         self.new_output_filenames = self.my_request.new_output_filenames
         self.ok_filenames_list.extend(
-            [x.replace(".tex", "") for x in self.my_request.ok_filenames_list])
+            [x if isinstance(x, re.Pattern) else x.replace(".tex", "")
+             for x in self.my_request.ok_filenames_list])
 
     def create_rough_source(self, filename):
         """
@@ -240,6 +329,23 @@ class Options:
             self._intermediate_code = ProduceIntermediateCode(self)
         return self._intermediate_code
 
+    def include_graph(self):
+        r"""
+        Return the IncludeGraph of the original file.
+
+        The graph is saved in the working directory and read again
+        by the next runs, as long as none of its files is modified.
+        """
+        from pytex.src.IncludeGraph import IncludeGraph     # avoid cyclic import
+        if self._include_graph is None:
+            graph_filename = self.pwd / f"{self.prefix}-{self.original_file.stem}.graph.json"
+            graph = IncludeGraph.load(graph_filename)
+            if graph is None or not graph.is_up_to_date():
+                graph = IncludeGraph.from_file(self.original_file)
+                graph.save(graph_filename)
+            self._include_graph = graph
+        return self._include_graph
+
     def apply_plugin(self, A, hook_name):
         """
         The plugin on the options object itself are called
@@ -251,15 +357,40 @@ class Options:
             print("Applying the plugin", plugin.fun, plugin.hook_name)
             if hook_name in ["before_compilation",
                              "after_compilation"]:
-                plugin.fun(self)
+                self.plugin_profiler.run(hook_name, plugin.fun, self)
             else:
-                A = plugin(A)
+                A = self.plugin_profiler.run(hook_name, plugin.fun, A)
         return A
 
+    def plugin_report_filename(self)->Path:
+        """Return the file in which the PluginProfiler writes its report."""
+        return self.pwd / f"{self.prefix}-{self.original_file.stem}.plugins.json"
+
+    def manifest_filename(self)->Path:
+        """Return the file in which the PytexManifest of the pytex file is kept."""
+        return self.pwd / f"{self.prefix}-{self.original_file.stem}.manifest.json"
+
     def pytex_file(self):
+        r"""
+        Return the pytex file, made from the original file by the plugins
+        and ProduceIntermediateCode.
+
+        The file is not made again when its inputs (the request, the
+        plugins and the files reachable by \input, see PytexManifest)
+        are the same as for the last one, unless '--force' is given.
+        """
         if self._pytex_file:
             return self._pytex_file
 
+        from pytex.src.PytexManifest import PytexManifest      # avoid cyclic import
+        previous = PytexManifest.load(self.manifest_filename())
+        manifest = PytexManifest.from_options(self, previous)
+        if (not self.force and manifest.matches(previous)
+                and previous.is_output(self.pytex_filename)):
+            print(f"Nothing changed : {self.pytex_filename} is kept")
+            self._pytex_file = self.pytex_filename
+            return self.pytex_file()
+
         A = self.original_file.read_text()
         A = self.apply_plugin(A, "before_pytex")
         self.text_before_pytex = A
@@ -274,7 +405,11 @@ class Options:
         # work neither because it will write an explicit
         # \\UseCorrectionFile in the LaTeX file.
 
+        # The same random base as for the previous file, so that the
+        # same code gives the same file.
         rbase = randombase()
+        if previous is not None and previous.random_base:
+            rbase = previous.random_base
         A = A.replace(r"""\begin{document}""", r"""\begin{document}
                     \makeatletter
 \@ifundefined{UseCorrectionFile}{}{"""+"\\"+r"""UseCorrectionFile{AEWooFLTbT}}
@@ -283,6 +418,8 @@ class Options:
 
         A.save(self.pytex_filename)
         self._pytex_file = A.filepath
+        manifest.set_output(self.pytex_filename, rbase)
+        manifest.save(self.manifest_filename())
 
         return self.pytex_file()
 
@@ -0,0 +1,159 @@
+"""Build several requests (lst_*.py files) in one process."""
+
+import sys
+import time
+import runpy
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from pytex.src.options import Options
+from pytex.src.PytexTools import Request
+from pytex.src.run_me import run_options
+from pytex.src.getters import options_context
+from pytex.src.utilities import ThreadOutput
+from pytex.src.ParseCache import get_parse_cache
+from pytex.src.FilenameIndex import get_filename_index
+
+
+dprint = print
+
+
+def batch_request_files(argv)->list[Path]:
+    """
+    Return the files given after '--batch' in the command line
+    --batch lst_a.py lst_b.py ... (see BatchMain)
+    """
+    if "--batch" not in argv:
+        return []
+    answer = []
+    for arg in argv[argv.index("--batch")+1:]:
+        if arg.startswith("--"):
+            break
+        answer.append(Path(arg))
+    return answer
+
+
+def load_request(filepath:Path)->Request:
+    """
+    Execute the lst_*.py file and return the Request it defines.
+
+    The file is not executed as __main__.
+    """
+    namespace = runpy.run_path(str(filepath),
+                               run_name=f"pytex_request_{filepath.stem}")
+    requests = {id(value): value for value in namespace.values()
+                if isinstance(value, Request)}
+    if len(requests) != 1:
+        raise ValueError(f"{filepath} defines {len(requests)} Request; "
+                         f"one is expected.")
+    return list(requests.values())[0]
+
+
+def batch_log_filename(options:Options)->Path:
+    """Return the file in which the output of the request is written by RunBatch."""
+    return options.pwd / f"{options.prefix}-{options.original_file.stem}.batch.log"
+
+
+def _parse_all(all_options:list[Options]):
+    """Parse once the files reachable from all the requests."""
+    filepaths = set()
+    for options in all_options:
+        with options_context(options):
+            filepaths.update(options.include_graph().files())
+    texts = [filepath.read_text() for filepath in sorted(filepaths)
+             if filepath.is_file()]
+    get_parse_cache().parse_all(texts, jobs=all_options[0].jobs)
+
+
+def _build(options:Options, output:ThreadOutput)->float:
+    """Build the request in the current (worker) thread; return the time."""
+    start = time.perf_counter()
+    with open(batch_log_filename(options), "w") as log:
+        output.redirect(log)
+        try:
+            with options_context(options):
+                run_options(options)
+        finally:
+            output.redirect(None)
+    return time.perf_counter()-start
+
+
+def RunBatch(request_files:list[Path], jobs:Optional[int]=None):
+    """
+    Build all the requests in one process.
+
+    - the files reachable from the requests are parsed once, in the
+      ParseCache shared by the requests (with --jobs processes).
+    - each request has its own Options (not the singleton), and its
+      own files (Inter_<prefix>-..., the pdf, the log ...). Two requests
+      with the same pytex file are refused.
+    - the compilations are made by 'jobs' threads (default : the
+      --jobs option). The output of each request is written in its
+      file <prefix>-<stem>.batch.log.
+
+    Return the dictionary {request file: exception or None}.
+    """
+    # The objects shared by the requests exist before the threads.
+    get_parse_cache()
+    get_filename_index()
+    all_options:list[Options] = []
+    for filepath in request_files:
+        all_options.append(Options(load_request(filepath), singleton=False))
+    if not all_options:
+        return {}
+    pytex_filenames = [options.pytex_filename for options in all_options]
+    for filepath, pytex_filename in zip(request_files, pytex_filenames):
+        if pytex_filenames.count(pytex_filename) > 1:
+            raise ValueError(f"The request {filepath} has the same file "
+                             f"{pytex_filename} as an other one. Use "
+                             f"different prefixes.")
+    if jobs is None:
+        jobs = all_options[0].jobs
+
+    _parse_all(all_options)
+
+    # The pytex files are made in the main thread : the plugins do not
+    # have to be thread-safe.
+    results = {}
+    to_build = []
+    for filepath, options in zip(request_files, all_options):
+        try:
+            with options_context(options):
+                options.pytex_file()
+        except Exception as err:
+            results[filepath] = err
+            print(f"{filepath} : failed ({err!r})")
+        else:
+            to_build.append((filepath, options))
+
+    output = ThreadOutput(sys.stdout)
+    sys.stdout = output
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+            futures = [executor.submit(_build, options, output)
+                       for _, options in to_build]
+            for (filepath, options), future in zip(to_build, futures):
+                log_filename = batch_log_filename(options)
+                try:
+                    duration = future.result()
+                except (Exception, SystemExit) as err:
+                    results[filepath] = err
+                    print(f"{filepath} : failed ({err!r}), see {log_filename}")
+                else:
+                    results[filepath] = None
+                    print(f"{filepath} : done in {duration:.1f}s, see {log_filename}")
+    finally:
+        sys.stdout = output.default
+    return results
+
+
+def BatchMain(argv=None):
+    """
+    Build the requests whose files (lst_*.py) are given after '--batch'
+    in 'argv' (see the README). Return the number of requests which failed.
+    """
+    if argv is None:
+        argv = sys.argv
+    results = RunBatch(batch_request_files(argv))
+    return sum(1 for err in results.values() if err is not None)
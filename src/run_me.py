@@ -1,7 +1,10 @@
 import sys
+from pathlib import Path
 
 from pytex.src.options import Options
-from pytex.src.all import FileToLogCode
+from pytex.src.utilities import logging
+from pytex.src.RerunLoop import RerunLoop
+from pytex.src.RerunLoop import SPECIAL_STUFFS_INPUTS
 from pytex.src.utilities_c import verif_grep
 from pytex.src.future_verification import future_reference_verification
 _ = [sys]
@@ -24,8 +27,59 @@ def do_latex_more(options):
     return True
 
 
+def special_stuffs_if_needed(compilation, options, rerun_loop, done_inputs):
+    """
+    Make the special stuffs (bibliography, index, ...) unless their
+    inputs (SPECIAL_STUFFS_INPUTS) are 'done_inputs'. Return the inputs.
+    """
+    fingerprint = rerun_loop.fingerprint()
+    inputs = {extension: fingerprint[extension]
+              for extension in SPECIAL_STUFFS_INPUTS}
+    if inputs != done_inputs:
+        compilation.special_stuffs(options)
+    return inputs
+
+
+def compile_until_stable(options):
+    """
+    Compile (LaTeX and the special stuffs) until the auxiliary files
+    do not change anymore (see RerunLoop).
+    """
+    compilation = options.compilation()
+    rerun_loop = RerunLoop(Path(compilation.generic_filename),
+                           options.max_passes)
+    done_inputs = None
+    has_to_redo = True
+    while has_to_redo:
+        done_inputs = special_stuffs_if_needed(compilation, options,
+                                               rerun_loop, done_inputs)
+        rerun_loop.start_pass()
+        compilation.latex()
+        done_inputs = special_stuffs_if_needed(compilation, options,
+                                               rerun_loop, done_inputs)
+        options.copy_final_file()
+        has_to_redo = rerun_loop.has_to_rerun()
+        decision = "rerun" if has_to_redo else "stop"
+        logging(f"LaTeX pass {len(rerun_loop.read)} : {decision}, {rerun_loop.reason}")
+
+
 def RunMe(my_request):
     options = Options(my_request)
+    run_options(options)
+
+
+def run_options(options):
+    """
+    Build the request of 'options' (see RunMe and RunBatch), then write
+    the report of the plugins.
+    """
+    try:
+        _run_options(options)
+    finally:
+        options.plugin_profiler.finish(options.plugin_report_filename())
+
+
+def _run_options(options):
     try:
         options.myRequest.run_prerequistes(options)
     except AttributeError:
@@ -34,12 +88,7 @@ def RunMe(my_request):
         options.create_rough_source(options.source_filename)
 
     if options.Compil.lotex:
-        has_to_redo = True
-        while has_to_redo:
-            options.compilation().latex_more(options)
-            options.copy_final_file()
-            x = FileToLogCode(options, stop_on_first=True)
-            has_to_redo = x.rerun_to_get_cross_references(stop_on_first=True)
+        compile_until_stable(options)
     if not options.Sortie.nocompilation and not options.Compil.verif:
         verif_grep(options)
     if options.Sortie.nocompilation:
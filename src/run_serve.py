@@ -0,0 +1,382 @@
+###########################################################################
+#   This is the package latexparser
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###########################################################################
+
+# copyright (c) Laurent Claessens, 2026
+# email: laurent@claessens-donadello.eu
+
+"""
+A resident pytex process (see ServeMain) which builds the requests sent
+by the clients (see serve_client.ClientMain) through a Unix socket.
+"""
+
+import sys
+import json
+import time
+import threading
+import socketserver
+from pathlib import Path
+from typing import Optional
+
+from pytex.src.options import Options
+from pytex.src.run_me import run_options
+from pytex.src.run_batch import load_request
+from pytex.src.getters import options_context
+from pytex.src.utilities import ThreadOutput
+from pytex.src.grep_wrapper import PytexGrep
+from pytex.src.ParseCache import get_parse_cache
+from pytex.src.FilenameIndex import get_filename_index
+from pytex.src.serve_client import serve_socket_path
+
+
+dprint = print
+
+
+def serve_log_filename(options:Options)->Path:
+    """Return the file in which the output of the request is written by the server."""
+    return options.pwd / f"{options.prefix}-{options.original_file.stem}.serve.log"
+
+
+def _file_state(filepath:Path):
+    """Return (mtime_ns, size) of the file, or None if there is no file."""
+    try:
+        stat = filepath.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class FileWatcher:
+    """
+    Watch the mtime and the size of files by polling.
+
+    A modification is given by 'poll' once the file kept the same state
+    during 'debounce' seconds : an editor which writes a file in several
+    steps causes one modification.
+    """
+
+    def __init__(self, debounce=0.3):
+        self.debounce = debounce
+        self._states: dict[Path, Optional[tuple]] = {}
+        # path -> (new state, time at which it was first seen)
+        self._pending: dict[Path, tuple] = {}
+
+    def watch(self, filepaths, states:Optional[dict]=None):
+        """
+        Watch also 'filepaths', from their state in 'states' (see
+        _file_state) or else from their current state.
+        """
+        states = states or {}
+        for filepath in filepaths:
+            if filepath not in self._states:
+                if filepath in states:
+                    self._states[filepath] = states[filepath]
+                else:
+                    self._states[filepath] = _file_state(filepath)
+
+    def poll(self)->list[Path]:
+        """Return the watched files whose modification is over."""
+        now = time.monotonic()
+        changed = []
+        for filepath, known in self._states.items():
+            state = _file_state(filepath)
+            if state == known:
+                self._pending.pop(filepath, None)
+                continue
+            pending = self._pending.get(filepath)
+            if pending is None or pending[0] != state:
+                self._pending[filepath] = (state, now)
+                continue
+            if now-pending[1] >= self.debounce:
+                del self._pending[filepath]
+                changed.append(filepath)
+        for filepath in changed:
+            self._states[filepath] = _file_state(filepath)
+        return changed
+
+
+class ServedTarget:
+    """
+    A request file (lst_*.py) built by the server, and its Options,
+    kept as long as none of its files is modified.
+
+    The Options keep the pytex file, the expanded code and the include
+    graph in memory : building again a target whose files did not
+    change does not read them again.
+    """
+
+    def __init__(self, request_file:Path):
+        self.request_file = request_file
+        self.argv: list[str] = []
+        self.options: Optional[Options] = None
+        self.files: set[Path] = {request_file}
+
+    def get_options(self, argv, pytex_grep:PytexGrep)->Options:
+        """Return the Options of the target for the command line 'argv'."""
+        if self.options is not None and self.argv == argv:
+            return self.options
+        self.forget()
+        options = Options(load_request(self.request_file), singleton=False,
+                          argv=argv)
+        options.pytex_grep = pytex_grep
+        self.argv = argv
+        self.options = options
+        return options
+
+    def update_files(self):
+        r"""Read again the files of the target : the request, and the files reachable by \input."""
+        self.files = {self.request_file}
+        if self.options is None:
+            return
+        with options_context(self.options):
+            self.files.update(self.options.include_graph().files())
+        self.files.add(Path(self.options.original_file).resolve())
+
+    def forget(self):
+        """Forget the Options : the next build reads again the request."""
+        self.options = None
+
+
+class BuildJob:
+    """A build asked by a client, and its answer."""
+
+    def __init__(self, request_file:Path, argv:list[str]):
+        self.request_file = request_file
+        self.argv = argv
+        self.answer: Optional[dict] = None
+        self._done = threading.Event()
+
+    def finish(self, answer:dict):
+        self.answer = answer
+        self._done.set()
+
+    def wait(self)->dict:
+        self._done.wait()
+        return self.answer
+
+
+class PytexServer:
+    """
+    Build the requests sent through the socket, one at a time.
+
+    - the pending builds are queued. A build of a request file which is
+      already waiting replaces it : the client of the first one receives
+      the status "superseded".
+    - the files of the targets are watched (see FileWatcher). When a
+      file is modified, the FilenameIndex is checked again, the lines of
+      the file are read again in the grep index and the targets which
+      include it forget their Options. The files which are not modified
+      are not parsed again : they are in the ParseCache.
+    - the state of the files is taken before the build : a file saved
+      during the build is seen as modified after it.
+    - the output of a build is written in <prefix>-<stem>.serve.log.
+
+    Any modification of a file of a target drops its whole Options : the
+    expanded code and the pytex file are made again in full, only the
+    parsing of the files which are not modified is saved.
+    """
+
+    def __init__(self, socket_path:Path, poll_interval=0.5, debounce=0.3):
+        self.socket_path = socket_path
+        self.poll_interval = poll_interval
+        self.targets: dict[Path, ServedTarget] = {}
+        self.pytex_grep = PytexGrep(Path.cwd())
+        self.watcher = FileWatcher(debounce)
+        # request file -> job; in the order of arrival
+        self._pending: dict[Path, BuildJob] = {}
+        self._condition = threading.Condition()
+        # Held during a build and while the modifications are applied.
+        self._build_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self.output = ThreadOutput(sys.stdout)
+
+    def submit(self, job:BuildJob):
+        with self._condition:
+            previous = self._pending.pop(job.request_file, None)
+            if previous is not None:
+                previous.finish({"status": "superseded",
+                                 "request": str(job.request_file)})
+            self._pending[job.request_file] = job
+            self._condition.notify()
+
+    def _next_job(self)->Optional[BuildJob]:
+        with self._condition:
+            while not self._pending and not self._stopped.is_set():
+                self._condition.wait()
+            if self._stopped.is_set():
+                return None
+            request_file = next(iter(self._pending))
+            return self._pending.pop(request_file)
+
+    def build(self, job:BuildJob)->dict:
+        """Build the request of the job in the current thread; return the answer to the client."""
+        target = self.targets.get(job.request_file)
+        if target is None:
+            target = ServedTarget(job.request_file)
+            self.targets[job.request_file] = target
+        answer = {"request": str(job.request_file)}
+        start = time.perf_counter()
+        try:
+            options = target.get_options(job.argv, self.pytex_grep)
+        except Exception as err:
+            target.forget()
+            answer.update(status="failed", error=repr(err))
+            return answer
+        # The state of the files read by the build, before it : a file
+        # saved during the build is seen as modified.
+        try:
+            target.update_files()
+        except Exception:
+            # The build says what is wrong.
+            pass
+        states = {filepath: _file_state(filepath) for filepath in target.files}
+        log_filename = serve_log_filename(options)
+        answer["log"] = str(log_filename)
+        with open(log_filename, "w") as log:
+            self.output.redirect(log)
+            try:
+                with options_context(options):
+                    run_options(options)
+            except (Exception, SystemExit) as err:
+                # The Options may be half-done.
+                target.forget()
+                answer.update(status="failed", error=repr(err))
+            else:
+                answer["status"] = "done"
+            finally:
+                self.output.redirect(None)
+        answer["duration"] = time.perf_counter()-start
+        try:
+            target.update_files()
+        except Exception:
+            target.forget()
+            target.update_files()
+        self.watcher.watch(target.files, states)
+        return answer
+
+    def apply_changes(self, changed:list[Path]):
+        """Take into account the modification of the files 'changed'."""
+        get_filename_index().refresh()
+        for filepath in changed:
+            self.pytex_grep.update_file(filepath)
+        changed_set = set(changed)
+        for target in self.targets.values():
+            if target.files & changed_set:
+                target.forget()
+
+    def _work(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            with self._build_lock:
+                try:
+                    answer = self.build(job)
+                except Exception as err:
+                    answer = {"request": str(job.request_file),
+                              "status": "failed", "error": repr(err)}
+            job.finish(answer)
+            print(f"{job.request_file} : {answer['status']}")
+
+    def _watch(self):
+        while not self._stopped.wait(self.poll_interval):
+            with self._build_lock:
+                changed = self.watcher.poll()
+                if changed:
+                    print("Modified : " + ", ".join(str(f) for f in changed))
+                    self.apply_changes(changed)
+
+    def status(self)->dict:
+        with self._condition:
+            pending = [str(request_file) for request_file in self._pending]
+        return {"status": "ok",
+                "targets": {str(request_file): target.options is not None
+                            for request_file, target in self.targets.items()},
+                "pending": pending}
+
+    def stop(self):
+        self._stopped.set()
+        with self._condition:
+            for job in self._pending.values():
+                job.finish({"status": "stopped", "request": str(job.request_file)})
+            self._pending.clear()
+            self._condition.notify_all()
+
+    def handle(self, message:dict)->dict:
+        """Return the answer to the message of a client."""
+        command = message.get("command")
+        if command == "build":
+            job = BuildJob(Path(message["request"]).resolve(),
+                           list(message.get("argv", [])))
+            self.submit(job)
+            return job.wait()
+        if command == "status":
+            return self.status()
+        if command == "stop":
+            self.stop()
+            return {"status": "stopped"}
+        return {"status": "failed", "error": f"Unknown command {command!r}"}
+
+    def serve_forever(self):
+        """Serve until a client sends the command 'stop'."""
+        # The objects shared by the builds exist before the threads.
+        get_parse_cache()
+        get_filename_index()
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+        server = _SocketServer(str(self.socket_path), _Handler)
+        server.pytex_server = self
+        threads = [threading.Thread(target=self._work, daemon=True),
+                   threading.Thread(target=self._watch, daemon=True),
+                   threading.Thread(target=server.serve_forever, daemon=True)]
+        sys.stdout = self.output
+        print(f"pytex serve : listening on {self.socket_path}")
+        try:
+            for thread in threads:
+                thread.start()
+            self._stopped.wait()
+        finally:
+            server.shutdown()
+            server.server_close()
+            sys.stdout = self.output.default
+            if self.socket_path.exists():
+                self.socket_path.unlink()
+
+
+class _SocketServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    pytex_server: PytexServer
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """One JSON message per line, one answer per line."""
+
+    def handle(self):
+        line = self.rfile.readline()
+        try:
+            message = json.loads(line)
+        except ValueError:
+            answer = {"status": "failed", "error": "The message is not JSON"}
+        else:
+            answer = self.server.pytex_server.handle(message)
+        self.wfile.write((json.dumps(answer)+"\n").encode("utf8"))
+
+
+def ServeMain(argv=None):
+    """Serve the builds on the socket of 'argv' ([--socket=<path>], see the README)."""
+    if argv is None:
+        argv = sys.argv
+    PytexServer(serve_socket_path(argv)).serve_forever()
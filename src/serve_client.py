@@ -0,0 +1,74 @@
+###########################################################################
+#   This is the package latexparser
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###########################################################################
+
+# copyright (c) Laurent Claessens, 2026
+# email: laurent@claessens-donadello.eu
+
+"""
+The client of the pytex server (see PytexServer). It imports nothing from
+pytex : it starts fast.
+"""
+
+import os
+import sys
+import json
+import socket
+from pathlib import Path
+
+
+def serve_socket_path(argv)->Path:
+    """Return the socket given by '--socket=<path>', or .pytex-serve.sock in the current directory."""
+    for arg in argv:
+        if arg.startswith("--socket="):
+            return Path(arg.split("=", 1)[1]).resolve()
+    return Path.cwd() / ".pytex-serve.sock"
+
+
+def send_message(socket_path:Path, message:dict)->dict:
+    """Send the message to the server and return its answer."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(str(socket_path))
+        client.sendall((json.dumps(message)+"\n").encode("utf8"))
+        with client.makefile("rb") as answer:
+            return json.loads(answer.readline())
+
+
+def ClientMain(argv=None):
+    """
+    For the command line 'lst_foo.py [options]' (see the README) : ask
+    the server to build the request, and print its output. Return 0 if
+    the build is done.
+
+    The other options (--verif, --all, ...) are given to the build.
+    """
+    if argv is None:
+        argv = sys.argv
+    request_files = [arg for arg in argv[1:] if arg.endswith(".py")]
+    if len(request_files) != 1:
+        raise ValueError("Give one request file (lst_*.py).")
+    build_argv = [arg for arg in argv
+                  if arg not in request_files and arg != "--client"
+                  and not arg.startswith("--socket=")]
+    answer = send_message(serve_socket_path(argv),
+                          {"command": "build",
+                           "request": os.path.abspath(request_files[0]),
+                           "argv": build_argv})
+    if answer.get("log") and Path(answer["log"]).is_file():
+        print(Path(answer["log"]).read_text(), end="")
+    print(f"{answer['request']} : {answer['status']}"
+          + (f" ({answer['error']})" if "error" in answer else ""))
+    return 0 if answer["status"] == "done" else 1
@@ -19,6 +19,7 @@
 # email: laurent@claessens-donadello.eu
 
 import re
+import io
 import os
 import sys
 import codecs
@@ -32,6 +33,7 @@ import random
 import string
 import hashlib
 import contextlib
+import threading
 
 from typing import Optional
 from typing import Union
@@ -71,6 +73,61 @@ class IndentPrint:
         sys.stdout = self.old_stdout
 
 
+class ThreadOutput:
+    """
+    A sys.stdout which sends the output of a thread to the stream given
+    to 'redirect' in that thread, and the rest to 'default'.
+    """
+
+    def __init__(self, default):
+        self.default = default
+        self._local = threading.local()
+
+    def redirect(self, stream):
+        self._local.stream = stream
+
+    def current(self):
+        """Return the stream given to 'redirect' in the current thread, or None."""
+        return getattr(self._local, "stream", None)
+
+    @contextlib.contextmanager
+    def redirected(self, stream):
+        """Send the output of the current thread to 'stream' in the block."""
+        previous = self.current()
+        self.redirect(stream)
+        try:
+            yield
+        finally:
+            self.redirect(previous)
+
+    def _stream(self):
+        return self.current() or self.default
+
+    def write(self, text):
+        return self._stream().write(text)
+
+    def flush(self):
+        self._stream().flush()
+
+
+@contextlib.contextmanager
+def quiet_output():
+    """
+    Do not print what is printed in the block.
+
+    When sys.stdout is a ThreadOutput (RunBatch, the server), only
+    the current thread is silenced : sys.stdout is not changed, the
+    other threads go on printing.
+    """
+    stdout = sys.stdout
+    if isinstance(stdout, ThreadOutput):
+        with stdout.redirected(io.StringIO()):
+            yield
+    else:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+
+
 def git_tracked_files(dirname):
     """
     Yield the files that are git-tracked
@@ -148,12 +205,17 @@ class ReferenceNotFoundException(Exception):
         return self.text
 
 
+# Several requests can be built in the same process (see RunBatch).
+_logging_lock = threading.Lock()
+
+
 def logging(text, pspict=None):
     if pspict:
         text = "in "+pspict.name+" : "+text
     print(text)
-    with codecs.open(LOGGING_FILENAME, "a", encoding="utf8") as f:
-        f.write(text+"\n")
+    with _logging_lock:
+        with codecs.open(LOGGING_FILENAME, "a", encoding="utf8") as f:
+            f.write(text+"\n")
 
 
 def ensure_encoded(text, encoding='utf8'):
@@ -189,44 +251,45 @@ def get_file_hash(filepath: Path):
     return get_text_hash(content)
 
 
+def default_cache_directory()->Path:
+    """Return the directory given by PYTEX_CACHE_DIR, or ~/.cache/pytex."""
+    directory = os.environ.get("PYTEX_CACHE_DIR")
+    if directory:
+        return Path(directory)
+    cache_home = os.environ.get("XDG_CACHE_HOME")
+    if cache_home:
+        return Path(cache_home) / "pytex"
+    return Path.home() / ".cache" / "pytex"
+
+
 def testtype(s):
     print(s, type(s))
 
 
+# A comment is a "%" which is not preceded by a backslash (at the
+# beginning of a line, it is preceded by a newline or nothing), up to
+# the end of the line. Only the first "%" of the line counts : the
+# comment contains the others. Writing the "%" first lets the regular
+# expression jump from one "%" to the next.
+comment_regex = re.compile(r"%(?<!\\%)[^\n]*")
+
+
 def RemoveComments(text):
     r"""
     Takes text as a tex source file and remove the comments including what stands after \end{document}
     Input : string
     Output : string
+
+    The "%" itself is kept. The whole text is done by one regular
+    expression (see comment_regex).
     """
-    line_withoutPC = []
-    # we remove the end of lines with % if not preceded by \
-    pattern = "[^\\\]%"
-    search = re.compile(pattern).search
-    # This search only matches the % that are preceded by something else than \.
-    # This does not match the % at the beginning of the line. This is why a second test is performed.
-    for lineC in text.split("\n"):
-        s = search(lineC)
-
-        if s:
-            ligne = s.string[:s.start()+2]    # We keep the "%" itself.
-        else:
-            ligne = lineC
-
-        # % at the beginning of a line is not matched by the regex.
-        if ligne.startswith("%"):
-            ligne = "%"
-
-        line_withoutPC.append(ligne)
-    code_withoutPC = "\n".join(line_withoutPC)
+    code_withoutPC = comment_regex.sub("%", text)
 
     # Now we remove what is after \end{document}
-
-    final_code = code_withoutPC
-    if r"\end{document}" in code_withoutPC:
-        final_code = code_withoutPC.split(r"\end{document}")[
-            0]+r"\end{document}"
-    return final_code
+    end_position = code_withoutPC.find(r"\end{document}")
+    if end_position == -1:
+        return code_withoutPC
+    return code_withoutPC[:end_position+len(r"\end{document}")]
 
 
 def random_string(length):
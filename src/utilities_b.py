@@ -6,6 +6,7 @@ import sys
 from pathlib import Path
 
 from pytex.src.utilities import dprint
+from pytex.src.FilenameIndex import get_filename_index
 
 _ = dprint
 
@@ -148,20 +149,23 @@ def arg_to_output(arg):
 
 
 def is_tex_file(elem:Path):
-    """Say if the given filename is to be considered."""
-    if not elem.is_file():
-        return False
+    """
+    Say if the given filename is to be considered.
+
+    The existence of the file is read in the FilenameIndex.
+    """
     if elem.suffix != ".tex":
         return False
     if "-source-" in str(elem):
         return False
-    return True
+    return get_filename_index().is_file(elem)
 
 
 def get_tex_files(directory:Path)->list[Path]:
     """Retutn the list of tex files in the given directory."""
     answer:list[Path] = []
-    for elem in directory.iterdir():
+    for filename in sorted(get_filename_index().filenames(directory)):
+        elem = directory / filename
         if is_tex_file(elem):
             answer.append(elem)
     return answer
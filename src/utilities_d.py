@@ -4,19 +4,28 @@
 
 def ProduceIntermediateCode(options):
     from pytex.src.all import string_to_latex_code
+    from pytex.src.EditList import EditList
     codeLaTeX = string_to_latex_code(options.text_before_pytex)
     if options.Compil.tout == 0:
+        edits = EditList()
         list_input = codeLaTeX.search_use_of_macro(r"\input", 1)
         begin_document = codeLaTeX.find("\\begin{document}")
-        for occurrence in list_input:
-            A = occurrence.analyse()
+        # One pass over the occurrences, without creating them. Each
+        # filename is asked once to options.accept_input.
+        accepted = {}
+        for index in range(len(list_input)):
             # If an "\input" is before "\begin{document}", we keep it.
             # This behaviour is due to the fact that some
             # "\input" are in the preamble,
             # inside \newcommand for example.
-            if A.position > begin_document:
-                if not options.accept_input(A.filename):
-                    codeLaTeX = codeLaTeX.replace(occurrence.as_written, "%")
-                else:
-                    pass
+            if list_input.position(index) > begin_document:
+                filename = list_input.argument(index, 0)
+                if filename not in accepted:
+                    accepted[filename] = options.accept_input(filename)
+                if not accepted[filename]:
+                    edits.replace(list_input.position(index), list_input.ends[index], "%")
+        # The comments are removed when the new code is created : what
+        # follows a removed \input on its line goes with it, as before.
+        if edits:
+            codeLaTeX = codeLaTeX.apply_edits(edits)
     return codeLaTeX
@@ -0,0 +1,24 @@
+"""
+The modules are imported as pytex.src.<module>. When the checkout is
+not in a directory named 'pytex', it is given that name here.
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+import types
+import tempfile
+from pathlib import Path
+
+
+root = Path(__file__).resolve().parent.parent
+if root.name == "pytex":
+    sys.path.insert(0, str(root.parent))
+elif "pytex" not in sys.modules:
+    package = types.ModuleType("pytex")
+    package.__path__ = [str(root)]
+    sys.modules["pytex"] = package
+
+# The ParseCache and the FilenameIndex of the tests are not the ones of the user.
+os.environ.setdefault("PYTEX_CACHE_DIR", tempfile.mkdtemp(prefix="pytex-tests-"))
@@ -0,0 +1,32 @@
+"""FileTracking along several builds in the same process (pytex serve)."""
+
+from pytex.src.PytexTools import FileTracking
+
+
+def _build(xml_filename, filename):
+    """What a build does with FileTracking : ask, then save."""
+    tracking = FileTracking(xml_filename)
+    changed = tracking.is_file_changed(filename)
+    tracking.save()
+    return changed
+
+
+def test_second_build_is_unchanged(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    followed = tmp_path / "box.xml"
+    followed.write_text("one")
+    assert _build("tracking.xml", str(followed))
+    assert not _build("tracking.xml", str(followed))
+
+
+def test_modified_once(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    followed = tmp_path / "box.xml"
+    followed.write_text("one")
+    _build("tracking.xml", str(followed))
+    followed.write_text("two")
+    assert _build("tracking.xml", str(followed))
+    assert not _build("tracking.xml", str(followed))
+    # A new process reads the file.
+    FileTracking._states.clear()
+    assert not _build("tracking.xml", str(followed))
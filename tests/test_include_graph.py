@@ -0,0 +1,44 @@
+r"""IncludeGraph.is_up_to_date when an \input gives an other file."""
+
+from pytex.src.InputPaths import InputPaths
+from pytex.src.IncludeGraph import IncludeGraph
+
+
+def _graph(tmp_path):
+    input_paths = InputPaths()
+    input_paths.append(tmp_path / "early")
+    input_paths.append(tmp_path / "late")
+    graph = IncludeGraph.from_file(tmp_path / "main.tex", input_paths)
+    graph.save(tmp_path / "graph.json")
+    return IncludeGraph.load(tmp_path / "graph.json")
+
+
+def _tree(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "early").mkdir()
+    (tmp_path / "late").mkdir()
+    (tmp_path / "late" / "a.tex").write_text("A")
+    (tmp_path / "main.tex").write_text("\\input{a}\n\\input{b}\n\\input{\\foo}\n")
+
+
+def test_up_to_date(tmp_path, monkeypatch):
+    _tree(tmp_path, monkeypatch)
+    graph = _graph(tmp_path)
+    assert graph.includes(tmp_path / "main.tex") == [tmp_path / "late" / "a.tex"]
+    assert graph.is_up_to_date()
+
+
+def test_input_found_now(tmp_path, monkeypatch):
+    _tree(tmp_path, monkeypatch)
+    graph = _graph(tmp_path)
+    (tmp_path / "b.tex").write_text("B")
+    assert not graph.is_up_to_date()
+
+
+def test_input_hidden_by_an_earlier_directory(tmp_path, monkeypatch):
+    _tree(tmp_path, monkeypatch)
+    graph = _graph(tmp_path)
+    (tmp_path / "early" / "a.tex").write_text("A early")
+    assert not graph.is_up_to_date()
+    graph = _graph(tmp_path)
+    assert graph.includes(tmp_path / "main.tex") == [tmp_path / "early" / "a.tex"]
@@ -0,0 +1,23 @@
+"""The ok and refute lists of the InputFilter."""
+
+import re
+
+from pytex.src.InputFilter import InputFilter
+
+
+def test_plain_filenames_are_literal():
+    input_filter = InputFilter(["chapter[1]", "what?"], [])
+    assert input_filter.accepts("chapter[1]")
+    assert input_filter.accepts("what?")
+    assert not input_filter.accepts("chapter1")
+    assert not input_filter.accepts("whats")
+
+
+def test_patterns():
+    input_filter = InputFilter(["glob:chapter7/*", re.compile(r"annex\d")],
+                               ["chapter7/draft", "glob:*/old*"])
+    assert input_filter.accepts("chapter7/section2")
+    assert input_filter.accepts("annex3")
+    assert not input_filter.accepts("chapter7/draft")
+    assert not input_filter.accepts("chapter7/old_section")
+    assert not input_filter.accepts("glob:chapter7/*")
@@ -0,0 +1,86 @@
+r"""
+The compiled scanners (fast=True, see MacroScanner) against the slow
+search of the macros, on random LaTeX codes.
+"""
+
+import random
+
+import pytest
+
+from pytex.src.LatexCode import LatexCode
+
+
+PIECES = [r"\label{a}", r"\ref{b}", r"\eqref{c}", r"\input{f}",
+          r"\newlabel{x}{{1}{2}{sec\relax }{x}{}}",
+          r"\PutBox{t1,t2}{lab}", r"\PutBox{}{{nested}}",
+          " ", "\n", "\t", "%", r"\%", "{", "}", "[", "]", "`", "'",
+          "text", r"\\ ", r"\{", r"\}",
+          r"\label {sp}", "\\label{a}%\n{b}", r"\label{a} {b}",
+          r"\label{a}  {b}", r"\newcommand{\label}{z}", r"\ref{a}\ref{b}",
+          r"\labelx{y}", r"\label2{w}", r"\newlabel{y}%", "\n{{3}{4}}",
+          r"\label[o]{a}", r"\PutBox [x] {a} {b}", r"\\label{q}",
+          r"\\\label{q}", "\\newlabel{a}\n{b}", r"\PytexOnlyIn{html}{x}",
+          r"\PytexOnlyIn{pdf}{\label{in}}", r"\label{a\}b}",
+          r"\label [a{b}] {c}", "\\label %c{\n{z}", r"\label{", r"\newlabel"]
+
+NAMES = [r"\label", r"\ref", r"\newlabel", r"\PutBox", r"\PytexOnlyIn", r"\input"]
+
+
+def random_text(rng, length):
+    return "".join(rng.choice(PIECES) for _ in range(length))
+
+
+def found(search):
+    """Return the occurrences as tuples, or the type of the exception."""
+    try:
+        return [(occurrence.name, occurrence.arguments,
+                 occurrence.as_written, occurrence.position)
+                for occurrence in search()]
+    except Exception as err:
+        return f"error {type(err).__name__}"
+
+
+def random_codes(seed, number=60):
+    rng = random.Random(seed)
+    for _ in range(number):
+        text = random_text(rng, rng.randint(1, 60))
+        for keep_comments in [False, True]:
+            yield LatexCode(text, keep_comments=keep_comments)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_one_macro(seed):
+    for code in random_codes(seed):
+        for name in NAMES:
+            for number_of_arguments in [1, 2, 3]:
+                slow = found(lambda: code.search_use_of_macro(name, number_of_arguments))
+                fast = found(lambda: code.search_use_of_macro(name, number_of_arguments,
+                                                              fast=True))
+                assert fast == slow, (code.text_brut, name, number_of_arguments)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_several_macros(seed):
+    signatures = {r"\label": 1, r"\ref": 1, r"\newlabel": 2, r"\PutBox": 2}
+    for code in random_codes(seed+100):
+        slow = found(lambda: code.search_use_of_macros(signatures))
+        fast = found(lambda: code.search_use_of_macros(signatures, fast=True))
+        assert fast == slow, code.text_brut
+
+
+def test_nested_newlabel():
+    code = LatexCode(r"\newlabel{x}{{1}{2}{sec\relax }{x}{}}\newlabel{y}{{3}{4}}")
+    occurrences = code.search_use_of_macro(r"\newlabel", 2, fast=True)
+    assert [occurrence.arguments for occurrence in occurrences] == \
+        [["x", r"{1}{2}{sec\relax }{x}{}"], ["y", "{3}{4}"]]
+
+
+
+@pytest.mark.parametrize("name", [r"\macro", r"\:"])
+@pytest.mark.parametrize("fast", [False, True])
+def test_escaped_braces(name, fast):
+    # \: is not a control word : it is searched by the loop of SearchUseOfMacro.
+    code = LatexCode(name + r"{a\}b} \{c} " + name + r"{d{\{}\\}")
+    occurrences = code.search_use_of_macro(name, 1, fast=fast)
+    assert [occurrence.arguments for occurrence in occurrences] == \
+        [[r"a\}b"], [r"d{\{}\\"]]
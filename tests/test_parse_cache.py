@@ -0,0 +1,64 @@
+"""The bounds of the ParseCache, in memory and on disk."""
+
+import os
+
+from pytex.src.ParseCache import ParseCache
+from pytex.src.ParseCache import _key
+
+
+def _text(number, size=1000):
+    return f"\\label{{l{number}}}\n" + "x"*size
+
+
+def test_memory_is_bounded():
+    cache = ParseCache(None, max_memory_size=5000)
+    texts = [_text(number) for number in range(20)]
+    for text in texts:
+        cache.parsed(text)
+    assert len(cache._entries) <= 5
+    assert cache._memory_size <= 5000
+    # The oldest entry in memory is kept when it is used again.
+    oldest = next(iter(cache._entries))
+    oldest_text = [text for text in texts if _key(text) == oldest][0]
+    cache.parsed(oldest_text)
+    cache.parsed(_text(100))
+    assert oldest in cache._entries
+    text_brut, occurrences = cache.parsed(oldest_text)
+    assert text_brut == oldest_text
+    assert occurrences is not None
+
+
+def test_disk_is_pruned(tmp_path):
+    cache = ParseCache(tmp_path, max_disk_size=1000)
+    texts = [_text(number) for number in range(40)]
+    for text in texts:
+        cache.parsed(text)
+    sizes = [filepath.stat().st_size
+             for filepath in cache.directory.glob("*/*")]
+    # The files are pruned each time a quarter of max_disk_size is written.
+    assert sum(sizes) <= 1000+1000//4+max(sizes)
+    assert len(sizes) < len(texts)
+
+
+def test_prune_removes_the_oldest(tmp_path):
+    cache = ParseCache(tmp_path, max_disk_size=10**9)
+    texts = [_text(number) for number in range(6)]
+    for text in texts:
+        cache.parsed(text)
+    filepaths = sorted(cache.directory.glob("*/*"))
+    size = filepaths[0].stat().st_size
+    for age, filepath in enumerate(filepaths):
+        os.utime(filepath, ns=(age, age))
+    cache.max_disk_size = 3*size
+    cache.prune()
+    assert sorted(cache.directory.glob("*/*")) == filepaths[3:]
+
+
+def test_disabled(tmp_path):
+    cache = ParseCache(tmp_path, enabled=False)
+    cache.parse_all([_text(0)])
+    text_brut, occurrences = cache.parsed(_text(1))
+    assert text_brut == _text(1)
+    assert occurrences is not None
+    assert not cache._entries
+    assert not list(tmp_path.glob("**/*"))
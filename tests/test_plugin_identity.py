@@ -0,0 +1,22 @@
+"""The identity of a plugin in the PytexManifest."""
+
+from pytex.src.LatexCode import LatexCode
+from pytex.src.PytexManifest import plugin_identity
+from pytex.src.PytexTools import CodeBox
+from pytex.src.PytexTools import Plugin
+
+
+def _box(text):
+    box = CodeBox("Box")
+    box["a label"] = LatexCode(text)
+    return box
+
+
+def test_changed_code_box():
+    box = _box("first version")
+    identity = plugin_identity(Plugin(box.put, "after_pytex"))
+    assert plugin_identity(Plugin(_box("first version").put, "after_pytex")) == identity
+    box["a label"] = LatexCode("second version")
+    assert plugin_identity(Plugin(box.put, "after_pytex")) != identity
+    box["an other label"] = LatexCode("first version")
+    assert plugin_identity(Plugin(_box("first version").put, "after_pytex")) != plugin_identity(Plugin(box.put, "after_pytex"))
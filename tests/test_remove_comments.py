@@ -0,0 +1,49 @@
+r"""
+RemoveComments against the line by line implementation it replaced,
+on random texts.
+"""
+
+import re
+import random
+
+import pytest
+
+from pytex.src.utilities import RemoveComments
+
+
+def line_by_line_remove_comments(text):
+    r"""The RemoveComments of pytex up to 2025 : the reference."""
+    line_withoutPC = []
+    search = re.compile("[^\\\\]%").search
+    for lineC in text.split("\n"):
+        s = search(lineC)
+        if s:
+            ligne = s.string[:s.start()+2]
+        else:
+            ligne = lineC
+        if ligne.startswith("%"):
+            ligne = "%"
+        line_withoutPC.append(ligne)
+    code_withoutPC = "\n".join(line_withoutPC)
+
+    final_code = code_withoutPC
+    if r"\end{document}" in code_withoutPC:
+        final_code = code_withoutPC.split(r"\end{document}")[0]+r"\end{document}"
+    return final_code
+
+
+PIECES = ["%", "\\", "\\%", "\n", "\r", "a", " ", "\\end{document}",
+          "\\end{doc", "é", "%%", "\\\\%", "\t"]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_same_as_line_by_line(seed):
+    rng = random.Random(seed)
+    for _ in range(5000):
+        text = "".join(rng.choice(PIECES) for _ in range(rng.randint(0, 25)))
+        assert RemoveComments(text) == line_by_line_remove_comments(text), repr(text)
+
+
+def test_examples():
+    assert RemoveComments("a % b\n% c\n\\% d %e") == "a %\n%\n\\% d %"
+    assert RemoveComments("x\\end{document}y\\end{document}") == "x\\end{document}"
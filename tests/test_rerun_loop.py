@@ -0,0 +1,28 @@
+"""RerunLoop : when an other LaTeX pass is needed."""
+
+from pytex.src.log_code import MAYBE_MORE
+from pytex.src.RerunLoop import RerunLoop
+
+
+def _pass(rerun_loop, tmp_path, aux, log=""):
+    rerun_loop.start_pass()
+    (tmp_path / "main.aux").write_text(aux)
+    (tmp_path / "main.log").write_text(log)
+    return rerun_loop.has_to_rerun()
+
+
+def test_fixed_point(tmp_path):
+    rerun_loop = RerunLoop(tmp_path / "main")
+    assert _pass(rerun_loop, tmp_path, "a")
+    assert not _pass(rerun_loop, tmp_path, "a")
+    assert rerun_loop.reason == "fixed point after 2 pass(es)"
+
+
+def test_latex_asks_rerun(tmp_path):
+    # The .aux of an \include changed : the main .aux is the same.
+    rerun_loop = RerunLoop(tmp_path / "main", max_passes=3)
+    assert _pass(rerun_loop, tmp_path, "a")
+    assert _pass(rerun_loop, tmp_path, "a", log=f"...\n{MAYBE_MORE}\n...")
+    assert "labels may have changed" in rerun_loop.reason
+    assert not _pass(rerun_loop, tmp_path, "a", log=MAYBE_MORE)
+    assert rerun_loop.reason.startswith("maximum of 3 passes")
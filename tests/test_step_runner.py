@@ -0,0 +1,34 @@
+"""The StepRunner of the compilation."""
+
+import io
+import sys
+import threading
+
+from pytex.src.utilities import ThreadOutput
+from pytex.src.StepRunner import Step
+from pytex.src.StepRunner import StepRunner
+from pytex.src.PytexTools import Compilation
+
+
+def test_function_prints_in_the_log_of_its_thread(tmp_path, monkeypatch):
+    output = ThreadOutput(sys.stdout)
+    monkeypatch.setattr(sys, "stdout", output)
+    log = io.StringIO()
+
+    def build():
+        with output.redirected(log):
+            runner = StepRunner(tmp_path / "doc")
+            runner.run([Step("f", function=lambda: print("from the function"))])
+
+    thread = threading.Thread(target=build)
+    thread.start()
+    thread.join()
+    assert "from the function" in log.getvalue()
+
+
+def test_do_it_keeps_the_shell(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    compilation = Compilation(str(tmp_path / "doc.tex"))
+    results = compilation.do_it("echo one two > out.txt && echo three >> out.txt")
+    assert results[0].status == "done"
+    assert (tmp_path / "out.txt").read_text() == "one two\nthree\n"
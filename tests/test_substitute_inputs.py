@@ -0,0 +1,30 @@
+r"""The substitution of the \input, in one pass or one after the other."""
+
+import pytest
+
+from pytex.src.LatexCode import LatexCode
+
+
+def _expanded(tmp_path, monkeypatch, main, files):
+    monkeypatch.chdir(tmp_path)
+    for name, text in files.items():
+        (tmp_path / f"{name}.tex").write_text(text)
+    return LatexCode(main).substitute_all_inputs().text_brut
+
+
+@pytest.mark.parametrize("main, files, expected", [
+    # Joined in one pass.
+    ("A\\input{a}B\n\\input{b}\n", {"a": "x\ny\n", "b": "z\n"},
+     "Ax\nyB\nz\n"),
+    # The same \input twice.
+    ("\\input{a}\n\\input{a}\n", {"a": "x\n"}, "x\nx\n"),
+    # A content which ends with '%' : the rest of the line is a
+    # comment, also the \input which follows.
+    ("\\input{a}\\input{b}\nC\n", {"a": "x%\n", "b": "\ny\n"}, "x%\nC\n"),
+    # A '%' at the end of a content, followed by the end of the line.
+    ("\\input{a}\nC\n", {"a": "x%\n"}, "x%\nC\n"),
+    # \end{document} in a content : what follows is cut.
+    ("\\input{a}\nC\n", {"a": "x\\end{document}\n"}, "x\\end{document}"),
+])
+def test_substitute_all_inputs(tmp_path, monkeypatch, main, files, expected):
+    assert _expanded(tmp_path, monkeypatch, main, files) == expected